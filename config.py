@@ -18,6 +18,11 @@ DISPLAY_CONFIG = {
     'width': 320,
     'height': 240,
     'freq': 40_000_000,     # 40MHz SPI-Frequenz
+    'read_freq': 6_000_000, # SPI-Takt zum Lesen des Display-RAM (RAMRD)
+    'scroll_lines': 320,    # Native Panel-Zeilen für Hardware-Scrolling (VSCRDEF)
+    'indexed_framebuffer': False,   # 4-Bit-Framebuffer (38 KB) statt direkt zeichnen
+    'fb_band_bytes': 5120,  # RGB565-Puffer für die Übertragung (16 Zeilen)
+    'fb_dirty_rects': 4,    # Getrennt übertragene Dirty-Rechtecke pro Frame
 }
 
 # Touchscreen (XPT2046) SPI-Pins
@@ -56,6 +61,18 @@ MIDI_CONFIG = {
     'baud': 31250,          # Standard MIDI Baud Rate
     'usb_host_enabled': False,  # USB Host für USB-MIDI
     'ble_midi_enabled': True,   # Bluetooth MIDI
+    'rx_buffer': 64,            # Bytes pro UART-Lesevorgang
+    'sysex_buffer': 512,        # Max. Länge empfangener SysEx-Nachrichten
+    'thru_enabled': False,      # MIDI-Thru: Eingang auf Ausgang weiterleiten
+    'control_channel': 15,      # Kanal für UI-Steuerung (0-15)
+    'slot_base_note': 36,       # Note für Slot 0 (Slot-Auswahl per Note)
+    'browser_cc': 74,           # CC zum Blättern im Datei-Browser
+    'worker_thread': True,      # MIDI-I/O und Uploads im zweiten Thread
+    'event_queue': 64,          # Nachrichten Worker -> UI
+    'tx_packets': 8,            # Sende-Queue: Anzahl Paketpuffer
+    'tx_packet_size': 272,      # Bytes pro Paket (SysEx-Upload: 7 + 256 + F7)
+    'job_queue': 8,             # Upload-Aufträge
+    'worker_idle_ms': 50,       # Max. Wartezeit des Workers ohne Daten
 }
 
 # ===== CIRCUIT TRACKS KONFIGURATION =====
@@ -63,6 +80,7 @@ CIRCUIT_TRACKS_CONFIG = {
     'num_slots': 64,
     'sample_rate': 22050,   # Hz
     'max_sample_size': 262144,  # 256KB per Sample
+    'sample_memory': 4194304,   # Sample-Speicher für alle Slots zusammen
     'manufacturer_id': (0x00, 0x20, 0x29),  # Novation
     'device_id': 0x01,
 }
@@ -75,13 +93,68 @@ UI_CONFIG = {
     'slot_height': 28,
     'margin': 2,
     'font_size': 1,         # 0=klein, 1=mittel, 2=groß
+    'list_item_height': 20, # Zeilenhöhe im Datei-Browser
+    'list_prefetch': 4,     # Zusätzliche Einträge ober-/unterhalb des Fensters
+    'scroll_threshold': 6,  # Pixel Bewegung bis Drag als Scrollen gilt
+    'scroll_friction': 7,   # Trägheit: Geschwindigkeit * n/8 pro Frame
+    'diagnostics_panel': True,  # MIDI-Timing-Diagnose oben links anzeigen
+    'drag_width': 40,       # Drag-Sprite (Save-Under, 400 Pixel)
+    'drag_height': 10,
+    'gesture_queue': 16,        # Touch-Events zwischen zwei Frames
+    'gesture_move_px': 3,       # Kleinere Bewegungen gelten als Stillstand
+    'tap_ms': 250,              # Tap: kürzer gedrückt als ...
+    'tap_slop_px': 8,           # ... und weniger bewegt als
+    'long_press_ms': 600,       # Long-Press: so lange still gehalten
+    'swipe_min_px': 40,         # Swipe: mindestens so weit ...
+    'swipe_max_ms': 400,        # ... in höchstens dieser Zeit
 }
 
 # ===== SAMPLING KONFIGURATION =====
 SAMPLING_CONFIG = {
-    'supported_formats': ['. wav', '.raw'],
+    'supported_formats': ['.wav', '.raw'],
     'max_samples': 100,
     'preview_duration': 2,  # Sekunden
+    'journal_flush_ms': 2000,       # Journal-Puffer spätestens nach 2s schreiben
+    'journal_compact_bytes': 4096,  # Ab dieser Journal-Größe Snapshot erzeugen
+    'slice_block': 1024,            # Frames pro Lesevorgang beim Slicen
+    'slice_hop_ms': 10,             # Auflösung der Hüllkurve
+    'slice_analysis_rate': 5512,    # Hz, nur jedes n-te Frame für die Hüllkurve
+    'slice_threshold': 1.5,         # Anstieg relativ zur langsamen Hüllkurve
+    'slice_min_ms': 80,             # Mindestlänge eines Slices
+    'slice_step_ms': 8,             # Rechenzeit pro Frame beim Slicen im Hauptloop
+    'upload_cache': True,           # Kodierte Uploads auf SD zwischenspeichern
+    'upload_cache_bytes': 2097152,  # Max. Größe des Upload-Caches (2 MB)
+    'plan_rates': (16000, 11025, 8000),  # Ratenstufen für Vorschläge bei Überlauf
+}
+
+# ===== SAMPLE-ÜBERTRAGUNG (USB-SERIELL) =====
+TRANSFER_CONFIG = {
+    'block_size': 2048,         # Nutzdaten pro DATA-Frame
+    'window': 8,                # Unbestätigte Blöcke unterwegs
+    'ack_every': 4,             # Sammel-ACK nach n Blöcken
+    'timeout_ms': 10000,        # Abbruch ohne Daten vom Host
+}
+
+# ===== EINGABE-TRACE (AUFZEICHNUNG / WIEDERGABE) =====
+TRACE_CONFIG = {
+    'record': False,            # Touch- und MIDI-Eingang auf SD aufzeichnen
+    'replay': False,            # Beim Start Trace abspielen statt Hauptloop
+    'replay_speed': 1,          # Wiedergabe-Tempo (2 = doppelt so schnell)
+    'buffer': 1024,             # Schreibpuffer im RAM
+    'flush_ms': 2000,           # Puffer spätestens nach 2s schreiben
+    'max_gap_ms': 5000,         # Längere Pausen werden gekürzt
+}
+
+# ===== ENERGIE / FRAME-RATE =====
+POWER_CONFIG = {
+    'active_frame_ms': 20,      # 50 FPS während Touch/MIDI/Animation
+    'idle_frame_ms': 100,       # 10 FPS nach kurzer Ruhe
+    'sleep_frame_ms': 1000,     # 1 Wakeup/s im Ruhezustand
+    'idle_after_ms': 3000,      # Ohne Aktivität -> idle
+    'sleep_after_ms': 60000,    # Ohne Aktivität -> sleep
+    'dim_enabled': True,        # Hintergrundbeleuchtung im Ruhezustand dimmen
+    'brightness': 100,          # Helligkeit aktiv (%)
+    'dim_brightness': 10,       # Helligkeit im Ruhezustand (%)
 }
 
 # ===== PFADE =====
@@ -90,8 +163,25 @@ PATHS = {
     'samples': '/sd/samples',
     'config': '/sd/config',
     'backups': '/sd/backups',
+    'sample_index': '/sd/config/samples.idx',
+    'journal': '/sd/config/session.jnl',
+    'snapshot': '/sd/config/session.snap',
+    'trace': '/sd/config/input.trc',
+    'log': '/sd/config/app.log',
+    'upload_cache': '/sd/cache',
 }
 
 # ===== DEBUG =====
 DEBUG = True
-LOG_LEVEL = 'INFO'  # DEBUG, INFO, WARNING, ERROR
\ No newline at end of file
+LOG_LEVEL = 'INFO'  # DEBUG, INFO, WARNING, ERROR
+
+# ===== LOGGING =====
+LOG_CONFIG = {
+    'buffer': 4096,             # Ringpuffer im RAM (Bytes), voll -> Meldung verworfen
+    'flush_ms': 2000,           # Spätestens nach 2s ausgeben (Fehler sofort)
+    'background': True,         # Ausgabe im eigenen Thread (sonst im Hauptloop)
+    'console': True,            # Auf USB-Seriell ausgeben
+    'file': True,               # Zusätzlich nach PATHS['log'] schreiben
+    'file_max': 32768,          # Ab dieser Größe rotieren (Bytes)
+    'file_count': 2,            # Anzahl alter Log-Dateien (app.log.1, .2)
+}
\ No newline at end of file
@@ -4,20 +4,76 @@ Bietet grundlegende Display-Funktionen für die Sampler-UI
 """
 
 import gc
+import time
 from machine import Pin, SPI, PWM
 from config import DISPLAY_CONFIG
 
 class ILI9341Display:
-    """ILI9341 Display-Steuerung"""
+    """ILI9341 Display-Steuerung
+    
+    Alle Zeichenprimitive laufen über einen Kommando-Stream: CS bleibt
+    für Fenster setzen + Memory Write in einer einzigen Transaktion
+    aktiv, Parameter liegen in vorallokierten Puffern.
+    
+    Transaktionen (CS-Zyklen) pro Primitiv:
+        write_pixel, hline, vline, fill_rect, rect, blit  -> 1
+        set_window, scroll, set_scroll_area               -> 1
+        read_rect                                         -> 1
+    """
+    
+    # ILI9341 Kommandos
+    CMD_SWRESET = 0x01
+    CMD_SLPOUT = 0x11
+    CMD_DISPON = 0x29
+    CMD_CASET = 0x2A
+    CMD_RASET = 0x2B
+    CMD_RAMWR = 0x2C
+    CMD_RAMRD = 0x2E
+    CMD_VSCRDEF = 0x33
+    CMD_VSCRSADD = 0x37
+    
+    # Memory Access Control: BGR, Y-Mirror. MV (Zeilen/Spalten tauschen)
+    # ist nicht gesetzt - Panel-Zeilen laufen entlang der y-Achse
+    MADCTL = 0x48
+    MADCTL_MV = 0x20
+    
+    # Power-On Registersequenz (Kommando, Parameter)
+    INIT_SEQUENCE = (
+        (0xEF, b'\x03\x80\x02'),
+        (0xCF, b'\x00\xC1\x30'),                # Power Control B
+        (0xED, b'\x64\x03\x12\x81'),            # Power On Sequence Control
+        (0xE8, b'\x85\x00\x78'),                # Driver Timing Control A
+        (0xCB, b'\x39\x2C\x00\x34\x02'),        # Power Control A
+        (0xF7, b'\x20'),                        # Pump Ratio Control
+        (0xEA, b'\x00\x00'),                    # Driver Timing Control B
+        (0xC0, b'\x23'),                        # Power Control 1 (4.60V)
+        (0xC1, b'\x10'),                        # Power Control 2
+        (0xC5, b'\x3E\x28'),                    # VCOM Control 1
+        (0xC7, b'\x86'),                        # VCOM Control 2
+        (0x36, bytes((MADCTL,))),               # Memory Access Control (s.o.)
+        (0x37, b'\x00\x00'),                    # Vertical Scroll Start
+        (0x3A, b'\x55'),                        # COLMOD: 16-bit RGB565
+        (0xB1, b'\x00\x18'),                    # Frame Rate Control (79Hz)
+        (0xB6, b'\x08\x82\x27'),                # Display Function Control
+        (0xF2, b'\x00'),                        # 3-Gamma aus
+        (0x26, b'\x01'),                        # Gamma-Kurve 1
+        (0xE0, b'\x0F\x31\x2B\x0C\x0E\x08\x4E\xF1'
+               b'\x37\x07\x10\x03\x0E\x09\x00'), # Positive Gamma
+        (0xE1, b'\x00\x0E\x14\x03\x11\x07\x31\xC1'
+               b'\x48\x08\x0F\x0C\x31\x36\x0F'), # Negative Gamma
+    )
     
     def __init__(self):
         self.width = DISPLAY_CONFIG['width']
         self.height = DISPLAY_CONFIG['height']
+        self.scroll_lines = DISPLAY_CONFIG['scroll_lines']
+        self.freq = DISPLAY_CONFIG['freq']
+        self.read_freq = DISPLAY_CONFIG['read_freq']
         
         # GPIO Setup
-        self.dc = Pin(DISPLAY_CONFIG['dc'], Pin. OUT)
+        self.dc = Pin(DISPLAY_CONFIG['dc'], Pin.OUT)
         self.rst = Pin(DISPLAY_CONFIG['rst'], Pin.OUT)
-        self.cs = Pin(DISPLAY_CONFIG['cs'], Pin.OUT)
+        self.cs = Pin(DISPLAY_CONFIG['cs'], Pin.OUT, value=1)
         
         # Backlight PWM
         self.bl = PWM(Pin(DISPLAY_CONFIG['bl']))
@@ -27,7 +83,7 @@ class ILI9341Display:
         # SPI initialisieren
         self.spi = SPI(
             DISPLAY_CONFIG['spi_bus'],
-            baudrate=DISPLAY_CONFIG['freq'],
+            baudrate=self.freq,
             polarity=0,
             phase=0,
             bits=8,
@@ -37,82 +93,219 @@ class ILI9341Display:
             sck=Pin(DISPLAY_CONFIG['clk'])
         )
         
+        # Vorallokierte Puffer für den Kommando-Stream
+        self._cmd_buf = bytearray(1)
+        self._param_buf = bytearray(6)
+        self._param4 = memoryview(self._param_buf)[:4]
+        self._param2 = memoryview(self._param_buf)[:2]
+        self._line_buf = bytearray(self.width * 2)
+        self._line_mv = memoryview(self._line_buf)
+        self._line_color = None
+        
+        # Statistik: Anzahl CS-Zyklen
+        self.transactions = 0
+        
         self.reset()
         self.init_display()
         
     def reset(self):
         """Display zurücksetzen"""
-        self. rst.off()
-        import time
+        self.rst.off()
         time.sleep_ms(50)
-        self. rst.on()
-        time. sleep_ms(150)
+        self.rst.on()
+        time.sleep_ms(150)
         
-    def write_cmd(self, cmd):
-        """Kommando schreiben"""
-        self.dc.off()
+    # ===== Kommando-Stream =====
+    
+    def begin(self):
+        """Transaktion starten (CS aktiv)"""
+        self.transactions += 1
         self.cs.off()
-        self.spi. write(bytes([cmd]))
+        
+    def end(self):
+        """Transaktion beenden (CS inaktiv)"""
         self.cs.on()
         
+    def send_cmd(self, cmd):
+        """Kommando innerhalb einer Transaktion senden"""
+        self.dc.off()
+        self._cmd_buf[0] = cmd
+        self.spi.write(self._cmd_buf)
+        
+    def send_data(self, data):
+        """Daten innerhalb einer Transaktion senden"""
+        self.dc.on()
+        self.spi.write(data)
+        
+    def send_address(self, x0, y0, x1, y1):
+        """Spalten- und Zeilenbereich setzen (innerhalb Transaktion)"""
+        buf = self._param4
+        
+        self.send_cmd(self.CMD_CASET)
+        buf[0] = x0 >> 8
+        buf[1] = x0 & 0xFF
+        buf[2] = x1 >> 8
+        buf[3] = x1 & 0xFF
+        self.send_data(buf)
+        
+        self.send_cmd(self.CMD_RASET)
+        buf[0] = y0 >> 8
+        buf[1] = y0 & 0xFF
+        buf[2] = y1 >> 8
+        buf[3] = y1 & 0xFF
+        self.send_data(buf)
+        
+    def send_window(self, x0, y0, x1, y1):
+        """Fenster setzen und Memory Write starten (innerhalb Transaktion)"""
+        self.send_address(x0, y0, x1, y1)
+        self.send_cmd(self.CMD_RAMWR)
+        self.dc.on()
+        
+    def send_fill(self, pixel_count, color_565):
+        """pixel_count Pixel einer Farbe senden (nach send_window)"""
+        buf = self._line_buf
+        if self._line_color != color_565:
+            # Zeilenpuffer durch Verdoppeln füllen
+            buf[0] = color_565 >> 8
+            buf[1] = color_565 & 0xFF
+            filled = 2
+            size = len(buf)
+            while filled < size:
+                n = min(filled, size - filled)
+                buf[filled:filled + n] = buf[:n]
+                filled += n
+            self._line_color = color_565
+            
+        remaining = pixel_count * 2
+        size = len(buf)
+        while remaining >= size:
+            self.spi.write(buf)
+            remaining -= size
+        if remaining:
+            self.spi.write(self._line_mv[:remaining])
+            
+    # ===== Einzelkommandos (je eine Transaktion) =====
+    
+    def write_cmd(self, cmd):
+        """Kommando schreiben"""
+        self.begin()
+        self.send_cmd(cmd)
+        self.end()
+        
     def write_data(self, data):
         """Daten schreiben"""
         if isinstance(data, int):
-            data = bytes([data])
-        self.dc.on()
-        self.cs.off()
-        self.spi. write(data)
-        self. cs.on()
+            self._cmd_buf[0] = data
+            data = self._cmd_buf
+        self.begin()
+        self.send_data(data)
+        self.end()
         
     def init_display(self):
-        """Display initialisieren (vereinfachte Version)"""
+        """Display mit vollständiger Power-On-Sequenz initialisieren"""
         # Software Reset
-        self.write_cmd(0x01)
-        import time
+        self.write_cmd(self.CMD_SWRESET)
         time.sleep_ms(100)
         
-        # Display ON
-        self.write_cmd(0x29)
-        
-        # Memory Access Control (Rotation)
-        self.write_cmd(0x36)
-        self.write_data(0x48)  # BGR, Y-Mirror
+        # Register in einer Transaktion setzen
+        self.begin()
+        for cmd, params in self.INIT_SEQUENCE:
+            self.send_cmd(cmd)
+            self.send_data(params)
+        self.send_cmd(self.CMD_SLPOUT)
+        self.end()
+        time.sleep_ms(120)
         
-        # COLMOD - Pixel Format
-        self.write_cmd(0x3A)
-        self.write_data(0x55)  # 16-bit RGB565
+        # Display ON
+        self.write_cmd(self.CMD_DISPON)
         
     def set_window(self, x0, y0, x1, y1):
-        """Zeichenfenster setzen"""
-        # Column Address Set
-        self.write_cmd(0x2A)
-        self.write_data(bytes([x0 >> 8, x0 & 0xFF, x1 >> 8, x1 & 0xFF]))
-        
-        # Row Address Set
-        self.write_cmd(0x2B)
-        self.write_data(bytes([y0 >> 8, y0 & 0xFF, y1 >> 8, y1 & 0xFF]))
+        """Zeichenfenster setzen (inkl. Memory Write Start)"""
+        self.begin()
+        self.send_window(x0, y0, x1, y1)
+        self.end()
         
+    # ===== Zeichenprimitive =====
+    
     def write_pixel(self, x, y, color_565):
         """Einzelnes Pixel schreiben (RGB565)"""
-        self.set_window(x, y, x, y)
-        self.write_cmd(0x2C)
-        self.write_data(color_565)
+        buf = self._param2
+        buf[0] = color_565 >> 8
+        buf[1] = color_565 & 0xFF
+        self.begin()
+        self.send_window(x, y, x, y)
+        self.spi.write(buf)
+        self.end()
         
     def fill_rect(self, x, y, width, height, color_565):
         """Rechteck füllen"""
-        self.set_window(x, y, x + width - 1, y + height - 1)
-        self.write_cmd(0x2C)
+        if width <= 0 or height <= 0:
+            return
+        self.begin()
+        self.send_window(x, y, x + width - 1, y + height - 1)
+        self.send_fill(width * height, color_565)
+        self.end()
+        
+    def hline(self, x, y, width, color_565):
+        """Horizontale Linie zeichnen"""
+        self.fill_rect(x, y, width, 1, color_565)
+        
+    def vline(self, x, y, height, color_565):
+        """Vertikale Linie zeichnen"""
+        self.fill_rect(x, y, 1, height, color_565)
         
-        # Farbe als 2 Bytes
-        color_bytes = bytes([color_565 >> 8, color_565 & 0xFF])
-        pixel_count = width * height
+    def rect(self, x, y, width, height, color_565):
+        """Rechteck-Rahmen zeichnen (4 Linien, eine Transaktion)"""
+        if width <= 0 or height <= 0:
+            return
+        x1 = x + width - 1
+        y1 = y + height - 1
+        self.begin()
+        self.send_window(x, y, x1, y)
+        self.send_fill(width, color_565)
+        self.send_window(x, y1, x1, y1)
+        self.send_fill(width, color_565)
+        self.send_window(x, y, x, y1)
+        self.send_fill(height, color_565)
+        self.send_window(x1, y, x1, y1)
+        self.send_fill(height, color_565)
+        self.end()
         
-        # Speicher optimieren
+    def blit(self, buf, x, y, width, height):
+        """RGB565-Puffer (Big Endian) in ein Fenster kopieren"""
+        self.begin()
+        self.send_window(x, y, x + width - 1, y + height - 1)
+        self.spi.write(buf)
+        self.end()
+        
+    def read_rect(self, x, y, width, height, buf, raw):
+        """Fensterinhalt aus dem Display-RAM lesen (RAMRD)
+        
+        Das Panel liefert ein Dummy-Byte und danach RGB666 (3 Bytes pro
+        Pixel) - raw muss width * height * 3 + 1 Bytes groß sein. buf
+        erhält RGB565 (Big Endian) und kann direkt mit blit() zurück.
+        Lesen ist nur mit niedrigerem SPI-Takt zuverlässig.
+        """
+        self.begin()
+        self.send_address(x, y, x + width - 1, y + height - 1)
+        self.send_cmd(self.CMD_RAMRD)
         self.dc.on()
-        self.cs.off()
-        for _ in range(pixel_count):
-            self.spi.write(color_bytes)
-        self.cs.on()
+        self.spi.init(baudrate=self.read_freq)
+        self.spi.readinto(raw)
+        self.spi.init(baudrate=self.freq)
+        self.end()
+        
+        # RGB666 -> RGB565
+        j = 1
+        for i in range(0, width * height * 2, 2):
+            g = raw[j + 1]
+            buf[i] = (raw[j] & 0xF8) | (g >> 5)
+            buf[i + 1] = ((g << 3) & 0xE0) | (raw[j + 2] >> 3)
+            j += 3
+            
+    def present(self):
+        """Direktes Zeichnen: alles ist schon auf dem Panel"""
+        return 0
         
     def clear(self, color_565=0xFFFF):
         """Display leeren"""
@@ -122,9 +315,57 @@ class ILI9341Display:
     def set_brightness(self, brightness):
         """Helligkeit setzen (0-100)"""
         duty = int((brightness / 100) * 1023)
-        self.bl. duty(duty)
+        self.bl.duty(duty)
+        
+    # ===== Hardware-Scrolling =====
+    
+    def can_hw_scroll(self, x, y, width, height):
+        """Prüfe, ob ein Bereich hardwareseitig scrollen kann
+        
+        VSCRDEF/VSCRSADD verschieben komplette Panel-Zeilen entlang der
+        nativen Zeilenachse (scroll_lines Stück). Ohne MV läuft diese
+        Achse entlang y - der Bereich wird dann als Scrollbereich zwischen
+        festem oberen (y Zeilen) und unterem Teil (Rest bis scroll_lines)
+        definiert, auch wenn die App weniger Zeilen nutzt. Der Bereich
+        muss die volle Breite einnehmen, sonst würden Nachbarn mitscrollen.
+        """
+        if self.MADCTL & self.MADCTL_MV:
+            return False
+        if y < 0 or height <= 0 or y + height > self.scroll_lines:
+            return False
+        return x == 0 and width == self.width
+        
+    def set_scroll_area(self, top, height):
+        """Hardware-Scrollbereich definieren (VSCRDEF)"""
+        bottom = self.scroll_lines - top - height
+        buf = self._param_buf
+        buf[0] = top >> 8
+        buf[1] = top & 0xFF
+        buf[2] = height >> 8
+        buf[3] = height & 0xFF
+        buf[4] = bottom >> 8
+        buf[5] = bottom & 0xFF
+        self.begin()
+        self.send_cmd(self.CMD_VSCRDEF)
+        self.send_data(buf)
+        self.end()
+        
+    def scroll(self, line):
+        """Erste angezeigte Zeile des Scrollbereichs setzen (VSCRSADD)"""
+        buf = self._param2
+        buf[0] = line >> 8
+        buf[1] = line & 0xFF
+        self.begin()
+        self.send_cmd(self.CMD_VSCRSADD)
+        self.send_data(buf)
+        self.end()
+        
+    def reset_scroll(self):
+        """Hardware-Scrolling zurücksetzen"""
+        self.set_scroll_area(0, self.scroll_lines)
+        self.scroll(0)
         
     def draw_text(self, x, y, text, color_565, bg_color_565=None):
         """Text zeichnen (vereinfacht - benötigt Font-Library)"""
         # Placeholder: würde mit micropython-font-library implementiert
-        pass
\ No newline at end of file
+        pass
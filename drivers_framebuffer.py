@@ -0,0 +1,292 @@
+"""
+4-Bit-Framebuffer mit Farbpalette für das ILI9341
+Die UI zeichnet in den RAM (38 KB statt 150 KB für RGB565), zum Display
+gehen nur geänderte Bereiche - beim Senden über die 16 Farben aus
+utils.colors.Colors nach RGB565 erweitert
+"""
+
+import framebuf
+import time
+from array import array
+from config import DISPLAY_CONFIG
+from utils.colors import Colors
+
+class IndexedFramebuffer:
+    """Zeichenfläche mit derselben Schnittstelle wie ILI9341Display
+    
+    Zeichnen:   framebuf GS4_HMSB, 2 Pixel pro Byte, C-Routinen
+    present():  Dirty-Rechtecke bandweise per FrameBuffer.blit(..., palette)
+                nach RGB565 erweitern und in einer Transaktion senden
+                
+    Geänderte Bereiche landen in einer festen Liste aus fb_dirty_rects
+    Rechtecken - weit auseinander liegende Änderungen (z.B. Slot oben
+    links, Statuszeile unten) werden getrennt gesendet statt als ein
+    großes umschließendes Rechteck. Gesendet wird in Breitenstufen von
+    BAND_STEP Pixeln, für jede Stufe gibt es einen beim Start angelegten
+    RGB565-FrameBuffer über demselben Übertragungspuffer.
+    
+    Da ein Frame erst mit present() sichtbar wird, gibt es kein Flackern
+    (z.B. clear + Neuzeichnen) und keine halb gezeichneten Widgets.
+    Farben außerhalb der Palette werden auf die nächste Palettenfarbe
+    abgebildet.
+    """
+    
+    BAND_STEP = 16
+    
+    def __init__(self, display):
+        self.display = display
+        self.width = display.width
+        self.height = display.height
+        
+        # 4 Bit pro Pixel - möglichst früh anlegen (38 KB am Stück)
+        self._buf = bytearray(self.width * self.height // 2)
+        self.fb = framebuf.FrameBuffer(self._buf, self.width, self.height, framebuf.GS4_HMSB)
+        
+        # Palette: alle Farben aus Colors, nach Wert sortiert (BLACK = 0)
+        self.colors = sorted(set(getattr(Colors, name) for name in dir(Colors)
+                                 if not name.startswith('_')))[:16]
+        self._index = {}
+        for i, color in enumerate(self.colors):
+            self._index[color] = i
+            
+        # Palette als RGB565-FrameBuffer für blit(); Bytes getauscht, da
+        # framebuf Little Endian speichert und das Panel Big Endian erwartet
+        self._palette_buf = bytearray(32)
+        self.palette = framebuf.FrameBuffer(self._palette_buf, 16, 1, framebuf.RGB565)
+        for i, color in enumerate(self.colors):
+            self.palette.pixel(i, 0, ((color & 0xFF) << 8) | (color >> 8))
+            
+        # Wiederverwendeter RGB565-Puffer für die Übertragung, dazu ein
+        # FrameBuffer pro Breitenstufe (so viele Zeilen wie hineinpassen)
+        self._band_buf = bytearray(DISPLAY_CONFIG['fb_band_bytes'])
+        self._band_mv = memoryview(self._band_buf)
+        self._bands = []
+        for width in range(self.BAND_STEP, self.width + self.BAND_STEP, self.BAND_STEP):
+            width = min(width, self.width)
+            lines = max(1, len(self._band_buf) // (width * 2))
+            self._bands.append(framebuf.FrameBuffer(self._band_buf, width, lines, framebuf.RGB565))
+            
+        # Geänderte Rechtecke seit dem letzten present(): x0, y0, x1, y1
+        self.max_rects = DISPLAY_CONFIG['fb_dirty_rects']
+        self._rects = array('h', [0] * (4 * self.max_rects))
+        self._rect_count = 0
+        
+        # Statistik
+        self.presents = 0
+        self.pixels_pushed = 0
+        self.push_us = 0
+        self.last_push_us = 0
+        
+        # Panel-Scrolling würde den Framebuffer verschieben
+        display.reset_scroll()
+        
+    # ===== Farben und Dirty-Bereich =====
+    
+    def color_index(self, color_565):
+        """Palettenindex einer RGB565-Farbe (unbekannte: nächste Farbe)"""
+        index = self._index.get(color_565)
+        if index is not None:
+            return index
+            
+        r = color_565 >> 11
+        g = (color_565 >> 5) & 0x3F
+        b = color_565 & 0x1F
+        best = 0
+        best_dist = 1 << 30
+        for i, c in enumerate(self.colors):
+            dr = (c >> 11) - r
+            dg = ((c >> 5) & 0x3F) - g
+            db = (c & 0x1F) - b
+            dist = 4 * dr * dr + dg * dg + 4 * db * db
+            if dist < best_dist:
+                best = i
+                best_dist = dist
+        self._index[color_565] = best
+        return best
+        
+    def _mark(self, x, y, width, height):
+        """Rechteck zum Dirty-Bereich hinzufügen (auf das Display begrenzt)
+        
+        Berührt es ein vorhandenes Rechteck, wird dieses erweitert. Sonst
+        kommt es als eigenes in die Liste, ist sie voll, wächst das
+        Rechteck mit dem kleinsten Flächenzuwachs.
+        """
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.width, x + width) - 1
+        y1 = min(self.height, y + height) - 1
+        if x1 < x0 or y1 < y0:
+            return
+            
+        rects = self._rects
+        count = self._rect_count
+        best = -1
+        best_growth = 1 << 30
+        for i in range(0, count * 4, 4):
+            rx0 = rects[i]
+            ry0 = rects[i + 1]
+            rx1 = rects[i + 2]
+            ry1 = rects[i + 3]
+            if x0 <= rx1 + 1 and rx0 <= x1 + 1 and y0 <= ry1 + 1 and ry0 <= y1 + 1:
+                best = i
+                best_growth = 0
+                break
+            growth = ((max(x1, rx1) - min(x0, rx0) + 1) * (max(y1, ry1) - min(y0, ry0) + 1)
+                      - (rx1 - rx0 + 1) * (ry1 - ry0 + 1))
+            if growth < best_growth:
+                best = i
+                best_growth = growth
+                
+        if best_growth and count < self.max_rects:
+            i = count * 4
+            rects[i] = x0
+            rects[i + 1] = y0
+            rects[i + 2] = x1
+            rects[i + 3] = y1
+            self._rect_count = count + 1
+            return
+        if x0 < rects[best]:
+            rects[best] = x0
+        if y0 < rects[best + 1]:
+            rects[best + 1] = y0
+        if x1 > rects[best + 2]:
+            rects[best + 2] = x1
+        if y1 > rects[best + 3]:
+            rects[best + 3] = y1
+            
+    # ===== Zeichenprimitive (nur RAM) =====
+    
+    def write_pixel(self, x, y, color_565):
+        self.fb.pixel(x, y, self.color_index(color_565))
+        self._mark(x, y, 1, 1)
+        
+    def fill_rect(self, x, y, width, height, color_565):
+        if width <= 0 or height <= 0:
+            return
+        self.fb.fill_rect(x, y, width, height, self.color_index(color_565))
+        self._mark(x, y, width, height)
+        
+    def hline(self, x, y, width, color_565):
+        self.fill_rect(x, y, width, 1, color_565)
+        
+    def vline(self, x, y, height, color_565):
+        self.fill_rect(x, y, 1, height, color_565)
+        
+    def rect(self, x, y, width, height, color_565):
+        if width <= 0 or height <= 0:
+            return
+        self.fb.rect(x, y, width, height, self.color_index(color_565))
+        self._mark(x, y, width, height)
+        
+    def clear(self, color_565=0xFFFF):
+        self.fb.fill(self.color_index(color_565))
+        self._mark(0, 0, self.width, self.height)
+        
+    def draw_text(self, x, y, text, color_565, bg_color_565=None):
+        """Text mit dem eingebauten 8x8-Font von framebuf"""
+        width = len(text) * 8
+        if bg_color_565 is not None:
+            self.fb.fill_rect(x, y, width, 8, self.color_index(bg_color_565))
+        self.fb.text(text, x, y, self.color_index(color_565))
+        self._mark(x, y, width, 8)
+        
+    def blit(self, buf, x, y, width, height):
+        """RGB565-Puffer (Big Endian) in Palettenfarben übernehmen"""
+        fb = self.fb
+        i = 0
+        for row in range(y, y + height):
+            for col in range(x, x + width):
+                fb.pixel(col, row, self.color_index((buf[i] << 8) | buf[i + 1]))
+                i += 2
+        self._mark(x, y, width, height)
+        
+    def read_rect(self, x, y, width, height, buf, raw=None):
+        """Fensterinhalt als RGB565 (Big Endian) aus dem Framebuffer lesen"""
+        fb = self.fb
+        colors = self.colors
+        i = 0
+        for row in range(y, y + height):
+            for col in range(x, x + width):
+                color = colors[fb.pixel(col, row)]
+                buf[i] = color >> 8
+                buf[i + 1] = color & 0xFF
+                i += 2
+                
+    # ===== Übertragung =====
+    
+    def _expand(self, x0, y, width, lines):
+        """Ersatz für blit mit Palette (ältere Firmware): Pixel einzeln"""
+        fb = self.fb
+        colors = self.colors
+        band = self._band_buf
+        i = 0
+        for row in range(y, y + lines):
+            for col in range(x0, x0 + width):
+                color = colors[fb.pixel(col, row)]
+                band[i] = color >> 8
+                band[i + 1] = color & 0xFF
+                i += 2
+                
+    def present(self):
+        """Dirty-Rechtecke zum Display senden, gibt Anzahl Pixel zurück"""
+        count = self._rect_count
+        if not count:
+            return 0
+            
+        start = time.ticks_us()
+        rects = self._rects
+        step = self.BAND_STEP
+        spi = self.display.spi
+        pixels = 0
+        
+        display = self.display
+        display.begin()
+        for i in range(0, count * 4, 4):
+            # Auf die nächste Breitenstufe erweitern (passender FrameBuffer)
+            stage = (rects[i + 2] - rects[i]) // step
+            band_fb = self._bands[stage]
+            width = min((stage + 1) * step, self.width)
+            x0 = min(rects[i], self.width - width)
+            y0 = rects[i + 1]
+            y1 = rects[i + 3]
+            band_lines = max(1, len(self._band_buf) // (width * 2))
+            
+            display.send_window(x0, y0, x0 + width - 1, y1)
+            y = y0
+            while y <= y1:
+                lines = min(band_lines, y1 - y + 1)
+                try:
+                    band_fb.blit(self.fb, -x0, -y, -1, self.palette)
+                except TypeError:
+                    self._expand(x0, y, width, lines)
+                spi.write(self._band_mv[:width * lines * 2])
+                y += lines
+            pixels += width * (y1 - y0 + 1)
+        display.end()
+        self._rect_count = 0
+        
+        self.presents += 1
+        self.pixels_pushed += pixels
+        self.last_push_us = time.ticks_diff(time.ticks_us(), start)
+        self.push_us += self.last_push_us
+        return pixels
+        
+    # ===== Weitergereichte Funktionen =====
+    
+    def set_brightness(self, brightness):
+        self.display.set_brightness(brightness)
+        
+    def can_hw_scroll(self, x, y, width, height):
+        """Kein Panel-Scrolling: der Framebuffer hält das Bild"""
+        return False
+        
+    def stats(self):
+        """Speicher und Übertragungszeiten"""
+        return {
+            'fb_bytes': len(self._buf),
+            'band_bytes': len(self._band_buf),
+            'presents': self.presents,
+            'pixels_pushed': self.pixels_pushed,
+            'last_push_us': self.last_push_us,
+            'avg_push_us': self.push_us // self.presents if self.presents else 0,
+        }
\ No newline at end of file
@@ -2,14 +2,94 @@
 SD-Karten-Treiber und Dateisystem-Verwaltung
 """
 
+import _thread
 import os
 import gc
 from machine import Pin, SPI
 from config import SD_CONFIG, PATHS
 
+# Gemeinsamer Lock für alle Zugriffe auf die SD-Karte. Der SPI-Treiber
+# (sdcard) und FatFs sind nicht reentrant, der GIL kann aber mitten in
+# einer Blockübertragung den Thread wechseln (UI, MIDI-Worker, Log).
+# Gehalten wird er immer nur für einen einzelnen Aufruf - kein Aufrufer
+# wartet länger als einen Blockzugriff, verschachtelt wird nie.
+sd_lock = _thread.allocate_lock()
+
+class LockedFile:
+    """Datei auf der SD-Karte, jeder Zugriff einzeln unter sd_lock"""
+    
+    def __init__(self, f):
+        self._f = f
+        
+    def read(self, *args):
+        with sd_lock:
+            return self._f.read(*args)
+            
+    def readinto(self, *args):
+        with sd_lock:
+            return self._f.readinto(*args)
+            
+    def write(self, data):
+        with sd_lock:
+            return self._f.write(data)
+            
+    def seek(self, *args):
+        with sd_lock:
+            return self._f.seek(*args)
+            
+    def tell(self):
+        with sd_lock:
+            return self._f.tell()
+            
+    def flush(self):
+        with sd_lock:
+            return self._f.flush()
+            
+    def close(self):
+        with sd_lock:
+            self._f.close()
+            
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc):
+        self.close()
+
+def sd_open(path, mode='rb'):
+    """Datei öffnen (statt open()) - liefert eine LockedFile"""
+    with sd_lock:
+        return LockedFile(open(path, mode))
+
+def sd_stat(path):
+    with sd_lock:
+        return os.stat(path)
+
+def sd_remove(path):
+    with sd_lock:
+        os.remove(path)
+
+def sd_rename(old_path, new_path):
+    with sd_lock:
+        os.rename(old_path, new_path)
+
+def sd_ilistdir(path):
+    """Wie os.ilistdir, der Lock wird nur pro Eintrag gehalten"""
+    with sd_lock:
+        entries = os.ilistdir(path)
+    while True:
+        with sd_lock:
+            try:
+                entry = next(entries)
+            except StopIteration:
+                return
+        yield entry
+
 class SDCardManager:
     """SD-Karten-Verwaltung"""
     
+    # Blockgröße beim Lesen ganzer Samples (eine Lock-Haltezeit)
+    READ_BLOCK = 4096
+    
     def __init__(self):
         self.mounted = False
         self.mount_point = PATHS['sd_mount']
@@ -32,7 +112,8 @@ class SDCardManager:
             
             # Dateisystem mounten
             import vfs
-            vfs.mount(sd, self.mount_point)
+            with sd_lock:
+                vfs.mount(sd, self.mount_point)
             self.mounted = True
             
             print(f"✓ SD-Karte gemountet: {self.mount_point}")
@@ -43,9 +124,10 @@ class SDCardManager:
             
     def create_directories(self):
         """Notwendige Verzeichnisse erstellen"""
-        for path in [PATHS['samples'], PATHS['config'], PATHS['backups']]:
+        for path in [PATHS['samples'], PATHS['config'], PATHS['backups'], PATHS['upload_cache']]:
             try:
-                os.makedirs(path, exist_ok=True)
+                with sd_lock:
+                    os.makedirs(path, exist_ok=True)
             except:
                 pass
                 
@@ -59,12 +141,13 @@ class SDCardManager:
             
         try:
             files = []
-            for f in os.listdir(directory):
+            for entry in sd_ilistdir(directory):
+                f = entry[0]
                 fpath = f"{directory}/{f}"
-                if os.path.isfile(fpath):
+                if entry[1] == 0x8000:
                     # Nur unterstützte Formate
                     if any(f.lower().endswith(ext) for ext in ['.wav', '.raw']):
-                        size = os.stat(fpath)[6]
+                        size = sd_stat(fpath)[6]
                         files.append({
                             'name': f,
                             'path': fpath,
@@ -75,20 +158,66 @@ class SDCardManager:
             print(f"Fehler beim Auflisten: {e}")
             return []
             
+    def open_sample_index(self, rebuild=True):
+        """Sample-Index öffnen (bei Bedarf neu aufbauen)"""
+        from sampling.sample_index import SampleIndex
+        
+        index = SampleIndex()
+        if not self.mounted:
+            return index
+            
+        try:
+            if rebuild or not index.open():
+                index.build()
+        except Exception as e:
+            print(f"Fehler beim Aufbau des Sample-Index: {e}")
+        return index
+        
+    def read_into(self, filepath, buf):
+        """Dateianfang in buf lesen, gibt die Anzahl Bytes zurück
+        
+        Liest nur so viel, wie buf fasst - für Uploads, die nicht die
+        ganze Datei brauchen. 0 bei Fehler.
+        """
+        view = memoryview(buf)
+        pos = 0
+        try:
+            with sd_open(filepath, 'rb') as f:
+                while pos < len(buf):
+                    n = f.readinto(view[pos:pos + self.READ_BLOCK])
+                    if not n:
+                        break
+                    pos += n
+            return pos
+        except Exception as e:
+            print(f"Fehler beim Lesen von {filepath}: {e}")
+            return 0
+            
     def get_file_size(self, filepath):
         """Dateigröße abrufen"""
         try:
-            return os.stat(filepath)[6]
+            return sd_stat(filepath)[6]
         except:
             return 0
             
     def read_sample(self, filepath):
-        """Sample-Datei lesen"""
+        """Sample-Datei lesen
+        
+        Blockweise, damit der SD-Lock nie für die ganze Datei gehalten
+        wird (läuft auch im MIDI-Worker).
+        """
         try:
-            with open(filepath, 'rb') as f:
-                data = f. read()
+            data = bytearray(sd_stat(filepath)[6])
+            view = memoryview(data)
+            pos = 0
+            with sd_open(filepath, 'rb') as f:
+                while pos < len(data):
+                    n = f.readinto(view[pos:pos + self.READ_BLOCK])
+                    if not n:
+                        break
+                    pos += n
             gc.collect()
-            return data
+            return data if pos == len(data) else data[:pos]
         except Exception as e:
             print(f"Fehler beim Lesen von {filepath}: {e}")
             return None
\ No newline at end of file
@@ -86,6 +86,10 @@ class XPT2046Touchscreen:
         
         return x_mapped, y_mapped
         
+    def set_irq_handler(self, handler):
+        """Handler bei Berührung aufrufen (PENIRQ fällt auf Low)"""
+        self.irq.irq(trigger=Pin.IRQ_FALLING, handler=handler)
+        
     def is_pressed(self):
         """Prüfe, ob Touch aktiv ist"""
         return self. irq.value() == 0
@@ -8,41 +8,77 @@ import time
 from machine import Pin
 
 # Konfiguration
-from config import DEBUG, LOG_LEVEL, PATHS, UI_CONFIG
+from config import DEBUG, LOG_LEVEL, LOG_CONFIG, PATHS, DISPLAY_CONFIG, UI_CONFIG, MIDI_CONFIG, TRACE_CONFIG, SAMPLING_CONFIG
 from drivers.display import ILI9341Display
+from drivers.framebuffer import IndexedFramebuffer
 from drivers.touchscreen import XPT2046Touchscreen
+from drivers import sdcard
 from drivers.sdcard import SDCardManager
 from midi.circuit_tracks import CircuitTracksController
+from midi.router import MIDIRouter
+from midi.clock import MIDIClock
+from midi.worker import MIDIWorker
 from sampling.sample_manager import SampleManager
 from ui.gui import GUIEngine
+from ui.gestures import GestureRecognizer
 from ui.widgets import SampleSlot, Button
 from ui.file_browser import SampleBrowser
-from utils.logger import Logger
+from ui.diagnostics import ClockPanel
+from utils.logger import Logger, LogSink
 from utils.colors import Colors
+from utils.stats import Histogram, RunningStats
+from utils.power import PowerManager
+from utils.trace import TraceRecorder, TraceReplay
 
-# Logger initialisieren
-logger = Logger(DEBUG, LOG_LEVEL)
+# Logger initialisieren (Ausgabe gepuffert, blockiert den Hauptloop nicht)
+log_sink = LogSink()
+logger = Logger(DEBUG, LOG_LEVEL, log_sink)
 
 class CircuitTracksSampler:
     """Hauptanwendung"""
     
     def __init__(self):
+        log_sink.start()
         logger.info("Initialisierung: ESP32 CYD MIDI Sampler")
         
         # Hardware initialisieren
         self.display = ILI9341Display()
+        if DISPLAY_CONFIG['indexed_framebuffer']:
+            # Früh anlegen, solange der Heap noch nicht fragmentiert ist
+            self.display = IndexedFramebuffer(self.display)
         self.touchscreen = XPT2046Touchscreen()
         self.sd_manager = SDCardManager()
         self.midi_controller = CircuitTracksController()
+        self.midi_router = MIDIRouter(self.midi_controller)
+        self.midi_clock = MIDIClock()
+        self.midi_clock.attach(self.midi_controller)
         
         # Managers
         self.sample_manager = None
         self.gui_engine = None
+        self.midi_worker = None
+        self.power = None
+        self.trace = None
+        
+        # Frame-Zeiten (Arbeit pro Frame ohne sleep)
+        self.frame_stats = RunningStats()
+        self.frame_histogram = Histogram((5, 10, 20, 30, 50, 100, 200, 500))
+        
+        # UI-Elemente für MIDI-Steuerung
+        self.file_browser = None
+        self.slot_widgets = []
+        self.selected_slot = None
+        self.selected_slots = []    # Mehrfachauswahl per Long-Press
         
         # Status
         self.running = True
         self.upload_in_progress = False
         
+        # Laufendes Slicen (Generator, ein Stück pro Frame)
+        self.slice_job = None
+        self.slice_first_slot = 0
+        self.slice_status = None
+        
     def init(self):
         """Anwendung initialisieren"""
         logger. info("Hardware Setup...")
@@ -54,6 +90,8 @@ class CircuitTracksSampler:
             return False
             
         self.sd_manager.create_directories()
+        if LOG_CONFIG['file']:
+            log_sink.set_file(PATHS['log'], sdcard)
         logger.info("✓ SD-Karte ready")
         
         # MIDI & Circuit Tracks
@@ -66,8 +104,35 @@ class CircuitTracksSampler:
         
         # GUI
         self.gui_engine = GUIEngine(self.display, self.touchscreen)
+        self.gui_engine.on_gesture = self.on_gesture
         self.setup_ui()
+        self.setup_midi_routes()
+        
+        # Frame-Takt nach Aktivität, Touch-IRQ weckt sofort
+        self.power = PowerManager(self.display)
+        self.touchscreen.set_irq_handler(self.power.on_touch_irq)
         
+        # MIDI-I/O und Uploads im zweiten Thread
+        if MIDI_CONFIG['worker_thread']:
+            worker = MIDIWorker(self.midi_controller, self.midi_router, self.sample_manager)
+            if worker.start():
+                self.midi_worker = worker
+                worker.on_event = self.power.wake
+                
+        if not self.midi_worker and self.midi_controller.uart:
+            # MIDI im Hauptloop: UART-Empfang weckt direkt
+            self.power.register(self.midi_controller.uart)
+            
+        # Eingaben für spätere Wiedergabe aufzeichnen
+        if TRACE_CONFIG['record']:
+            try:
+                self.trace = TraceRecorder(PATHS['trace'])
+                self.gui_engine.trace = self.trace
+                self.midi_controller.trace = self.trace
+                logger.info("✓ Eingabe-Trace wird aufgezeichnet")
+            except OSError as e:
+                logger.error(f"Trace nicht möglich: {e}")
+                
         logger.info("✓ Initialisierung abgeschlossen")
         return True
         
@@ -79,6 +144,7 @@ class CircuitTracksSampler:
         file_browser = SampleBrowser(5, 50, 150, 180, self.sd_manager)
         file_browser.load_samples()
         self.gui_engine.add_widget(file_browser)
+        self.file_browser = file_browser
         
         # Sample-Slots Grid (rechte Seite - 8x8)
         slots_start_x = 160
@@ -91,9 +157,15 @@ class CircuitTracksSampler:
                 x = slots_start_x + (col * (UI_CONFIG['slot_width'] + slot_spacing))
                 y = slots_start_y + (row * (UI_CONFIG['slot_height'] + slot_spacing))
                 
-                slot = SampleSlot(x, y, slot_num)
+                slot = SampleSlot(x, y, slot_num, self.sample_manager.slots, self.drop_sample)
                 self.gui_engine. add_widget(slot)
+                self.slot_widgets.append(slot)
         
+        # MIDI-Timing-Diagnose (oben links)
+        if UI_CONFIG['diagnostics_panel']:
+            clock_panel = ClockPanel(5, 2, 150, 44, self.midi_clock)
+            self.gui_engine.add_widget(clock_panel)
+            
         # Control Buttons (unten)
         upload_btn = Button(10, 210, 80, 25, "Upload All", self.upload_all)
         self.gui_engine.add_widget(upload_btn)
@@ -101,12 +173,132 @@ class CircuitTracksSampler:
         save_btn = Button(100, 210, 80, 25, "Save", self.save_project)
         self.gui_engine.add_widget(save_btn)
         
+        # Oben rechts neben der Diagnose, über dem Slot-Grid
+        slice_btn = Button(160, 10, 80, 25, "Slice", self.slice_selected)
+        self.gui_engine.add_widget(slice_btn)
+        
         logger.info("✓ UI Ready")
         
+    def setup_midi_routes(self):
+        """MIDI-Noten/CCs auf UI-Aktionen abbilden"""
+        channel = MIDI_CONFIG['control_channel']
+        base_note = MIDI_CONFIG['slot_base_note']
+        
+        # Note base_note + n wählt Slot n
+        for slot_num in range(len(self.slot_widgets)):
+            note = base_note + slot_num
+            if note > 127:
+                break
+            self.midi_router.map_note(channel, note, self._slot_selector(slot_num))
+            
+        # CC blättert durch den Datei-Browser
+        self.midi_router.map_cc(channel, MIDI_CONFIG['browser_cc'], self.browse_to)
+        
+    def _slot_selector(self, slot_num):
+        """Aktion für die Auswahl eines Slots erzeugen"""
+        return lambda velocity: self.select_slot(slot_num)
+        
+    def select_slot(self, slot_num):
+        """Slot auswählen (z.B. per MIDI-Note oder Tap), hebt Mehrfachauswahl auf"""
+        for other in self.selected_slots:
+            self.slot_widgets[other].set_selected(False)
+        if self.selected_slot is not None:
+            self.slot_widgets[self.selected_slot].set_selected(False)
+        self.selected_slot = slot_num
+        self.selected_slots = [slot_num]
+        self.slot_widgets[slot_num].set_selected(True)
+        
+    def toggle_slot(self, slot_num):
+        """Slot zur Mehrfachauswahl hinzufügen bzw. daraus entfernen"""
+        if slot_num in self.selected_slots:
+            self.selected_slots.remove(slot_num)
+            self.slot_widgets[slot_num].set_selected(False)
+            self.selected_slot = self.selected_slots[-1] if self.selected_slots else None
+        else:
+            self.selected_slots.append(slot_num)
+            self.slot_widgets[slot_num].set_selected(True)
+            self.selected_slot = slot_num
+        self.show_status(f"{len(self.selected_slots)} Slots markiert")
+        
+    def on_gesture(self, kind, widget, dx, dy):
+        """Gesten, die kein Widget selbst behandelt"""
+        if not isinstance(widget, SampleSlot):
+            return
+        if kind == GestureRecognizer.TAP:
+            self.select_slot(widget.slot_number)
+        elif kind == GestureRecognizer.LONG_PRESS:
+            self.toggle_slot(widget.slot_number)
+            
+    def drop_sample(self, slot_num, file):
+        """Datei aus dem Browser per Drag & Drop einem Slot zuweisen"""
+        fits, used = self.sample_manager.check_capacity(slot_num, file)
+        if self.sample_manager.assign_sample_to_slot(slot_num, file['path'], file):
+            if fits:
+                self.show_status(f"{file['name']} -> Slot {slot_num + 1}")
+            else:
+                self.show_status(f"Speicher voll: {used // 1024} KB belegt", 3000)
+            return True
+        self.show_status("Zuweisung fehlgeschlagen!", 3000)
+        return False
+        
+    def slice_selected(self):
+        """Gewählte Datei an Transienten zerlegen, ab dem gewählten Slot
+        
+        Startet nur den Auftrag - die Arbeit erledigt _step_slice() in
+        jedem Frame des Hauptloops, nie innerhalb eines Widget-Callbacks.
+        """
+        if self.slice_job:
+            self.show_status("Slicen läuft bereits...")
+            return
+            
+        file = self.file_browser.get_selected_file()
+        if not file:
+            self.show_status("Keine Datei gewählt!", 3000)
+            return
+            
+        self.slice_first_slot = self.selected_slot or 0
+        self.slice_status = None
+        self.slice_job = self.sample_manager.slice_steps(file['path'], self.slice_first_slot)
+        self.show_status(f"Slice: {file['name']}...")
+        
+    def _step_slice(self):
+        """Laufendes Slicen für höchstens slice_step_ms pro Frame fortsetzen"""
+        start = time.ticks_ms()
+        step = None
+        try:
+            while time.ticks_diff(time.ticks_ms(), start) < SAMPLING_CONFIG['slice_step_ms']:
+                step = next(self.slice_job)
+        except StopIteration:
+            self.slice_job = None
+            count = self.sample_manager.slice_count
+            if not count:
+                self.show_status("Slicen fehlgeschlagen!", 3000)
+                return
+            # Neue Dateien im Browser anzeigen
+            self.file_browser.load_samples()
+            self.show_status(f"{count} Slices ab Slot {self.slice_first_slot + 1}")
+            return
+            
+        stage, done, total = step
+        if stage == 'analyse':
+            text = f"Slice: Analyse {done * 10 // total * 10}%"
+        else:
+            text = f"Slice: {done}/{total} geschrieben"
+        if text != self.slice_status:
+            self.slice_status = text
+            self.show_status(text)
+            
+    def browse_to(self, value):
+        """CC-Wert (0-127) auf Position im Datei-Browser abbilden"""
+        count = len(self.file_browser.files)
+        if count:
+            self.file_browser.select(value * (count - 1) // 127)
+            
     def show_error_screen(self, message):
         """Fehlerbildschirm anzeigen"""
         self.display.clear(Colors.RED)
         # Text würde hier gerendert
+        self.display.present()
         logger.error(f"ERROR: {message}")
         
     def show_status(self, message, duration_ms=2000):
@@ -120,10 +312,41 @@ class CircuitTracksSampler:
             self.show_status("Circuit Tracks nicht verbunden!", 3000)
             return
             
+        # Passt die Belegung nicht, gar nicht erst mit dem Upload anfangen
+        plan = self.sample_manager.plan_capacity()
+        if not plan['fits']:
+            logger.warning(f"Kapazität: {plan}")
+            if plan['oversize']:
+                self.show_status(f"Slot {plan['oversize'][0] + 1} zu lang!", 3000)
+            else:
+                self.show_status(f"Speicher: {plan['used'] // 1024}/{plan['budget'] // 1024} KB - "
+                                 f"{len(plan['truncate'])} Samples kürzen", 3000)
+            return
+            
+        # Mehrfachauswahl: nur die markierten Slots, der Rest bleibt ausstehend
+        only = self.selected_slots if len(self.selected_slots) > 1 else None
+        
+        if self.midi_worker:
+            # Upload läuft im Worker, Status kommt über process_events()
+            # Was nicht mehr in die Auftrags-Queue passt, bleibt ausstehend
+            pending = self.sample_manager.pending_uploads
+            for slot_num in [s for s in pending if only is None or s in only]:
+                if not self.midi_worker.submit_upload(slot_num):
+                    break
+                pending.remove(slot_num)
+            self.show_status("Upload gestartet...")
+            return
+            
         self.upload_in_progress = True
-        self.sample_manager.upload_all_pending()
+        pending = self.sample_manager.pending_uploads
+        count = len([s for s in pending if only is None or s in only])
+        done = self.sample_manager.upload_all_pending(only)
         self.upload_in_progress = False
-        self.show_status("Upload abgeschlossen!")
+        if done < count:
+            # Fehlgeschlagene Slots bleiben ausstehend
+            self.show_status(f"{count - done} Uploads fehlgeschlagen!", 3000)
+        else:
+            self.show_status("Upload abgeschlossen!")
         
     def save_project(self):
         """Projekt speichern"""
@@ -136,6 +359,35 @@ class CircuitTracksSampler:
         else:
             self.show_status("Speichern fehlgeschlagen!", 3000)
             
+    def frame(self):
+        """Ein Frame: Eingaben verarbeiten, zeichnen, Puffer schreiben"""
+        # GUI aktualisieren
+        touched = self.gui_engine.update()
+        
+        # MIDI-Nachrichten verarbeiten (Routing-Tabelle)
+        if self.midi_worker:
+            events = self.midi_worker.process_events()
+        else:
+            events = self.midi_router.poll()
+            
+        # Slicen schrittweise fortsetzen (hält den aktiven Frame-Takt)
+        if self.slice_job:
+            self._step_slice()
+            self.power.activity()
+            
+        if touched or events or self.gui_engine.busy():
+            self.power.activity()
+            
+        # GUI zeichnen (nur geänderte Widgets)
+        self.gui_engine.draw()
+        self.power.frame_done()
+        
+        # Session-Journal und Trace gesammelt auf SD schreiben
+        self.sample_manager.tick()
+        if self.trace:
+            self.trace.tick()
+        log_sink.tick()
+            
     def run(self):
         """Hauptschleife"""
         logger.info("Starte Hauptschleife...")
@@ -144,25 +396,27 @@ class CircuitTracksSampler:
         
         while self.running:
             try:
-                # GUI aktualisieren
-                self.gui_engine.update()
+                frame_start = time.ticks_ms()
                 
-                # GUI zeichnen (nicht zu oft)
-                if frame_count % 10 == 0:
-                    self.gui_engine.draw()
-                    
-                # MIDI-Nachrichten verarbeiten
-                midi_msg = self.midi_controller.read_midi_message()
-                if midi_msg:
-                    self.handle_midi_message(midi_msg)
+                self.frame()
                     
                 # Speicher optimieren
                 if time.time() - last_gc > 5:
                     gc.collect()
                     last_gc = time.time()
+                    logger.debug(f"Power: {self.power.stats()}")
+                    logger.debug(f"Log: {logger.stats()}")
+                    logger.debug(f"Touch: {self.gui_engine.gestures.stats()}")
+                    logger.debug(f"Upload-Cache: {self.sample_manager.cache_stats()}")
                     
+                frame_ms = time.ticks_diff(time.ticks_ms(), frame_start)
+                self.frame_stats.add(frame_ms)
+                self.frame_histogram.add(frame_ms)
+                
                 frame_count += 1
-                time.sleep_ms(50)  # ~20 FPS
+                
+                # Schlafen bis zum nächsten Frame (Takt je nach Aktivität)
+                self.power.wait(frame_start)
                 
             except KeyboardInterrupt:
                 self.running = False
@@ -170,25 +424,64 @@ class CircuitTracksSampler:
                 logger.error(f"Fehler in Hauptschleife: {e}")
                 time.sleep_ms(500)
                 
-    def handle_midi_message(self, msg):
-        """MIDI-Nachricht verarbeiten"""
-        if msg[0] == 'sysex':
-            logger.debug(f"SysEx empfangen: {msg[1][:20]}...")
-        elif msg[0] == 'note_on':
-            logger.debug(f"Note On: Channel {msg[1]}, Note {msg[2]}, Velocity {msg[3]}")
-        elif msg[0] == 'cc':
-            logger.debug(f"CC: Channel {msg[1]}, CC {msg[2]}, Value {msg[3]}")
+    def replay_trace(self, path=None, speed=None):
+        """Aufgezeichneten Trace abspielen und Reaktions-/Frame-Zeiten messen
+        
+        Touchscreen und MIDI-UART werden durch Ersatz-Hardware ersetzt,
+        der Rest der Anwendung (Worker, Routing, Zeichnen, Frame-Takt)
+        läuft unverändert. Gibt den Bericht als Dict zurück.
+        """
+        path = path or PATHS['trace']
+        speed = speed or TRACE_CONFIG['replay_speed']
+        logger.info(f"Trace-Wiedergabe: {path} (x{speed})")
+        
+        replay = TraceReplay(path, speed)
+        replay.touchscreen.set_irq_handler(self.power.on_touch_irq)
+        if self.midi_worker:
+            replay.on_midi = self.midi_worker.job_event.set
+        else:
+            replay.on_midi = self.power.wake
+        replay.install(self.gui_engine, self.midi_controller)
+        
+        replay.start()
+        try:
+            while not replay.done():
+                frame_start = time.ticks_ms()
+                frame_start_us = time.ticks_us()
+                self.frame()
+                replay.frame_done(frame_start_us, self.power.frame_ms[self.power.state])
+                self.power.wait(frame_start)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            replay.stop()
+            replay.restore()
             
+        report = replay.report()
+        logger.info(f"Trace-Bericht: {report}")
+        return report
+        
     def cleanup(self):
         """Aufräumen"""
         logger.info("Cleanup...")
+        if self.midi_worker:
+            self.midi_worker.stop()
+        if self.trace:
+            self.trace.close()
+        if self.sample_manager:
+            self.sample_manager.flush()
         self. display.clear(Colors.BLACK)
+        self.display.present()
         logger.info("Anwendung beendet")
+        log_sink.stop()
 
 
 # ===== ENTRY POINT =====
 if __name__ == '__main__':
     app = CircuitTracksSampler()
     if app.init():
-        app. run()
+        if TRACE_CONFIG['replay']:
+            app.replay_trace()
+        else:
+            app. run()
     app.cleanup()
\ No newline at end of file
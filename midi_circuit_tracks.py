@@ -12,12 +12,24 @@ class CircuitTracksController(MIDIManager):
     # SysEx Device Inquiry Response Pattern
     DEVICE_INQUIRY = [0x7E, 0x00, 0x06, 0x02]  # Identity Reply
     
+    # Kennung des Upload-Datenstroms (Schlüssel im Upload-Cache) -
+    # bei Änderungen an Rahmen oder Kodierung erhöhen
+    UPLOAD_PROTOCOL = 1
+    UPLOAD_FORMAT = f"{CIRCUIT_TRACKS_CONFIG['sample_rate']}m16"
+    
+    # Ein Upload-Rahmen trägt 256 kodierte 7-Bit-Bytes = 224 Sample-Bytes
+    UPLOAD_ENCODED = 256
+    UPLOAD_BYTES = UPLOAD_ENCODED * 7 // 8
+    
     def __init__(self):
         super().__init__()
         self.device_connected = False
         self.num_slots = CIRCUIT_TRACKS_CONFIG['num_slots']
         self.slots = {}
         
+        # Sample-Bytes eines Uploads (einmal angelegt, von der SD gefüllt)
+        self.upload_data = bytearray(self.UPLOAD_BYTES)
+        
     def detect_circuit_tracks(self):
         """Circuit Tracks erkennen"""
         responses = self.detect_devices()
@@ -33,33 +45,67 @@ class CircuitTracksController(MIDIManager):
         print("✗ Circuit Tracks nicht gefunden")
         return False
         
-    def upload_sample_to_slot(self, sample_data, slot_number):
-        """Sample in einen Slot laden"""
+    def upload_sample_to_slot(self, sample_data, slot_number, capture=None):
+        """Sample in einen Slot laden
+        
+        capture (optional, z.B. UploadCache): erhält jeden fertigen
+        Rahmen per add_frame(buf, länge, slot_pos) zum Speichern.
+        """
         if not self.device_connected:
             print("Circuit Tracks nicht verbunden")
             return False
             
-        if not isinstance(sample_data, bytes):
+        if not isinstance(sample_data, (bytes, bytearray, memoryview)):
             return False
             
         # SysEx: Sample Upload
         # [F0] [00 20 29] [Device] [Cmd] [Slot] [Data... ] [F7]
-        
-        manufacturer_id = CIRCUIT_TRACKS_CONFIG['manufacturer_id']
-        device_id = CIRCUIT_TRACKS_CONFIG['device_id']
-        
-        # Vereinfachte SysEx (16-Bit Länge + Daten)
-        sysex_data = [
-            device_id,
-            0x01,  # Upload Sample Command
-            slot_number & 0xFF,  # Slot Low Byte
-        ]
+        # Rahmen direkt im Sendepuffer, Daten werden an Ort und Stelle kodiert
+        buf = self.sysex_begin(CIRCUIT_TRACKS_CONFIG['manufacturer_id'])
+        if buf is None:
+            return False
+            
+        pos = self.frame_pos
+        buf[pos] = CIRCUIT_TRACKS_CONFIG['device_id']
+        buf[pos + 1] = 0x01                 # Upload Sample Command
+        buf[pos + 2] = slot_number & 0xFF   # Slot Low Byte
+        pos += 3
         
         # Sample-Daten in SysEx-Format (7-Bit encoding nötig!)
-        encoded_data = self.encode_7bit(sample_data)
-        sysex_data.extend(encoded_data[:256])  # Limit für Übertragung
-        
-        return self.send_sysex(manufacturer_id, sysex_data)
+        # Limit für Übertragung: UPLOAD_ENCODED kodierte Bytes
+        end = min(self.frame_limit, pos + self.UPLOAD_ENCODED)
+        try:
+            pos = self.encode_7bit_into(sample_data, buf, pos, end)
+        except Exception as e:
+            self.sysex_abort()
+            print(f"Upload Fehler: {e}")
+            return False
+            
+        if capture:
+            buf[pos] = 0xF7
+            capture.add_frame(buf, pos + 1, self.frame_pos + 2)
+        self.sysex_end(pos)
+        return True
+        
+    def upload_cached(self, f, frames, slot_number):
+        """Gespeicherten Upload-Datenstrom (UploadCache.open) senden
+        
+        Die Rahmen gehen unverändert von der Datei in die Paketpuffer,
+        nur die Slot-Nummer wird eingesetzt.
+        """
+        if not self.device_connected:
+            print("Circuit Tracks nicht verbunden")
+            return False
+            
+        header = bytearray(4)
+        for _ in range(frames):
+            if f.readinto(header) != 4:
+                return False
+            length = header[0] | (header[1] << 8)
+            slot_pos = header[2] | (header[3] << 8)
+            if not self.send_packet_from(f, length, slot_pos, slot_number & 0xFF):
+                return False
+        return True
         
     def encode_7bit(self, data):
         """8-Bit Daten zu 7-Bit SysEx-Format kodieren"""
@@ -79,6 +125,33 @@ class CircuitTracksController(MIDIManager):
                     
         return encoded
         
+    def encode_7bit_into(self, data, buf, pos, end):
+        """Wie encode_7bit, schreibt aber direkt nach buf[pos:end]
+        
+        Kodiert nur so viel, wie in den Puffer passt, und gibt die
+        Position hinter dem letzten geschriebenen Byte zurück.
+        """
+        bit_buffer = 0
+        bits_in_buffer = 0
+        
+        for i in range(len(data)):
+            if pos >= end:
+                break
+            byte = data[i]
+            for bit in range(8):
+                bit_buffer = (bit_buffer << 1) | ((byte >> bit) & 1)
+                bits_in_buffer += 1
+                
+                if bits_in_buffer == 7:
+                    if pos >= end:
+                        break
+                    buf[pos] = bit_buffer
+                    pos += 1
+                    bit_buffer = 0
+                    bits_in_buffer = 0
+                    
+        return pos
+        
     def decode_7bit(self, encoded_data):
         """7-Bit SysEx-Daten zu 8-Bit dekodieren"""
         decoded = []
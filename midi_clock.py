@@ -0,0 +1,146 @@
+"""
+MIDI-Clock: Tempo- und Transport-Verfolgung (F8/FA/FB/FC)
+Misst Jitter zwischen Clock-Ticks und die durch den Hauptloop
+verursachte Eingangslatenz als Histogramme
+"""
+
+from array import array
+from utils.stats import Histogram
+import time
+
+class MIDIClock:
+    """Verfolgt Timing-Clock, Start/Stop/Continue und schätzt das Tempo"""
+    
+    CLOCK = 0xF8
+    START = 0xFA
+    CONTINUE = 0xFB
+    STOP = 0xFC
+    
+    PPQN = 24                   # Clock-Ticks pro Viertelnote
+    TIMEOUT_US = 500_000        # Ohne Clock länger als das = nicht synchron
+    
+    # Klassengrenzen in Mikrosekunden
+    JITTER_EDGES = (50, 100, 250, 500, 1000, 2000, 5000, 10000)
+    LATENCY_EDGES = (250, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+    
+    def __init__(self):
+        self.midi = None
+        self.on_transport = None
+        
+        # Transport
+        self.running = False
+        self.clock_count = 0
+        
+        # Zeitstempel der letzten 24 Ticks (eine Viertelnote)
+        self._ticks = array('I', [0] * self.PPQN)
+        self._tick_pos = 0
+        self._tick_fill = 0
+        self.beat_us = 0
+        self.period_us = 0
+        self.last_clock_us = 0
+        self._arrival_us = 0
+        
+        # Messungen
+        self.jitter = Histogram(self.JITTER_EDGES)
+        self.latency = Histogram(self.LATENCY_EDGES)
+        
+    def attach(self, midi_manager):
+        """Als Realtime-Empfänger am MIDI-Parser anmelden"""
+        self.midi = midi_manager
+        midi_manager.on_realtime = self.handle_realtime
+        
+    def handle_realtime(self, byte):
+        """Realtime-Byte verarbeiten (Callback des Parsers)"""
+        now = time.ticks_us()
+        
+        if byte == self.CLOCK:
+            self._on_clock(now)
+        elif byte == self.START:
+            self.clock_count = 0
+            self._set_running(True)
+        elif byte == self.CONTINUE:
+            self._set_running(True)
+        elif byte == self.STOP:
+            self._set_running(False)
+            
+    def _set_running(self, running):
+        self.running = running
+        if self.on_transport:
+            self.on_transport(running)
+            
+    def _on_clock(self, now):
+        """Timing-Clock: Tempo, Jitter und Latenz aktualisieren"""
+        if self._tick_fill and time.ticks_diff(now, self.last_clock_us) > self.TIMEOUT_US:
+            # Clock war unterbrochen - neu einrasten
+            self._tick_fill = 0
+            self.beat_us = 0
+            self.period_us = 0
+            
+        if self.period_us:
+            # Jitter: Abweichung des Abstands von der mittleren Periode
+            interval = time.ticks_diff(now, self.last_clock_us)
+            self.jitter.add(abs(interval - self.period_us))
+            
+            # Latenz: Ankunft frühestens nach der vorherigen Abfrage,
+            # erwartet eine Periode nach der letzten geschätzten Ankunft
+            arrival = time.ticks_add(self._arrival_us, self.period_us)
+            if self.midi and time.ticks_diff(arrival, self.midi.prev_poll_ticks_us) < 0:
+                arrival = self.midi.prev_poll_ticks_us
+            if time.ticks_diff(arrival, now) > 0:
+                arrival = now
+        else:
+            arrival = now
+            
+        self.latency.add(time.ticks_diff(now, arrival))
+        self._arrival_us = arrival
+        self.last_clock_us = now
+        
+        # Tempo über eine volle Viertelnote mitteln (Loop-Jitter mittelt sich heraus)
+        oldest = self._ticks[self._tick_pos]
+        self._ticks[self._tick_pos] = now
+        self._tick_pos = (self._tick_pos + 1) % self.PPQN
+        if self._tick_fill < self.PPQN:
+            self._tick_fill += 1
+        else:
+            span = time.ticks_diff(now, oldest)
+            if self.beat_us:
+                self.beat_us += (span - self.beat_us) // 4
+            else:
+                self.beat_us = span
+            self.period_us = self.beat_us // self.PPQN
+            
+        if self.running:
+            self.clock_count += 1
+            
+    def is_locked(self):
+        """Prüfe, ob ein stabiles Tempo anliegt"""
+        if not self.beat_us:
+            return False
+        return time.ticks_diff(time.ticks_us(), self.last_clock_us) <= self.TIMEOUT_US
+        
+    def bpm(self):
+        """Geglättetes Tempo in BPM (0 = keine Clock)"""
+        if not self.is_locked():
+            return 0
+        return (600_000_000 // self.beat_us) / 10
+        
+    def song_position(self):
+        """Position seit Start als (Takt, Schlag, Tick) im 4/4-Takt"""
+        beats, tick = divmod(self.clock_count, self.PPQN)
+        bar, beat = divmod(beats, 4)
+        return bar, beat, tick
+        
+    def reset_stats(self):
+        """Jitter- und Latenz-Histogramme zurücksetzen"""
+        self.jitter.reset()
+        self.latency.reset()
+        
+    def stats(self):
+        """Tempo, Transport und Timing-Messungen"""
+        return {
+            'bpm': self.bpm(),
+            'running': self.running,
+            'clock_count': self.clock_count,
+            'jitter_us': self.jitter.summary(),
+            'latency_us': self.latency.summary(),
+        }
@@ -4,14 +4,104 @@ MIDI-Kommunikation und Geräte-Verwaltung
 
 from machine import UART, Pin
 from config import MIDI_CONFIG
+from array import array
+import _thread
 import time
 
 class MIDIManager:
-    """Zentrale MIDI-Verwaltung"""
+    """Zentrale MIDI-Verwaltung
+    
+    Der Parser arbeitet streamend auf einem vorallokierten Puffer und
+    filtert bereits beim Status-Byte: Nachrichten, deren Typ/Kanal nicht
+    in accept_mask freigegeben ist, werden ohne Allokation verworfen.
+    Vollständige Nachrichten gehen als on_message(status, data1, data2)
+    raus, SysEx als on_sysex(memoryview).
+    
+    Gesendet wird über eine begrenzte Queue aus vorallokierten
+    Paketpuffern. SysEx wird direkt im Paketpuffer gerahmt: F0 und
+    Hersteller-ID stehen schon drin, der Encoder schreibt die Nutzdaten
+    an frame_pos, sysex_end() setzt F7. Kurze Nachrichten werden an das
+    letzte wartende Paket angehängt. flush_tx() schreibt nur, wenn der
+    UART fertig ist. Nur SysEx wartet bei voller Queue auf ein freies
+    Paket (Uploads dürfen nicht verloren gehen), kurze Nachrichten werden
+    dann verworfen und gezählt.
+    """
+    
+    # Nachrichtentypen (oberes Nibble des Status-Bytes)
+    NOTE_OFF = 0x80
+    NOTE_ON = 0x90
+    POLY_PRESSURE = 0xA0
+    CC = 0xB0
+    PROGRAM_CHANGE = 0xC0
+    CHANNEL_PRESSURE = 0xD0
+    PITCH_BEND = 0xE0
+    
+    ALL_CHANNELS = 0xFFFF
     
     def __init__(self):
         self.uart = None
         self.devices = {}
+        
+        # Empfangspuffer
+        self._rx_buf = bytearray(MIDI_CONFIG['rx_buffer'])
+        self.rx_ticks_us = 0
+        self.poll_ticks_us = 0
+        self.prev_poll_ticks_us = 0
+        
+        # Filter: pro Nachrichtentyp eine Kanal-Bitmaske
+        self.accept_mask = array('H', [0] * 8)
+        self.accept_sysex = True
+        
+        # Empfänger für geparste Nachrichten
+        self.on_message = None
+        self.on_sysex = None
+        self.on_realtime = None
+        
+        # Optionale Aufzeichnung der rohen Eingangsbytes (utils.trace.TraceRecorder)
+        self.trace = None
+        
+        # Parser-Zustand
+        self._status = 0
+        self._needed = 0
+        self._have = 0
+        self._data1 = 0
+        self._skip = True
+        self._in_sysex = False
+        self._sysex_buf = bytearray(MIDI_CONFIG['sysex_buffer'])
+        self._sysex_len = 0
+        self._sysex_overflow = False
+        
+        # Sende-Queue: Ring aus Paketpuffern (Lock, da Worker und UI senden)
+        count = MIDI_CONFIG['tx_packets']
+        size = MIDI_CONFIG['tx_packet_size']
+        self._tx_slots = [bytearray(size) for _ in range(count)]
+        self._tx_len = array('H', [0] * count)
+        self._tx_ready = bytearray(count)
+        self._tx_head = 0
+        self._tx_count = 0
+        self._tx_sent = 0
+        self._tx_lock = _thread.allocate_lock()
+        
+        # Offener SysEx-Rahmen (nur ein Thread gleichzeitig)
+        self._frame_lock = _thread.allocate_lock()
+        self._frame_slot = -1
+        self.frame_pos = 0
+        self.frame_limit = 0
+        
+        # Geschätztes Sendeende aller an den UART übergebenen Bytes
+        # (10 Bit pro Byte bei MIDI_CONFIG['baud'])
+        self.tx_byte_us = 10000000 // MIDI_CONFIG['baud']
+        self._tx_wire_us = time.ticks_us()
+        
+        self.tx_packets = 0
+        self.tx_bytes = 0
+        self.tx_dropped = 0
+        self.tx_busy = 0
+        
+        # Statistik
+        self.messages_received = 0
+        self.messages_filtered = 0
+        
         self.init_midi_uart()
         
     def init_midi_uart(self):
@@ -21,109 +111,402 @@ class MIDIManager:
                 MIDI_CONFIG['uart_id'],
                 baudrate=MIDI_CONFIG['baud'],
                 tx=MIDI_CONFIG['tx_pin'],
-                rx=MIDI_CONFIG['rx_pin']
+                rx=MIDI_CONFIG['rx_pin'],
+                # Ein ganzes Paket + Thru passt in den Treiberpuffer,
+                # write() kehrt daher sofort zurück
+                txbuf=MIDI_CONFIG['tx_packet_size'] + 32
             )
             print("✓ MIDI UART initialisiert")
         except Exception as e:
             print(f"✗ MIDI UART Fehler: {e}")
             
+    # ===== Senden =====
+    
+    def _tx_reserve(self, length):
+        """Paket mit Platz für length Bytes finden (unter _tx_lock), -1 = voll"""
+        count = len(self._tx_slots)
+        if self._tx_count:
+            # An das letzte fertige Paket anhängen, solange es noch passt
+            tail = (self._tx_head + self._tx_count - 1) % count
+            if self._tx_ready[tail] and self._tx_len[tail] + length <= len(self._tx_slots[tail]):
+                return tail
+        if self._tx_count >= count:
+            return -1
+        tail = (self._tx_head + self._tx_count) % count
+        self._tx_len[tail] = 0
+        self._tx_ready[tail] = 1
+        self._tx_count += 1
+        return tail
+        
     def send_midi_message(self, status, data1, data2=None):
-        """Standard MIDI-Nachricht senden"""
+        """Standard MIDI-Nachricht in die Sende-Queue stellen"""
         if not self.uart:
             return False
             
-        message = bytes([status, data1])
-        if data2 is not None:
-            message += bytes([data2])
+        length = 2 if data2 is None else 3
+        self._tx_lock.acquire()
+        try:
+            slot = self._tx_reserve(length)
+            if slot < 0:
+                self.tx_dropped += 1
+                return False
+            buf = self._tx_slots[slot]
+            pos = self._tx_len[slot]
+            buf[pos] = status
+            buf[pos + 1] = data1
+            if data2 is not None:
+                buf[pos + 2] = data2
+            self._tx_len[slot] = pos + length
+            return True
+        finally:
+            self._tx_lock.release()
             
+    def write(self, message):
+        """Fertige Bytes in die Sende-Queue kopieren"""
+        length = len(message)
+        self._tx_lock.acquire()
         try:
-            self.uart.write(message)
+            slot = self._tx_reserve(length)
+            if slot < 0:
+                self.tx_dropped += 1
+                return False
+            pos = self._tx_len[slot]
+            self._tx_slots[slot][pos:pos + length] = message
+            self._tx_len[slot] = pos + length
             return True
-        except Exception as e:
-            print(f"MIDI Send Error: {e}")
+        finally:
+            self._tx_lock.release()
+            
+    def _packet_reserve(self):
+        """Eigenes Paket reservieren, erst nach Freigabe sendebereit (-1 = voll)"""
+        self._tx_lock.acquire()
+        count = len(self._tx_slots)
+        if self._tx_count >= count:
+            slot = -1
+        else:
+            slot = (self._tx_head + self._tx_count) % count
+            self._tx_len[slot] = 0
+            self._tx_ready[slot] = 0
+            self._tx_count += 1
+        self._tx_lock.release()
+        return slot
+        
+    def _packet_wait(self, timeout_ms):
+        """Paket reservieren, bei voller Queue wartende Pakete senden
+        
+        Wie der frühere blockierende UART-Schreibzugriff wartet der
+        Aufrufer, bis ein Paket frei wird - höchstens timeout_ms (-1 = voll).
+        """
+        start = time.ticks_ms()
+        while True:
+            slot = self._packet_reserve()
+            if slot >= 0:
+                return slot
+            self.flush_tx()
+            if time.ticks_diff(time.ticks_ms(), start) > timeout_ms:
+                self.tx_dropped += 1
+                return -1
+            time.sleep_ms(1)
+            
+    def sysex_begin(self, manufacturer_id, timeout_ms=1000):
+        """Paketpuffer für eine SysEx-Nachricht reservieren
+        
+        Gibt den Puffer mit F0 + Hersteller-ID zurück. Ist die Queue voll,
+        wird bis timeout_ms auf ein freies Paket gewartet (None = Timeout).
+        Nutzdaten ab self.frame_pos bis vor self.frame_limit schreiben,
+        danach sysex_end(ende) bzw. sysex_abort() aufrufen.
+        """
+        self._frame_lock.acquire()
+        slot = self._packet_wait(timeout_ms)
+        
+        if slot < 0:
+            self._frame_lock.release()
+            return None
+            
+        buf = self._tx_slots[slot]
+        buf[0] = 0xF0
+        pos = 1
+        if isinstance(manufacturer_id, int):
+            buf[1] = manufacturer_id
+            pos = 2
+        else:
+            for i in range(len(manufacturer_id)):
+                buf[pos] = manufacturer_id[i]
+                pos += 1
+                
+        self._frame_slot = slot
+        self.frame_pos = pos
+        self.frame_limit = len(buf) - 1     # Platz für F7
+        return buf
+        
+    def sysex_end(self, end):
+        """F7 an Position end setzen und Paket zum Senden freigeben"""
+        slot = self._frame_slot
+        self._tx_slots[slot][end] = 0xF7
+        self._tx_lock.acquire()
+        self._tx_len[slot] = end + 1
+        self._tx_ready[slot] = 1
+        self._tx_lock.release()
+        self._frame_slot = -1
+        self._frame_lock.release()
+        
+    def sysex_abort(self):
+        """Offenen Rahmen verwerfen (leeres Paket wird übersprungen)"""
+        slot = self._frame_slot
+        self._tx_lock.acquire()
+        self._tx_len[slot] = 0
+        self._tx_ready[slot] = 1
+        self._tx_lock.release()
+        self._frame_slot = -1
+        self._frame_lock.release()
+        
+    def send_packet_from(self, f, length, patch_pos=-1, patch_value=0, timeout_ms=1000):
+        """Fertig gerahmte Nachricht aus einer Datei direkt in ein Paket lesen
+        
+        Die Bytes werden nicht angefasst (außer optional ein Byte an
+        patch_pos, z.B. die Slot-Nummer). Ist die Queue voll, werden
+        wartende Pakete gesendet, bis ein Paket frei wird.
+        """
+        if not self.uart or length > len(self._tx_slots[0]):
+            return False
+            
+        slot = self._packet_wait(timeout_ms)
+        if slot < 0:
             return False
             
+        buf = self._tx_slots[slot]
+        try:
+            n = f.readinto(memoryview(buf)[:length]) or 0
+        except OSError:
+            n = 0
+        if n == length and patch_pos >= 0:
+            buf[patch_pos] = patch_value
+            
+        # Unvollständig gelesen: leeres Paket wird übersprungen
+        self._tx_lock.acquire()
+        self._tx_len[slot] = length if n == length else 0
+        self._tx_ready[slot] = 1
+        self._tx_lock.release()
+        return n == length
+        
     def send_sysex(self, manufacturer_id, data):
-        """SysEx-Nachricht senden"""
+        """SysEx-Nachricht senden (Daten direkt in den Paketpuffer)"""
         if not self. uart:
             return False
             
-        # SysEx Start (0xF0)
-        message = bytes([0xF0])
-        
-        # Hersteller-ID (1-3 Bytes)
-        if isinstance(manufacturer_id, (tuple, list)):
-            message += bytes(manufacturer_id)
-        else:
-            message += bytes([manufacturer_id])
+        buf = self.sysex_begin(manufacturer_id)
+        if buf is None:
+            print("SysEx Send Error: Sende-Queue voll (Timeout)")
+            return False
+            
+        pos = self.frame_pos
+        n = len(data)
+        if pos + n > self.frame_limit:
+            self.sysex_abort()
+            print(f"SysEx Send Error: {n} Bytes zu lang")
+            return False
             
-        # Daten
-        message += bytes(data)
-        
-        # SysEx End (0xF7)
-        message += bytes([0xF7])
-        
         try:
-            self.uart.write(message)
-            return True
+            # Byteweise statt Slice - ein Slice-Objekt wäre eine Allokation
+            for i in range(n):
+                buf[pos + i] = data[i]
         except Exception as e:
+            self.sysex_abort()
             print(f"SysEx Send Error: {e}")
             return False
             
-    def read_midi_message(self):
-        """MIDI-Nachricht lesen"""
-        if not self.uart or self.uart.any() == 0:
-            return None
+        self.sysex_end(pos + n)
+        return True
+        
+    def flush_tx(self):
+        """Sende-Queue abarbeiten, ohne auf die Leitung zu warten
+        
+        Ein Paket wird erst geschrieben, wenn der UART alles Vorherige
+        gesendet hat (txdone). write(buf, off, len) schreibt ohne
+        Slice-Allokation. Gibt die Anzahl geschriebener Bytes zurück.
+        """
+        uart = self.uart
+        if not uart:
+            return 0
             
-        try:
-            status = self.uart.read(1)[0]
+        written = 0
+        lock = self._tx_lock
+        while True:
+            lock.acquire()
+            head = self._tx_head
+            if not self._tx_count or not self._tx_ready[head]:
+                lock.release()
+                break
+            sent = self._tx_sent
+            length = self._tx_len[head]
+            lock.release()
             
-            # Status-Byte analysieren
-            if status == 0xF0:  # SysEx
-                sysex_data = []
-                while True:
-                    byte = self. uart.read(1)[0]
+            if sent < length:
+                if not uart.txdone():
+                    self.tx_busy += 1
+                    break
+                n = uart.write(self._tx_slots[head], sent, length - sent) or 0
+                self.tx_wire(n)
+                written += n
+                sent += n
+                
+            lock.acquire()
+            self._tx_sent = sent
+            done = sent >= self._tx_len[head]
+            if done:
+                self._tx_head = (head + 1) % len(self._tx_slots)
+                self._tx_count -= 1
+                self._tx_sent = 0
+                self.tx_packets += 1
+            lock.release()
+            if not done:
+                break
+                
+        self.tx_bytes += written
+        return written
+        
+    def tx_wire(self, n):
+        """n Bytes wurden an den UART übergeben: ticks_us, zu dem das
+        letzte davon die Leitung verlassen hat
+        
+        Schätzung über die Baudrate - die Bytes starten erst, wenn alles
+        vorher Übergebene aus dem Sendepuffer heraus ist.
+        """
+        now = time.ticks_us()
+        start = self._tx_wire_us
+        if time.ticks_diff(start, now) < 0:
+            start = now
+        self._tx_wire_us = time.ticks_add(start, n * self.tx_byte_us)
+        return self._tx_wire_us
+        
+    def tx_pending(self):
+        """Anzahl wartender Pakete"""
+        return self._tx_count
+        
+    def tx_stats(self):
+        """Sende-Statistik"""
+        return {
+            'pending': self._tx_count,
+            'packets': self.tx_packets,
+            'bytes': self.tx_bytes,
+            'dropped': self.tx_dropped,
+            'busy': self.tx_busy,
+        }
+        
+    def set_filter(self, msg_type, channel_mask):
+        """Kanal-Bitmaske für einen Nachrichtentyp setzen (0 = verwerfen)"""
+        self.accept_mask[(msg_type >> 4) - 8] = channel_mask
+        
+    def poll(self):
+        """Verfügbare Bytes lesen und parsen, gibt Anzahl Nachrichten zurück"""
+        if not self.uart:
+            return 0
+            
+        # Zeitpunkt der letzten Abfrage (für Latenzmessung)
+        self.prev_poll_ticks_us = self.poll_ticks_us
+        self.poll_ticks_us = time.ticks_us()
+        
+        count = 0
+        buf = self._rx_buf
+        while self.uart.any():
+            n = self.uart.readinto(buf)
+            if not n:
+                break
+            self.rx_ticks_us = time.ticks_us()
+            if self.trace:
+                self.trace.midi(buf, n)
+            count += self._parse(buf, n)
+            
+        # Wartende Pakete zwischen zwei vollständigen Nachrichten senden
+        self.flush_tx()
+        return count
+        
+    def _parse(self, buf, n):
+        """Bytes buf[:n] durch die Zustandsmaschine schicken"""
+        dispatched = 0
+        accept = self.accept_mask
+        
+        for i in range(n):
+            byte = buf[i]
+            
+            # Realtime (F8-FF) darf überall auftreten, Running Status bleibt
+            if byte >= 0xF8:
+                if self.on_realtime:
+                    self.on_realtime(byte)
+                continue
+                
+            if byte & 0x80:
+                if self._in_sysex:
+                    self._in_sysex = False
+                    if byte == 0xF7 and not self._sysex_overflow and self.on_sysex:
+                        self.on_sysex(memoryview(self._sysex_buf)[:self._sysex_len])
                     if byte == 0xF7:
-                        break
-                    sysex_data.append(byte)
-                return ('sysex', sysex_data)
+                        continue
+                        
+                if byte == 0xF0:
+                    self._in_sysex = True
+                    self._sysex_len = 0
+                    self._sysex_overflow = not self.accept_sysex
+                    self._status = 0
+                elif byte >= 0xF0:
+                    # System Common: Running Status aufheben, Daten ignorieren
+                    self._status = 0
+                else:
+                    self._status = byte
+                    self._have = 0
+                    self._needed = 1 if byte & 0xE0 == 0xC0 else 2
+                    self._skip = not (accept[(byte >> 4) - 8] >> (byte & 0x0F)) & 1
+                continue
                 
-            elif status & 0xF0 == 0x90:  # Note On
-                note = self.uart.read(1)[0]
-                velocity = self. uart.read(1)[0]
-                channel = status & 0x0F
-                return ('note_on', channel, note, velocity)
+            # Datenbyte
+            if self._in_sysex:
+                if self._sysex_len < len(self._sysex_buf):
+                    self._sysex_buf[self._sysex_len] = byte
+                    self._sysex_len += 1
+                else:
+                    self._sysex_overflow = True
+                continue
                 
-            elif status & 0xF0 == 0x80:  # Note Off
-                note = self.uart.read(1)[0]
-                velocity = self. uart.read(1)[0]
-                channel = status & 0x0F
-                return ('note_off', channel, note, velocity)
+            if not self._status:
+                continue
                 
-            elif status & 0xF0 == 0xB0:  # CC
-                cc = self.uart.read(1)[0]
-                value = self. uart.read(1)[0]
-                channel = status & 0x0F
-                return ('cc', channel, cc, value)
+            if self._have == 0 and self._needed == 2:
+                self._data1 = byte
+                self._have = 1
+                continue
                 
-        except:
-            pass
-            
-        return None
+            # Nachricht vollständig (Running Status bleibt erhalten)
+            self._have = 0
+            if self._skip:
+                self.messages_filtered += 1
+                continue
+                
+            self.messages_received += 1
+            if self.on_message:
+                if self._needed == 2:
+                    self.on_message(self._status, self._data1, byte)
+                else:
+                    self.on_message(self._status, byte, 0)
+                dispatched += 1
+                
+        return dispatched
         
     def detect_devices(self):
         """Angeschlossene Geräte erkennen"""
         # Vereinfachte Erkennung: Identity Request senden
         identity_request = [0x7E, 0x00, 0x06, 0x01]  # Universal SysEx
         self.send_sysex([0x7E], identity_request)
+        self.flush_tx()
         
         # Auf Responses warten
         time.sleep_ms(500)
         responses = []
         
-        while self.uart and self.uart.any():
-            msg = self.read_midi_message()
-            if msg and msg[0] == 'sysex':
-                responses.append(msg[1])
-                
+        previous = self.on_sysex
+        self.on_sysex = lambda data: responses.append(list(data))
+        try:
+            self.poll()
+        finally:
+            self.on_sysex = previous
+            
         return responses
\ No newline at end of file
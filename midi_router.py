@@ -0,0 +1,173 @@
+"""
+MIDI-Routing: Handler-Tabelle nach Nachrichtentyp und Kanal,
+MIDI-Thru/Merge und Abbildung von Noten/CCs auf UI-Aktionen
+"""
+
+from config import MIDI_CONFIG
+import time
+
+class MIDIRouter:
+    """Routing-Tabelle über dem MIDIManager-Parser
+    
+    Handler werden mit handler(channel, data1, data2) aufgerufen - es
+    wird pro Nachricht kein Tupel erzeugt. Die Parser-Filter werden aus
+    der Tabelle abgeleitet: ohne Route (und ohne Thru) wird eine
+    Nachricht schon beim Status-Byte verworfen.
+    
+    Thru leitet vollständige Nachrichten weiter. Eigene Sendungen des
+    Samplers laufen zwischen zwei poll()-Aufrufen und werden dadurch nie
+    mitten in eine weitergeleitete Nachricht gemischt (Merge).
+    """
+    
+    def __init__(self, midi_manager):
+        self.midi = midi_manager
+        
+        # 8 Nachrichtentypen x 16 Kanäle, Eintrag: None oder Handler-Liste
+        self._routes = [None] * 128
+        
+        # UI-Aktionen: (Kanal << 7 | Note/CC) -> action(value)
+        self._note_actions = {}
+        self._cc_actions = {}
+        
+        # Thru
+        self.thru_enabled = MIDI_CONFIG['thru_enabled']
+        self.thru_mask = midi_manager.ALL_CHANNELS
+        self._thru_buf = bytearray(3)
+        self._thru_short = memoryview(self._thru_buf)[:2]
+        
+        # Thru-Latenz (Empfang des Puffers bis das letzte Byte auf der
+        # Leitung ist, inkl. Bytes, die noch vor ihm im Sendepuffer liegen)
+        self.thru_count = 0
+        self.thru_latency_sum_us = 0
+        self.thru_latency_max_us = 0
+        
+        midi_manager.on_message = self.dispatch
+        self._update_filters()
+        
+    def add_route(self, msg_type, channel, handler):
+        """Handler für Nachrichtentyp und Kanal registrieren (None = alle Kanäle)"""
+        base = ((msg_type >> 4) - 8) * 16
+        channels = range(16) if channel is None else (channel,)
+        for ch in channels:
+            handlers = self._routes[base + ch]
+            if handlers is None:
+                self._routes[base + ch] = [handler]
+            elif handler not in handlers:
+                handlers.append(handler)
+        self._update_filters()
+        
+    def remove_route(self, msg_type, channel, handler):
+        """Handler entfernen"""
+        base = ((msg_type >> 4) - 8) * 16
+        channels = range(16) if channel is None else (channel,)
+        for ch in channels:
+            handlers = self._routes[base + ch]
+            if handlers and handler in handlers:
+                handlers.remove(handler)
+                if not handlers:
+                    self._routes[base + ch] = None
+        self._update_filters()
+        
+    def set_thru(self, enabled, channel_mask=None):
+        """MIDI-Thru ein-/ausschalten (optional nur bestimmte Kanäle)"""
+        self.thru_enabled = enabled
+        if channel_mask is not None:
+            self.thru_mask = channel_mask
+        self._update_filters()
+        
+    def _update_filters(self):
+        """Parser-Filter aus Routing-Tabelle und Thru ableiten"""
+        thru = self.thru_mask if self.thru_enabled else 0
+        for type_index in range(8):
+            mask = thru
+            base = type_index * 16
+            for ch in range(16):
+                if self._routes[base + ch]:
+                    mask |= 1 << ch
+            self.midi.accept_mask[type_index] = mask
+            
+        # Note On mit Velocity 0 ist ein Note Off (siehe route()) - der
+        # Parser muss Note On daher auch für Note-Off-Kanäle durchlassen
+        self.midi.accept_mask[1] |= self.midi.accept_mask[0]
+        
+    def map_note(self, channel, note, action):
+        """Note On auf eine UI-Aktion abbilden: action(velocity)"""
+        self._note_actions[(channel << 7) | note] = action
+        self.add_route(self.midi.NOTE_ON, channel, self._on_note_action)
+        
+    def map_cc(self, channel, cc, action):
+        """Controller auf eine UI-Aktion abbilden: action(value)"""
+        self._cc_actions[(channel << 7) | cc] = action
+        self.add_route(self.midi.CC, channel, self._on_cc_action)
+        
+    def _on_note_action(self, channel, note, velocity):
+        if velocity:
+            action = self._note_actions.get((channel << 7) | note)
+            if action:
+                action(velocity)
+                
+    def _on_cc_action(self, channel, cc, value):
+        action = self._cc_actions.get((channel << 7) | cc)
+        if action:
+            action(value)
+            
+    def dispatch(self, status, data1, data2):
+        """Geparste Nachricht weiterleiten (Callback des Parsers)"""
+        self.thru(status, data1, data2)
+        self.route(status, data1, data2)
+        
+    def thru(self, status, data1, data2):
+        """Nachricht per Thru weiterleiten, falls aktiv"""
+        if self.thru_enabled and (self.thru_mask >> (status & 0x0F)) & 1:
+            self._forward(status, data1, data2)
+            
+    def route(self, status, data1, data2):
+        """Registrierte Handler aufrufen"""
+        channel = status & 0x0F
+        
+        # Note On mit Velocity 0 = Note Off
+        if status & 0xF0 == 0x90 and data2 == 0:
+            status = 0x80 | channel
+            
+        handlers = self._routes[((status >> 4) - 8) * 16 + channel]
+        if handlers:
+            for handler in handlers:
+                handler(channel, data1, data2)
+                
+    def _forward(self, status, data1, data2):
+        """Nachricht unverändert an den Ausgang weiterleiten"""
+        uart = self.midi.uart
+        if not uart:
+            return
+            
+        buf = self._thru_buf
+        buf[0] = status
+        buf[1] = data1
+        if status & 0xE0 == 0xC0:
+            uart.write(self._thru_short)
+            wire = self.midi.tx_wire(2)
+        else:
+            buf[2] = data2
+            uart.write(buf)
+            wire = self.midi.tx_wire(3)
+            
+        latency = time.ticks_diff(wire, self.midi.rx_ticks_us)
+        self.thru_count += 1
+        self.thru_latency_sum_us += latency
+        if latency > self.thru_latency_max_us:
+            self.thru_latency_max_us = latency
+            
+    def poll(self):
+        """Eingang verarbeiten (im Hauptloop aufrufen)"""
+        return self.midi.poll()
+        
+    def stats(self):
+        """Routing-Statistik"""
+        count = self.thru_count
+        return {
+            'received': self.midi.messages_received,
+            'filtered': self.midi.messages_filtered,
+            'thru': count,
+            'thru_latency_avg_us': self.thru_latency_sum_us // count if count else 0,
+            'thru_latency_max_us': self.thru_latency_max_us,
+        }
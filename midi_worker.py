@@ -0,0 +1,179 @@
+"""
+MIDI-Worker: UART-Empfang, Thru, Sendungen und Sample-Uploads in einem
+zweiten Thread, damit lange Uploads die Bildwiederholung nicht blockieren
+"""
+
+import _thread
+import select
+import time
+from config import MIDI_CONFIG
+from utils.queue import BoundedQueue
+from utils.power import WakeEvent
+
+class MIDIWorker:
+    """Besitzt den UART, solange er läuft
+    
+    Aufteilung der Arbeit:
+        Worker-Thread:  poll() + Parser, MIDI-Clock, Thru, flush_tx(),
+                        Upload-Aufträge (SD lesen + SysEx senden)
+        UI-Thread:      process_events() -> Routing-Handler, Slot-Status
+        
+    Zwischen den Threads liegen nur Queues:
+        events  Worker -> UI   Nachricht gepackt als int (status<<16|d1<<8|d2)
+                               oder ('upload', slot, ok)
+        jobs    UI -> Worker   Slot-Nummern zum Hochladen
+        Senden  beide          Paket-Queue des MIDIManager (mit Lock)
+        
+    Das Slot-Modell und alle Widgets werden ausschließlich im UI-Thread
+    verändert. Unter MicroPython teilen sich beide Threads den GIL - echt
+    parallel laufen nur blockierende UART-Zugriffe. Die SD-Karte (SPI-
+    Treiber + FatFs) ist nicht reentrant: jeder Dateizugriff beider
+    Threads läuft einzeln unter drivers.sdcard.sd_lock.
+    """
+    
+    IDLE_SLEEP_MS = 1
+    TX_POLL_MS = 1
+    
+    def __init__(self, midi_manager, router, sample_manager):
+        self.midi = midi_manager
+        self.router = router
+        self.sample_manager = sample_manager
+        
+        self.events = BoundedQueue(MIDI_CONFIG['event_queue'])
+        self.jobs = BoundedQueue(MIDI_CONFIG['job_queue'])
+        
+        # Benachrichtigung an den UI-Thread, sobald Events anliegen
+        self.on_event = None
+        
+        # Ohne Arbeit auf UART-Daten oder neue Aufträge warten statt im 1ms-Takt
+        self.job_event = WakeEvent()
+        self._poller = None
+        try:
+            poller = select.poll()
+            poller.register(midi_manager.uart, select.POLLIN)
+            poller.register(self.job_event, select.POLLIN)
+            self._poller = poller
+        except Exception:
+            pass
+            
+        self.running = False
+        self._stopped = True
+        self.idle_waits = 0
+        self.uploads_done = 0
+        self.uploads_failed = 0
+        
+    # ===== Worker-Thread =====
+    
+    def _on_message(self, status, data1, data2):
+        """Parser-Callback im Worker: Thru sofort, Routing im UI-Thread"""
+        self.router.thru(status, data1, data2)
+        self.events.put((status << 16) | (data1 << 8) | data2)
+        if self.on_event:
+            self.on_event()
+            
+    def _idle(self):
+        """Warten, bis UART-Daten oder ein Auftrag ankommen"""
+        self.idle_waits += 1
+        if not self._poller:
+            time.sleep_ms(self.IDLE_SLEEP_MS)
+            return
+        # Wartende Pakete brauchen kurze Abstände für flush_tx()
+        timeout = self.TX_POLL_MS if self.midi.tx_pending() else MIDI_CONFIG['worker_idle_ms']
+        self._poller.poll(timeout)
+        self.job_event.clear()
+        
+    def _run(self):
+        while self.running:
+            try:
+                # Empfang + Sende-Queue (flush_tx läuft in poll mit)
+                received = self.midi.poll()
+                
+                slot = self.jobs.get()
+                if slot is not None:
+                    ok = self.sample_manager.transfer_slot(slot)
+                    self.events.put(('upload', slot, ok))
+                    if self.on_event:
+                        self.on_event()
+                elif not received:
+                    self._idle()
+                    
+            except Exception as e:
+                print(f"MIDI Worker Error: {e}")
+                time.sleep_ms(100)
+                
+        self._stopped = True
+        
+    # ===== UI-Thread =====
+    
+    def start(self):
+        """Worker-Thread starten und UART-Empfang übernehmen"""
+        if self.running:
+            return True
+        try:
+            self.midi.on_message = self._on_message
+            self.running = True
+            self._stopped = False
+            _thread.start_new_thread(self._run, ())
+            print("✓ MIDI Worker gestartet")
+            return True
+        except Exception as e:
+            print(f"✗ MIDI Worker Fehler: {e}")
+            self.running = False
+            self._stopped = True
+            self.midi.on_message = self.router.dispatch
+            return False
+            
+    def stop(self, timeout_ms=1000):
+        """Worker beenden, danach läuft MIDI wieder im Hauptloop"""
+        self.running = False
+        self.job_event.set()
+        start = time.ticks_ms()
+        while not self._stopped and time.ticks_diff(time.ticks_ms(), start) < timeout_ms:
+            time.sleep_ms(10)
+        self.midi.on_message = self.router.dispatch
+        
+    def submit_upload(self, slot_number):
+        """Upload eines Slots beim Worker beauftragen"""
+        if self.jobs.put(slot_number):
+            self.job_event.set()
+            return True
+        return False
+        
+    def pending_uploads(self):
+        return len(self.jobs)
+        
+    def process_events(self, max_events=32):
+        """Nachrichten des Workers verarbeiten (im Hauptloop aufrufen)"""
+        route = self.router.route
+        processed = 0
+        while processed < max_events:
+            event = self.events.get()
+            if event is None:
+                break
+            if isinstance(event, int):
+                route(event >> 16, (event >> 8) & 0x7F, event & 0x7F)
+            else:
+                _, slot, ok = event
+                if ok:
+                    self.sample_manager.slots.set_status(slot, self.sample_manager.slots.UPLOADED)
+                    self.uploads_done += 1
+                else:
+                    # Wieder vormerken, der nächste "Upload All" versucht es erneut
+                    pending = self.sample_manager.pending_uploads
+                    if slot not in pending:
+                        pending.append(slot)
+                    self.uploads_failed += 1
+            processed += 1
+        return processed
+        
+    def stats(self):
+        """Queue-Füllstände, Verluste und Lock-Konkurrenz"""
+        return {
+            'running': self.running,
+            'idle_waits': self.idle_waits,
+            'uploads_done': self.uploads_done,
+            'uploads_failed': self.uploads_failed,
+            'events': self.events.stats(),
+            'tx': self.midi.tx_stats(),
+            'jobs': self.jobs.stats(),
+        }
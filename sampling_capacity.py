@@ -0,0 +1,171 @@
+"""
+Kapazitätsplanung für den Sample-Speicher des Circuit Tracks
+Berechnet aus den Format-Angaben (Sample-Index bzw. WAV-Header) die Größe
+jedes Slots nach der Wandlung ins Geräteformat - ohne Sample-Daten zu
+lesen - und schlägt bei Überlauf Kürzen oder niedrigere Raten vor
+"""
+
+from array import array
+from config import CIRCUIT_TRACKS_CONFIG, SAMPLING_CONFIG
+from drivers.sdcard import sd_open
+from sampling import wav
+
+class CapacityPlanner:
+    """Speicherbedarf der Slot-Belegung, inkrementell nachgeführt
+    
+    Pro Slot werden Frames und Samplerate der Quelle gehalten, daraus die
+    Größe im Geräteformat (mono, 16 Bit, Geräte-Samplerate). Die Summe
+    wird bei jeder Änderung angepasst, check() für eine Vorschau beim
+    Ziehen ist daher O(1). plan() sortiert einmal die 64 Größen.
+    """
+    
+    def __init__(self, slots):
+        self.slots = slots
+        self.rate = CIRCUIT_TRACKS_CONFIG['sample_rate']
+        self.budget = CIRCUIT_TRACKS_CONFIG['sample_memory']
+        self.max_bytes = CIRCUIT_TRACKS_CONFIG['max_sample_size']
+        # Niedrigere Raten für Vorschläge, absteigend
+        self.rates = sorted((r for r in SAMPLING_CONFIG['plan_rates'] if r < self.rate), reverse=True)
+        
+        n = len(slots)
+        self.frames = array('I', [0] * n)
+        self.source_rate = array('I', [0] * n)
+        self.bytes = array('I', [0] * n)
+        self.known = bytearray(n)
+        self._path_index = array('h', [-1] * n)
+        self.total = 0
+        
+        # Statistik
+        self.headers_read = 0
+        
+        slots.subscribe_all(self._on_slot_changed)
+        
+    # ===== Slot-Daten =====
+    
+    def converted_size(self, frames, rate, target_rate=None):
+        """Bytes nach der Wandlung (mono, 16 Bit) auf target_rate"""
+        if not rate:
+            return 0
+        return frames * (target_rate or self.rate) // rate * 2
+        
+    def _set(self, slot_number, frames, rate):
+        self.total -= self.bytes[slot_number]
+        self.frames[slot_number] = frames
+        self.source_rate[slot_number] = rate
+        size = self.converted_size(frames, rate)
+        self.bytes[slot_number] = size
+        self.total += size
+        self.known[slot_number] = 1
+        
+    def _on_slot_changed(self, slot_number):
+        """Beobachter des Slot-Modells: neues Sample -> Daten ungültig"""
+        index = self.slots.path_index[slot_number]
+        if index == self._path_index[slot_number] and self.known[slot_number]:
+            return
+        self._path_index[slot_number] = index
+        self.total -= self.bytes[slot_number]
+        self.bytes[slot_number] = 0
+        self.known[slot_number] = 0
+        if index < 0:
+            self.frames[slot_number] = 0
+            self.source_rate[slot_number] = 0
+            self.known[slot_number] = 1
+            
+    def _frames_of(self, info, path, fallback_size):
+        """(Frames, Samplerate) aus Index-Eintrag, sonst aus dem WAV-Header"""
+        if info and info.get('rate'):
+            frame_bytes = max(1, info['channels'] * info['bits'] // 8)
+            return info['data_size'] // frame_bytes, info['rate']
+        try:
+            with sd_open(path, 'rb') as f:
+                header = wav.read_info(f)
+            self.headers_read += 1
+            frame_bytes = max(1, header['channels'] * header['bits'] // 8)
+            return header['size'] // frame_bytes, header['rate']
+        except (OSError, ValueError):
+            # Unbekanntes Format: Datei als 16 Bit mono rechnen
+            return fallback_size // 2, self.rate
+            
+    def set_info(self, slot_number, info=None):
+        """Format-Angaben eines zugewiesenen Slots übernehmen (Index-Eintrag)"""
+        path = self.slots.path(slot_number)
+        if path is None:
+            self._set(slot_number, 0, 0)
+            return
+        frames, rate = self._frames_of(info, path, self.slots.size[slot_number])
+        self._set(slot_number, frames, rate)
+        
+    def _refresh(self):
+        """Slots ohne Angaben (z.B. aus dem Journal) aus dem Header ergänzen"""
+        for slot_number in range(len(self.known)):
+            if not self.known[slot_number]:
+                self.set_info(slot_number)
+                
+    # ===== Auswertung =====
+    
+    def check(self, slot_number, info):
+        """Vorschau: passt die Belegung, wenn info auf slot_number landet?
+        
+        Gibt (passt, belegte Bytes danach) zurück.
+        """
+        self._refresh()
+        frames, rate = self._frames_of(info, info['path'], info.get('size', 0))
+        used = self.total - self.bytes[slot_number] + self.converted_size(frames, rate)
+        return used <= self.budget, used
+        
+    def _water_level(self, sizes, budget):
+        """Größte Obergrenze, bei der sum(min(size, level)) <= budget"""
+        ordered = sorted(s for s in sizes if s)
+        remaining = budget
+        count = len(ordered)
+        for i, size in enumerate(ordered):
+            share = remaining // (count - i)
+            if size > share:
+                return share
+            remaining -= size
+        return self.max_bytes
+        
+    def plan(self):
+        """Belegung bewerten und bei Überlauf Vorschläge machen
+        
+        'truncate': (Slot, Bytes) - nur die längsten Samples werden auf eine
+                    gemeinsame Länge gekürzt
+        'rate':     (Slot, Rate, Bytes) - niedrigste nötige Stufe aus
+                    plan_rates, bei Bedarf zusätzlich gekürzt
+        Samples über max_sample_size erscheinen immer in 'oversize'.
+        """
+        self._refresh()
+        sizes = self.bytes
+        oversize = [slot for slot in range(len(sizes)) if sizes[slot] > self.max_bytes]
+        result = {
+            'used': self.total,
+            'budget': self.budget,
+            'free': self.budget - self.total,
+            'percent': self.total * 100 // self.budget,
+            'fits': self.total <= self.budget and not oversize,
+            'oversize': oversize,
+            'truncate': [],
+            'rate': [],
+        }
+        if result['fits']:
+            return result
+            
+        level = min(self._water_level(sizes, self.budget), self.max_bytes)
+        result['level'] = level
+        for slot in range(len(sizes)):
+            size = sizes[slot]
+            if size <= level:
+                continue
+            result['truncate'].append((slot, level))
+            
+            # Höchste Rate, mit der das Sample unter die Grenze passt
+            frames = self.frames[slot]
+            source_rate = self.source_rate[slot]
+            choice = self.rates[-1] if self.rates else self.rate
+            for rate in self.rates:
+                if self.converted_size(frames, source_rate, rate) <= level:
+                    choice = rate
+                    break
+            result['rate'].append((slot, choice,
+                                   min(self.converted_size(frames, source_rate, choice), level)))
+        return result
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Append-only Session-Journal für Slot-Zuweisungen
+Jede Slot-Änderung wird als kleiner Datensatz angehängt, regelmäßig zu
+einem Snapshot verdichtet und beim Start ohne Zugriff auf die
+Sample-Dateien wieder eingespielt
+"""
+
+import struct
+import time
+from config import PATHS, SAMPLING_CONFIG
+from drivers.sdcard import sd_open, sd_remove, sd_rename, sd_lock
+
+class SessionJournal:
+    """Journal + Snapshot der Slot-Belegung"""
+    
+    MAGIC = b'CYSJ'
+    VERSION = 1
+    
+    OP_ASSIGN = 1
+    OP_CLEAR = 2
+    
+    # Datensatz: Operation, Slot, Status, Größe, Pfadlänge (+ Pfad)
+    RECORD_FMT = '<BBBIB'
+    RECORD_SIZE = struct.calcsize(RECORD_FMT)
+    
+    def __init__(self, journal_path=None, snapshot_path=None):
+        self.journal_path = journal_path or PATHS['journal']
+        self.snapshot_path = snapshot_path or PATHS['snapshot']
+        self.flush_ms = SAMPLING_CONFIG['journal_flush_ms']
+        self.compact_bytes = SAMPLING_CONFIG['journal_compact_bytes']
+        self.model = None
+        
+        # Schreibpuffer im RAM (schont die SD-Karte)
+        self._buf = bytearray(512)
+        self._buf_len = 0
+        self._first_pending = 0
+        self.journal_size = 0
+        self._torn = False
+        
+        # Statistik
+        self.records_written = 0
+        self.flushes = 0
+        self.compactions = 0
+        
+    # ===== Wiederherstellen =====
+    
+    def _read_file(self, path):
+        """Datei komplett lesen, None wenn nicht vorhanden"""
+        try:
+            with sd_open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+            
+    def _apply(self, data, model):
+        """Datensätze aus data auf das Slot-Modell anwenden"""
+        if not data:
+            return 0
+        if data[:4] != self.MAGIC or data[4] != self.VERSION:
+            self._torn = True
+            return 0
+            
+        applied = 0
+        pos = 5
+        end = len(data)
+        while pos + self.RECORD_SIZE <= end:
+            op, slot, status, size, path_len = struct.unpack_from(self.RECORD_FMT, data, pos)
+            pos += self.RECORD_SIZE
+            if pos + path_len > end:
+                break
+                
+            if model.is_valid(slot):
+                if op == self.OP_ASSIGN:
+                    path = str(data[pos:pos + path_len], 'utf-8')
+                    model.assign(slot, path, size, status)
+                elif op == self.OP_CLEAR:
+                    model.clear(slot)
+            pos += path_len
+            applied += 1
+            
+        if pos < end:
+            # Abgeschnittener letzter Datensatz (Stromausfall)
+            self._torn = True
+            
+        return applied
+        
+    def replay(self, model):
+        """Snapshot + Journal einspielen, gibt Anzahl Datensätze zurück"""
+        snapshot = self._read_file(self.snapshot_path)
+        if snapshot is None:
+            # Abbruch während der Verdichtung: fertigen Snapshot übernehmen
+            snapshot = self._read_file(self.snapshot_path + '.tmp')
+            
+        applied = self._apply(snapshot, model)
+        
+        journal = self._read_file(self.journal_path)
+        applied += self._apply(journal, model)
+        self.journal_size = len(journal) if journal else 0
+        
+        return applied
+        
+    # ===== Aufzeichnen =====
+    
+    def attach(self, model):
+        """Slot-Änderungen des Modells ab jetzt aufzeichnen"""
+        self.model = model
+        model.subscribe_all(self.on_slot_changed)
+        
+        # Beschädigtes Journal sofort durch sauberen Snapshot ersetzen,
+        # damit neue Datensätze nicht hinter einem Fragment landen
+        if self._torn:
+            self._torn = False
+            self.compact()
+        
+    def on_slot_changed(self, slot_number):
+        """Aktuellen Zustand eines Slots als Datensatz puffern"""
+        model = self.model
+        path = model.path(slot_number)
+        encoded = path.encode() if path else b''
+        if len(encoded) > 255:
+            return
+            
+        needed = self.RECORD_SIZE + len(encoded)
+        if self._buf_len + needed > len(self._buf):
+            self.flush()
+            
+        if not self._buf_len:
+            self._first_pending = time.ticks_ms()
+            
+        op = self.OP_ASSIGN if path else self.OP_CLEAR
+        struct.pack_into(self.RECORD_FMT, self._buf, self._buf_len, op, slot_number,
+                         model.status[slot_number], model.size[slot_number], len(encoded))
+        self._buf_len += self.RECORD_SIZE
+        self._buf[self._buf_len:self._buf_len + len(encoded)] = encoded
+        self._buf_len += len(encoded)
+        self.records_written += 1
+        
+    def tick(self):
+        """Im Hauptloop aufrufen: Puffer nach flush_ms schreiben
+        
+        Ist die SD-Karte gerade belegt (Upload im MIDI-Worker), wird es
+        im nächsten Frame erneut versucht statt zu warten.
+        """
+        if (self._buf_len and not sd_lock.locked()
+                and time.ticks_diff(time.ticks_ms(), self._first_pending) >= self.flush_ms):
+            self.flush()
+            
+    def flush(self):
+        """Gepufferte Datensätze gesammelt an das Journal anhängen"""
+        if not self._buf_len:
+            return
+            
+        with sd_open(self.journal_path, 'ab') as f:
+            if not self.journal_size:
+                f.write(self.MAGIC)
+                f.write(bytes([self.VERSION]))
+                self.journal_size = 5
+            f.write(memoryview(self._buf)[:self._buf_len])
+            
+        self.journal_size += self._buf_len
+        self._buf_len = 0
+        self.flushes += 1
+        
+        if self.journal_size >= self.compact_bytes:
+            self.compact()
+            
+    def compact(self):
+        """Aktuellen Zustand als Snapshot schreiben und Journal leeren"""
+        model = self.model
+        tmp_path = self.snapshot_path + '.tmp'
+        
+        with sd_open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(bytes([self.VERSION]))
+            record = bytearray(self.RECORD_SIZE)
+            for slot in range(len(model)):
+                path = model.path(slot)
+                if not path:
+                    continue
+                encoded = path.encode()
+                struct.pack_into(self.RECORD_FMT, record, 0, self.OP_ASSIGN, slot,
+                                 model.status[slot], model.size[slot], len(encoded))
+                f.write(record)
+                f.write(encoded)
+                
+        # Reihenfolge so, dass ein Abbruch immer einen gültigen Stand hinterlässt
+        try:
+            sd_remove(self.snapshot_path)
+        except OSError:
+            pass
+        sd_rename(tmp_path, self.snapshot_path)
+        try:
+            sd_remove(self.journal_path)
+        except OSError:
+            pass
+            
+        self.journal_size = 0
+        self.compactions += 1
@@ -0,0 +1,193 @@
+"""
+Kompakter Sample-Index auf der SD-Karte
+Datensätze fester Länge erlauben wahlfreien Zugriff, ohne die komplette
+Dateiliste im RAM zu halten (wichtig bei tausenden Samples)
+"""
+
+import struct
+from config import PATHS, SAMPLING_CONFIG
+from drivers.sdcard import sd_open, sd_stat, sd_remove, sd_rename, sd_ilistdir
+from sampling import wav
+
+class SampleIndex:
+    """Sample-Index mit Datensätzen fester Länge"""
+    
+    MAGIC = b'CYSI'
+    VERSION = 2
+    
+    # Header: Magic, Version, Datensatzgröße, Anzahl Einträge
+    HEADER_FMT = '<4sHHI'
+    HEADER_SIZE = struct.calcsize(HEADER_FMT)
+    
+    # Datensatz: Dateigröße, PCM-Bytes, Samplerate, Kanäle, Bits,
+    # Dateiname (UTF-8, mit 0 aufgefüllt). Samplerate 0 = Format unbekannt
+    NAME_LEN = 56
+    RECORD_FMT = '<IIIBB56s'
+    RECORD_SIZE = struct.calcsize(RECORD_FMT)
+    
+    def __init__(self, directory=None, index_path=None):
+        self.directory = directory or PATHS['samples']
+        self.index_path = index_path or PATHS['sample_index']
+        self.count = 0
+        self._file = None
+        self._record = bytearray(self.RECORD_SIZE)
+        self.headers_read = 0
+        
+    def __len__(self):
+        return self.count
+        
+    @staticmethod
+    def is_sample_file(name):
+        """Prüfe, ob Dateiname ein unterstütztes Format hat"""
+        name = name.lower()
+        for ext in SAMPLING_CONFIG['supported_formats']:
+            if name.endswith(ext):
+                return True
+        return False
+        
+    def _audio_info(self, path):
+        """PCM-Bytes, Samplerate, Kanäle, Bits aus dem Datei-Header"""
+        try:
+            with sd_open(path, 'rb') as f:
+                info = wav.read_info(f)
+            return info['size'], info['rate'], info['channels'], info['bits']
+        except (OSError, ValueError):
+            return 0, 0, 0, 0
+            
+    def _previous(self, old, position, size, encoded):
+        """Audio-Daten aus dem alten Index, wenn Datei dort gleich war"""
+        if not old:
+            return None
+        try:
+            old.seek(self.HEADER_SIZE + position * self.RECORD_SIZE)
+            if old.readinto(self._record) != self.RECORD_SIZE:
+                return None
+        except OSError:
+            return None
+        values = struct.unpack(self.RECORD_FMT, self._record)
+        if values[0] != size or values[5].rstrip(b'\x00') != encoded:
+            return None
+        return values[1:5]
+        
+    def _open_previous(self):
+        """Alten Index zum Wiederverwenden der Audio-Daten öffnen"""
+        try:
+            old = sd_open(self.index_path, 'rb')
+        except OSError:
+            return None
+        header = old.read(self.HEADER_SIZE)
+        if (len(header) == self.HEADER_SIZE
+                and struct.unpack(self.HEADER_FMT, header)[:3] == (self.MAGIC, self.VERSION, self.RECORD_SIZE)):
+            return old
+        old.close()
+        return None
+        
+    def build(self):
+        """Index aus dem Sample-Verzeichnis neu aufbauen (streamend)
+        
+        Format-Angaben werden nur für neue oder geänderte Dateien aus dem
+        Header gelesen - unveränderte übernimmt der Index von der gleichen
+        Position im alten Index (Verzeichnisreihenfolge ist stabil).
+        """
+        self.close()
+        tmp_path = self.index_path + '.tmp'
+        count = 0
+        old = self._open_previous()
+        self.headers_read = 0
+        
+        with sd_open(tmp_path, 'wb') as f:
+            f.write(struct.pack(self.HEADER_FMT, self.MAGIC, self.VERSION,
+                                self.RECORD_SIZE, 0))
+                                
+            for entry in sd_ilistdir(self.directory):
+                name, entry_type = entry[0], entry[1]
+                if entry_type != 0x8000 or not self.is_sample_file(name):
+                    continue
+                    
+                encoded = name.encode()
+                if len(encoded) > self.NAME_LEN:
+                    # Zu lange Namen können nicht adressiert werden
+                    continue
+                    
+                if len(entry) > 3:
+                    size = entry[3]
+                else:
+                    size = sd_stat(f"{self.directory}/{name}")[6]
+                    
+                audio = self._previous(old, count, size, encoded)
+                if audio is None:
+                    audio = self._audio_info(f"{self.directory}/{name}")
+                    self.headers_read += 1
+                    
+                f.write(struct.pack(self.RECORD_FMT, size, audio[0], audio[1],
+                                    audio[2], audio[3], encoded))
+                count += 1
+                
+            # Anzahl im Header nachtragen
+            f.seek(0)
+            f.write(struct.pack(self.HEADER_FMT, self.MAGIC, self.VERSION,
+                                self.RECORD_SIZE, count))
+                                
+        if old:
+            old.close()
+            
+        try:
+            sd_remove(self.index_path)
+        except OSError:
+            pass
+        sd_rename(tmp_path, self.index_path)
+        
+        return self.open()
+        
+    def open(self):
+        """Bestehenden Index öffnen und Header prüfen"""
+        self.close()
+        try:
+            self._file = sd_open(self.index_path, 'rb')
+            header = self._file.read(self.HEADER_SIZE)
+            magic, version, record_size, count = struct.unpack(self.HEADER_FMT, header)
+        except (OSError, ValueError):
+            self.close()
+            return False
+            
+        if (magic != self.MAGIC or version != self.VERSION
+                or record_size != self.RECORD_SIZE):
+            self.close()
+            return False
+            
+        self.count = count
+        return True
+        
+    def close(self):
+        """Index-Datei schließen"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        self.count = 0
+        
+    def read_range(self, start, count):
+        """Einträge [start, start + count) als Liste von Dicts lesen"""
+        if not self._file or start >= self.count:
+            return []
+            
+        start = max(0, start)
+        count = min(count, self.count - start)
+        self._file.seek(self.HEADER_SIZE + start * self.RECORD_SIZE)
+        
+        entries = []
+        record = self._record
+        for _ in range(count):
+            self._file.readinto(record)
+            size, data_size, rate, channels, bits, raw_name = struct.unpack(self.RECORD_FMT, record)
+            end = raw_name.find(b'\x00')
+            name = (raw_name if end < 0 else raw_name[:end]).decode()
+            entries.append({
+                'name': name,
+                'path': f"{self.directory}/{name}",
+                'size': size,
+                'data_size': data_size,
+                'rate': rate,
+                'channels': channels,
+                'bits': bits,
+            })
+        return entries
@@ -2,8 +2,13 @@
 Zentrale Sample-Verwaltung und Slot-Zuordnung
 """
 
-from config import CIRCUIT_TRACKS_CONFIG
-import gc
+from config import CIRCUIT_TRACKS_CONFIG, SAMPLING_CONFIG
+from sampling.slot_model import SlotModel
+from sampling.journal import SessionJournal
+from sampling.slicer import SampleSlicer
+from sampling.upload_cache import UploadCache
+from sampling.capacity import CapacityPlanner
+import time
 
 class SampleManager:
     """Sample-Verwaltung"""
@@ -11,75 +16,204 @@ class SampleManager:
     def __init__(self, sd_manager, midi_controller):
         self.sd_manager = sd_manager
         self. midi_controller = midi_controller
-        self.slots = {}  # slot_number -> sample_info
+        # Einzige Quelle für den Slot-Zustand (keine Sample-Bytes im RAM)
+        self.slots = SlotModel(CIRCUIT_TRACKS_CONFIG['num_slots'])
         self.pending_uploads = []
+        self.slice_count = 0
         
-        # Slots initialisieren
-        for i in range(CIRCUIT_TRACKS_CONFIG['num_slots']):
-            self. slots[i] = {
-                'name': None,
-                'data': None,
-                'size': 0,
-                'status': 'empty'  # empty, loaded, uploaded
-            }
+        # Speicherbedarf im Gerät (folgt dem Slot-Modell)
+        self.planner = CapacityPlanner(self.slots)
+        
+        # Fertig kodierte Uploads auf der SD-Karte
+        self.upload_cache = None
+        if SAMPLING_CONFIG['upload_cache']:
+            self.upload_cache = UploadCache(midi_controller.UPLOAD_FORMAT,
+                                            midi_controller.UPLOAD_PROTOCOL)
+        
+        # Letzte Session wiederherstellen, danach Änderungen aufzeichnen
+        self.journal = SessionJournal()
+        self.restore_ms = 0
+        self.restore_session()
+        self.journal.attach(self.slots)
+        
+    def restore_session(self):
+        """Slot-Belegung aus dem Journal wiederherstellen (ohne Sample-Dateien)"""
+        start = time.ticks_ms()
+        try:
+            records = self.journal.replay(self.slots)
+        except Exception as e:
+            print(f"✗ Session-Journal Fehler: {e}")
+            return 0
+            
+        # Noch nicht hochgeladene Slots wieder vormerken
+        for slot_number in range(len(self.slots)):
+            if self.slots.status[slot_number] == SlotModel.LOADED:
+                self.pending_uploads.append(slot_number)
+                
+        self.restore_ms = time.ticks_diff(time.ticks_ms(), start)
+        if records:
+            print(f"✓ Session wiederhergestellt: {records} Einträge in {self.restore_ms} ms")
+        return records
+        
+    def tick(self):
+        """Im Hauptloop aufrufen (verzögertes Schreiben des Journals)"""
+        self.journal.tick()
+        
+    def flush(self):
+        """Journal sofort schreiben (z.B. vor dem Beenden)"""
+        self.journal.flush()
             
-    def assign_sample_to_slot(self, slot_number, sample_path):
-        """Sample einem Slot zuweisen"""
-        if slot_number not in self. slots:
+    def assign_sample_to_slot(self, slot_number, sample_path, info=None):
+        """Sample einem Slot zuweisen (info: Eintrag aus dem Sample-Index)"""
+        if not self.slots.is_valid(slot_number):
             return False
             
-        # Sample von SD-Karte lesen
-        sample_data = self.sd_manager.read_sample(sample_path)
-        if not sample_data:
+        # Nur Größe prüfen - Daten werden erst beim Upload gelesen
+        size = self.sd_manager.get_file_size(sample_path)
+        if not size:
             return False
             
-        # Im Slot speichern
-        filename = sample_path.split('/')[-1]
-        self.slots[slot_number] = {
-            'name': filename,
-            'data': sample_data,
-            'size': len(sample_data),
-            'status': 'loaded'
-        }
+        self.slots.assign(slot_number, sample_path, size, SlotModel.LOADED)
+        self.planner.set_info(slot_number, info)
         
         # Zum Upload-Queue hinzufügen
-        self.pending_uploads.append(slot_number)
-        
-        gc.collect()
+        if slot_number not in self.pending_uploads:
+            self.pending_uploads.append(slot_number)
+            
         return True
         
     def upload_slot(self, slot_number):
         """Slot zum Circuit Tracks hochladen"""
-        slot_data = self.slots. get(slot_number)
-        if not slot_data or not slot_data['data']:
+        if self.transfer_slot(slot_number):
+            self.slots.set_status(slot_number, SlotModel.UPLOADED)
+            return True
+        return False
+        
+    def transfer_slot(self, slot_number):
+        """Sample lesen und senden, ohne das Slot-Modell zu ändern
+        
+        Kann im MIDI-Worker-Thread laufen - der Status wird danach im
+        UI-Thread gesetzt.
+        """
+        if not self.slots.is_valid(slot_number):
             return False
             
+        sample_path = self.slots.path(slot_number)
+        if not sample_path:
+            return False
+            
+        cache = self.upload_cache
+        start = time.ticks_us()
+        key = cache.key(sample_path) if cache else None
+        
+        # Treffer: gespeicherte Rahmen direkt senden
+        entry = cache.open(key) if key else None
+        if entry:
+            f, frames = entry
+            try:
+                success = self.midi_controller.upload_cached(f, frames, slot_number)
+            finally:
+                f.close()
+            cache.record(True, start)
+            return success
+            
+        # Fehlschlag: nur die Bytes lesen, die der Upload sendet
+        sample_data = self.midi_controller.upload_data
+        length = self.sd_manager.read_into(sample_path, sample_data)
+        if not length:
+            return False
+            
+        capture = cache.begin(key) if key else None
         success = self.midi_controller.upload_sample_to_slot(
-            slot_data['data'],
-            slot_number
+            memoryview(sample_data)[:length],
+            slot_number,
+            capture
         )
+        if capture:
+            if success:
+                capture.commit()
+            else:
+                capture.abort()
+            cache.record(False, start)
+        return success
         
-        if success:
-            slot_data['status'] = 'uploaded'
-            return True
-            
-        return False
+    def check_capacity(self, slot_number, info):
+        """Vorschau für Drag & Drop: (passt, belegte Bytes danach)"""
+        return self.planner.check(slot_number, info)
+        
+    def plan_capacity(self):
+        """Speicherbedarf aller Slots prüfen, bei Überlauf mit Vorschlägen"""
+        return self.planner.plan()
+        
+    def cache_stats(self):
+        """Statistik des Upload-Caches (None = deaktiviert)"""
+        return self.upload_cache.stats() if self.upload_cache else None
+        
+    def upload_all_pending(self, only=None):
+        """Alle ausstehenden Slots hochladen (only: nur diese Slots)
         
-    def upload_all_pending(self):
-        """Alle ausstehenden Slots hochladen"""
-        for slot_num in self.pending_uploads:
-            self.upload_slot(slot_num)
-        self.pending_uploads.clear()
+        Fehlgeschlagene Slots bleiben vorgemerkt, gibt die Anzahl der
+        erfolgreichen Uploads zurück.
+        """
+        done = 0
+        for slot_num in [s for s in self.pending_uploads if only is None or s in only]:
+            if self.upload_slot(slot_num):
+                self.pending_uploads.remove(slot_num)
+                done += 1
+        return done
         
     def get_slot_info(self, slot_number):
         """Slot-Informationen abrufen"""
-        return self.slots.get(slot_number)
+        if not self.slots.is_valid(slot_number):
+            return None
+        return self.slots.info(slot_number)
         
     def clear_slot(self, slot_number):
         """Slot leeren"""
-        self.slots[slot_number] = {
-            'name': None,
-            'data': None,
-            'size': 0,
-            'status': 'empty'
-        }
\ No newline at end of file
+        if not self.slots.is_valid(slot_number):
+            return
+        self.slots.clear(slot_number)
+        if slot_number in self.pending_uploads:
+            self.pending_uploads.remove(slot_number)
+            
+    def auto_slice(self, sample_path, first_slot=0, progress=None):
+        """Langes Sample an Transienten zerlegen und ab first_slot zuweisen
+        
+        Die Slices landen als eigene Dateien im Sample-Verzeichnis und
+        werden fortlaufenden Slots zugewiesen. Gibt die Anzahl zurück.
+        progress: siehe SampleSlicer.slice()
+        """
+        for step in self.slice_steps(sample_path, first_slot):
+            if progress:
+                progress(*step)
+        return self.slice_count
+        
+    def slice_steps(self, sample_path, first_slot=0):
+        """auto_slice() als Generator für den Hauptloop
+        
+        Liefert pro Leseblock (stage, done, total), die Slots werden erst
+        nach dem letzten Schritt zugewiesen. Die Anzahl steht danach in
+        slice_count (0 = fehlgeschlagen).
+        """
+        self.slice_count = 0
+        if not self.slots.is_valid(first_slot):
+            return
+            
+        slicer = SampleSlicer()
+        try:
+            yield from slicer.slice_steps(sample_path, len(self.slots) - first_slot)
+        except (OSError, ValueError) as e:
+            print(f"✗ Slicen fehlgeschlagen: {e}")
+            return
+            
+        paths = slicer.paths
+        for i, path in enumerate(paths):
+            # Gleichnamige Slices eines früheren Durchlaufs sind ungültig
+            if self.upload_cache:
+                self.upload_cache.forget_path(path)
+            self.assign_sample_to_slot(first_slot + i, path)
+            
+        stats = slicer.stats()
+        print(f"✓ {len(paths)} Slices: Analyse {stats['analyse_ms']} ms, "
+              f"Schreiben {stats['write_ms']} ms")
+        self.slice_count = len(paths)
\ No newline at end of file
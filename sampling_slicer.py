@@ -0,0 +1,331 @@
+"""
+Automatisches Zerlegen langer Samples (Breaks, Loops) in Slices
+Transienten werden streamend über die Energie-Hüllkurve erkannt. Die
+Datei wird in beiden Durchläufen blockweise gelesen - der RAM-Bedarf
+hängt nicht von der Länge des Samples ab
+"""
+
+import time
+from array import array
+from config import CIRCUIT_TRACKS_CONFIG, PATHS, SAMPLING_CONFIG
+from drivers.sdcard import sd_open
+from sampling import wav
+
+class OnsetDetector:
+    """Transienten-Erkennung auf der Energie-Hüllkurve
+    
+    Pro Hop wird die mittlere Amplitude übergeben. Ein Onset liegt vor,
+    wenn der Anstieg gegenüber dem vorherigen Hop das threshold-fache der
+    langsamen Hüllkurve übersteigt. Innerhalb von min_gap Hops gewinnt
+    der stärkste Kandidat. Gespeichert werden höchstens max_onsets
+    Positionen - ist die Liste voll, ersetzt ein stärkerer Onset den
+    schwächsten.
+    """
+    
+    # Mittlere Amplitude (16 Bit), unter der nichts als Onset zählt
+    NOISE_FLOOR = 64
+    
+    def __init__(self, max_onsets, min_gap, threshold):
+        self.min_gap = min_gap
+        self.threshold = threshold
+        self.hops = array('I', [0] * max_onsets)
+        self.strengths = array('f', [0] * max_onsets)
+        self.count = 0
+        
+        self._index = 0
+        self._prev = 0
+        self._slow = 0
+        self._cand_hop = -1
+        self._cand_strength = 0.0
+        
+    def _store(self, hop, strength):
+        """Onset übernehmen, bei voller Liste den schwächsten verdrängen"""
+        if not len(self.hops):
+            return
+        if self.count < len(self.hops):
+            self.hops[self.count] = hop
+            self.strengths[self.count] = strength
+            self.count += 1
+            return
+        weakest = 0
+        for i in range(1, self.count):
+            if self.strengths[i] < self.strengths[weakest]:
+                weakest = i
+        if strength > self.strengths[weakest]:
+            self.hops[weakest] = hop
+            self.strengths[weakest] = strength
+            
+    def add(self, level):
+        """Mittlere Amplitude des nächsten Hops verarbeiten"""
+        hop = self._index
+        self._index += 1
+        rise = level - self._prev
+        slow = self._slow
+        self._prev = level
+        self._slow = (slow * 7 + level) >> 3
+        
+        # Kandidat festschreiben, sobald sein Fenster vorbei ist
+        if self._cand_hop >= 0 and hop - self._cand_hop >= self.min_gap:
+            self._store(self._cand_hop, self._cand_strength)
+            self._cand_hop = -1
+            
+        if level < self.NOISE_FLOOR or rise <= 0:
+            return
+        strength = rise / (slow + self.NOISE_FLOOR)
+        if strength < self.threshold:
+            return
+        if self._cand_hop < 0 or strength > self._cand_strength:
+            self._cand_hop = hop
+            self._cand_strength = strength
+            
+    def finish(self):
+        """Sortierte Hop-Positionen aller Onsets (ohne den Dateianfang)"""
+        if self._cand_hop >= 0:
+            self._store(self._cand_hop, self._cand_strength)
+            self._cand_hop = -1
+        result = sorted(self.hops[i] for i in range(self.count))
+        # Onsets zu nah am Anfang gehören zum ersten Slice
+        return [hop for hop in result if hop >= self.min_gap]
+
+
+class SampleSlicer:
+    """Erkennt Slice-Punkte und schreibt die Slices als Geräte-WAVs
+    
+    Durchlauf 1 (analyse): jedes stride-te Frame fließt in die Hüllkurve
+    Durchlauf 2 (write):   Slices nach mono/16 Bit/Geräte-Samplerate
+                           wandeln (lineare Interpolation), pro Slice
+                           höchstens max_sample_size Bytes
+    """
+    
+    def __init__(self, out_dir=None):
+        self.out_dir = out_dir or PATHS['samples']
+        self.rate = CIRCUIT_TRACKS_CONFIG['sample_rate']
+        self.max_bytes = CIRCUIT_TRACKS_CONFIG['max_sample_size']
+        self.block = SAMPLING_CONFIG['slice_block']
+        
+        # Ergebnisse der schrittweisen Durchläufe
+        self.info = None
+        self.starts = []
+        self.paths = []
+        
+        # Statistik
+        self.frames = 0
+        self.analyse_ms = 0
+        self.write_ms = 0
+        self.truncated = 0
+        
+    # ===== Lesen =====
+    
+    def _buffers(self, info):
+        """Lesepuffer (ein Block) und Mono-Puffer einmalig anlegen"""
+        channels = info['channels']
+        if info['bits'] == 16:
+            raw = array('h', [0] * (self.block * channels))
+        else:
+            raw = bytearray(self.block * channels * info['bits'] // 8)
+        return raw, array('h', [0] * self.block)
+        
+    def _read(self, f, raw, frames, frame_bytes):
+        """frames Frames lesen, gibt Anzahl gelesener Frames zurück"""
+        n = f.readinto(raw)
+        if frames * frame_bytes < n:
+            # Letzter Block ist kürzer, Rest des Puffers ungenutzt
+            n = frames * frame_bytes
+        return (n or 0) // frame_bytes
+        
+    def _decode(self, raw, frames, info, out, stride):
+        """Frames (jedes stride-te) als mono int16 nach out, gibt Anzahl zurück"""
+        channels = info['channels']
+        bits = info['bits']
+        j = 0
+        if bits == 16:
+            if channels == 1:
+                for i in range(0, frames, stride):
+                    out[j] = raw[i]
+                    j += 1
+            else:
+                for i in range(0, frames * channels, stride * channels):
+                    out[j] = (raw[i] + raw[i + 1]) >> 1
+                    j += 1
+        elif bits == 8:
+            step = stride * channels
+            second = 1 if channels > 1 else 0
+            for i in range(0, frames * channels, step):
+                out[j] = (raw[i] + raw[i + second] - 256) << 7
+                j += 1
+        else:
+            # 24 Bit: obere zwei Bytes genügen
+            width = channels * 3
+            second = 3 if channels > 1 else 0
+            for i in range(0, frames * width, stride * width):
+                a = raw[i + 1] | (raw[i + 2] << 8)
+                b = raw[i + second + 1] | (raw[i + second + 2] << 8)
+                if a & 0x8000:
+                    a -= 0x10000
+                if b & 0x8000:
+                    b -= 0x10000
+                out[j] = (a + b) >> 1
+                j += 1
+        return j
+        
+    # ===== Durchlauf 1: Slice-Punkte =====
+    
+    def analyse(self, path, max_slices, progress=None):
+        """Slice-Anfänge in Frames (erster immer 0) und WAV-Info ermitteln"""
+        for step in self.analyse_steps(path, max_slices):
+            if progress:
+                progress(*step)
+        return self.info, self.starts
+        
+    def analyse_steps(self, path, max_slices):
+        """analyse() schrittweise, Ergebnis danach in info und starts"""
+        start = time.ticks_ms()
+        with sd_open(path, 'rb') as f:
+            info = wav.read_info(f)
+            rate = info['rate']
+            frame_bytes = info['channels'] * info['bits'] // 8
+            total = info['size'] // frame_bytes
+            
+            hop = max(1, rate * SAMPLING_CONFIG['slice_hop_ms'] // 1000)
+            stride = max(1, rate // SAMPLING_CONFIG['slice_analysis_rate'])
+            min_gap = max(1, SAMPLING_CONFIG['slice_min_ms'] // SAMPLING_CONFIG['slice_hop_ms'])
+            detector = OnsetDetector(max_slices - 1, min_gap, SAMPLING_CONFIG['slice_threshold'])
+            
+            raw, mono = self._buffers(info)
+            f.seek(info['offset'])
+            
+            level_sum = 0
+            level_count = 0
+            hop_left = hop
+            remaining = total
+            while remaining > 0:
+                frames = self._read(f, raw, min(self.block, remaining), frame_bytes)
+                if not frames:
+                    break
+                remaining -= frames
+                n = self._decode(raw, frames, info, mono, stride)
+                for i in range(n):
+                    s = mono[i]
+                    level_sum += s if s >= 0 else -s
+                    level_count += 1
+                    hop_left -= stride
+                    if hop_left <= 0:
+                        detector.add(level_sum // level_count)
+                        level_sum = 0
+                        level_count = 0
+                        hop_left += hop
+                yield 'analyse', total - remaining, total
+                        
+        self.frames = total
+        self.analyse_ms = time.ticks_diff(time.ticks_ms(), start)
+        starts = [0]
+        for h in detector.finish():
+            starts.append(h * hop)
+        self.info = info
+        self.starts = starts
+        
+    # ===== Durchlauf 2: Slices schreiben =====
+    
+    def _slice_path(self, base, number):
+        """Dateiname <base>_NN.wav (passt in den Sample-Index)"""
+        suffix = f"_{number:02d}.wav"
+        return f"{self.out_dir}/{base[:56 - len(suffix)]}{suffix}"
+        
+    def write(self, path, info, starts, progress=None):
+        """Slices schreiben, gibt die Liste der Dateipfade zurück"""
+        for step in self.write_steps(path, info, starts):
+            if progress:
+                progress(*step)
+        return self.paths
+        
+    def write_steps(self, path, info, starts):
+        """write() schrittweise, Dateipfade danach in paths"""
+        start_ms = time.ticks_ms()
+        frame_bytes = info['channels'] * info['bits'] // 8
+        total = info['size'] // frame_bytes
+        base = path.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+        
+        raw, mono = self._buffers(info)
+        step = (info['rate'] << 16) // self.rate
+        out = array('h', [0] * (self.block * self.rate // info['rate'] + 2))
+        max_frames = (self.max_bytes - wav.HEADER_SIZE) // 2
+        
+        paths = []
+        with sd_open(path, 'rb') as f:
+            for number in range(len(starts)):
+                first = starts[number]
+                last = starts[number + 1] if number + 1 < len(starts) else total
+                out_path = self._slice_path(base, number + 1)
+                f.seek(info['offset'] + first * frame_bytes)
+                
+                with sd_open(out_path, 'wb') as out_file:
+                    wav.write_header(out_file, self.rate, 1, 16, 0)
+                    written = 0
+                    
+                    # Resampler: pos (16.16) zählt ab dem letzten Sample des Vorblocks
+                    pos = 1 << 16
+                    prev = 0
+                    remaining = last - first
+                    while remaining > 0 and written < max_frames:
+                        frames = self._read(f, raw, min(self.block, remaining), frame_bytes)
+                        if not frames:
+                            break
+                        remaining -= frames
+                        n = self._decode(raw, frames, info, mono, 1)
+                        
+                        m = 0
+                        while pos >> 16 < n:
+                            k = (pos >> 16) - 1
+                            a = mono[k] if k >= 0 else prev
+                            b = mono[k + 1]
+                            out[m] = a + (((b - a) * (pos & 0xFFFF)) >> 16)
+                            m += 1
+                            pos += step
+                        pos -= n << 16
+                        prev = mono[n - 1]
+                        
+                        m = min(m, max_frames - written)
+                        out_file.write(memoryview(out)[:m])
+                        written += m
+                        yield 'write', number, len(starts)
+                        
+                    if remaining > 0:
+                        self.truncated += 1
+                        
+                    # Längen im Header nachtragen
+                    out_file.seek(0)
+                    wav.write_header(out_file, self.rate, 1, 16, written * 2)
+                    
+                paths.append(out_path)
+                yield 'write', number + 1, len(starts)
+                
+        self.write_ms = time.ticks_diff(time.ticks_ms(), start_ms)
+        self.paths = paths
+        
+    def slice(self, path, max_slices, progress=None):
+        """Sample analysieren und in höchstens max_slices Dateien zerlegen
+        
+        progress(stage, done, total) wird pro Leseblock aufgerufen, done
+        zählt bei 'analyse' Frames und bei 'write' fertige Slices.
+        """
+        for step in self.slice_steps(path, max_slices):
+            if progress:
+                progress(*step)
+        return self.paths
+        
+    def slice_steps(self, path, max_slices):
+        """slice() als Generator: ein Schritt pro Leseblock, liefert
+        (stage, done, total) - so kann der Hauptloop zwischen zwei
+        Blöcken weiterlaufen. Die Dateipfade stehen danach in paths.
+        """
+        self.paths = []
+        yield from self.analyse_steps(path, max_slices)
+        yield from self.write_steps(path, self.info, self.starts)
+        
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'analyse_ms': self.analyse_ms,
+            'write_ms': self.write_ms,
+            'truncated': self.truncated,
+        }
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Slot-Modell: einzige Quelle für den Zustand der Sample-Slots
+Kompakte parallele Arrays statt eines Dicts pro Slot, Widgets
+abonnieren einzelne Slots und werden nur bei Änderungen benachrichtigt
+"""
+
+from array import array
+
+class SlotModel:
+    """Slot-Zustand mit Änderungsbenachrichtigung"""
+    
+    # Slot-Status
+    EMPTY = 0
+    LOADED = 1
+    UPLOADED = 2
+    
+    STATUS_NAMES = ('empty', 'loaded', 'uploaded')
+    
+    def __init__(self, num_slots):
+        self.num_slots = num_slots
+        
+        # Parallele Arrays: Status, Größe (Bytes), Index in die Pfad-Tabelle
+        self.status = bytearray(num_slots)
+        self.size = array('I', [0] * num_slots)
+        self.path_index = array('h', [-1] * num_slots)
+        
+        # Pfad-Tabelle (gemeinsam genutzt, wenn ein Sample mehrfach zugewiesen ist)
+        self.paths = []
+        
+        # Beobachter pro Slot und für alle Slots
+        self._listeners = [None] * num_slots
+        self._global_listeners = []
+        
+    def __len__(self):
+        return self.num_slots
+        
+    def subscribe(self, slot_number, callback):
+        """Callback(slot_number) bei Änderung eines Slots aufrufen"""
+        # Meist genau ein Widget pro Slot - Liste erst ab dem zweiten
+        existing = self._listeners[slot_number]
+        if existing is None:
+            self._listeners[slot_number] = callback
+        elif isinstance(existing, list):
+            existing.append(callback)
+        else:
+            self._listeners[slot_number] = [existing, callback]
+            
+    def subscribe_all(self, callback):
+        """Callback(slot_number) bei Änderung eines beliebigen Slots aufrufen"""
+        self._global_listeners.append(callback)
+        
+    def _notify(self, slot_number):
+        """Beobachter eines Slots benachrichtigen"""
+        listeners = self._listeners[slot_number]
+        if isinstance(listeners, list):
+            for callback in listeners:
+                callback(slot_number)
+        elif listeners is not None:
+            listeners(slot_number)
+        for callback in self._global_listeners:
+            callback(slot_number)
+            
+    def _intern_path(self, path):
+        """Pfad in die Tabelle aufnehmen, freie Einträge wiederverwenden"""
+        free = -1
+        for i, existing in enumerate(self.paths):
+            if existing == path:
+                return i
+            if existing is None and free < 0:
+                free = i
+        if free >= 0:
+            self.paths[free] = path
+            return free
+        self.paths.append(path)
+        return len(self.paths) - 1
+        
+    def _release_path(self, index):
+        """Pfad freigeben, wenn kein Slot ihn mehr nutzt"""
+        if index < 0:
+            return
+        for other in self.path_index:
+            if other == index:
+                return
+        self.paths[index] = None
+        
+    def is_valid(self, slot_number):
+        """Prüfe, ob Slot-Nummer gültig ist"""
+        return 0 <= slot_number < self.num_slots
+        
+    def assign(self, slot_number, path, size, status=LOADED):
+        """Sample (Pfad + Größe) einem Slot zuweisen"""
+        old_index = self.path_index[slot_number]
+        new_index = self._intern_path(path)
+        if (old_index == new_index and self.size[slot_number] == size
+                and self.status[slot_number] == status):
+            return
+            
+        self.path_index[slot_number] = new_index
+        self.size[slot_number] = size
+        self.status[slot_number] = status
+        if old_index != new_index:
+            self._release_path(old_index)
+        self._notify(slot_number)
+        
+    def set_status(self, slot_number, status):
+        """Status eines Slots setzen"""
+        if self.status[slot_number] == status:
+            return
+        self.status[slot_number] = status
+        self._notify(slot_number)
+        
+    def clear(self, slot_number):
+        """Slot leeren"""
+        if self.status[slot_number] == self.EMPTY and self.path_index[slot_number] < 0:
+            return
+        old_index = self.path_index[slot_number]
+        self.path_index[slot_number] = -1
+        self.size[slot_number] = 0
+        self.status[slot_number] = self.EMPTY
+        self._release_path(old_index)
+        self._notify(slot_number)
+        
+    def path(self, slot_number):
+        """Pfad des zugewiesenen Samples (oder None)"""
+        index = self.path_index[slot_number]
+        return self.paths[index] if index >= 0 else None
+        
+    def name(self, slot_number):
+        """Dateiname des zugewiesenen Samples (oder None)"""
+        path = self.path(slot_number)
+        return path.split('/')[-1] if path else None
+        
+    def info(self, slot_number):
+        """Slot-Informationen als Dict (für Anzeige/Debug)"""
+        return {
+            'name': self.name(slot_number),
+            'path': self.path(slot_number),
+            'size': self.size[slot_number],
+            'status': self.STATUS_NAMES[self.status[slot_number]]
+        }
+        
+    def memory_usage(self):
+        """Ungefährer Speicherbedarf der Slot-Daten in Bytes"""
+        usage = len(self.status) + len(self.size) * 4 + len(self.path_index) * 2
+        usage += len(self._listeners) * 4
+        for path in self.paths:
+            if path:
+                usage += len(path)
+        return usage
@@ -0,0 +1,351 @@
+"""
+Empfänger für Sample-Übertragungen über die USB-Seriell-Konsole
+Gegenstück zu tools/sample_transfer.py auf dem Rechner: ganze
+Sample-Ordner werden in CRC-geprüften Blöcken mit Fenster-ACKs
+übertragen, vorhandene Dateien mit gleichem Hash übersprungen und
+danach der Sample-Index neu aufgebaut
+"""
+
+import binascii
+import hashlib
+import os
+import select
+import struct
+from config import PATHS, TRANSFER_CONFIG
+
+# ===== Protokoll =====
+#
+# Frame: SYNC(2) Typ(1) Seq(2) Länge(2) CRC32(4) + Nutzdaten
+# CRC32 über Typ, Seq, Länge und Nutzdaten
+#
+#   Rechner                     Gerät
+#   HELLO          ->   <-      HELLO (Version, Blockgröße, Fenster, ACK-Abstand)
+#   FILE seq=n     ->   <-      FILE_ACK seq=n (SEND / SKIP / ERROR)
+#   DATA seq=0..   ->   <-      ACK seq=nächster erwarteter Block (alle ack_every)
+#                       <-      NAK seq=nächster erwarteter Block (CRC/Lücke)
+#   DONE seq=n     ->   <-      FILE_ACK seq=n (OK / ERROR)
+#   END            ->   <-      END (empfangen, übersprungen, fehlgeschlagen)
+
+SYNC = b'\xA5\x5A'
+VERSION = 1
+HEADER_FMT = '<2sBHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+
+T_HELLO = 1
+T_FILE = 2
+T_FILE_ACK = 3
+T_DATA = 4
+T_ACK = 5
+T_NAK = 6
+T_DONE = 7
+T_END = 8
+
+ST_SEND = 0
+ST_SKIP = 1
+ST_OK = 2
+ST_ERROR = 3
+
+HELLO_FMT = '<BHBB'         # Version, Blockgröße, Fenster, ACK-Abstand
+FILE_FMT = '<I32s'          # Größe, SHA-256 (+ Dateiname UTF-8)
+END_FMT = '<HHH'            # empfangen, übersprungen, fehlgeschlagen
+
+NAME_MAX = 56               # Länge eines Namens im Sample-Index
+
+
+def frame_crc(header, payload):
+    """CRC32 über Typ/Seq/Länge (Header-Bytes 2..6) und Nutzdaten"""
+    return binascii.crc32(payload, binascii.crc32(header[2:7])) & 0xFFFFFFFF
+
+
+class TransferReceiver:
+    """Empfängt Sample-Dateien über einen Byte-Stream (USB-Seriell)"""
+    
+    def __init__(self, reader, writer, directory=None):
+        self.reader = reader
+        self.writer = writer
+        self.directory = directory or PATHS['samples']
+        self.block_size = TRANSFER_CONFIG['block_size']
+        self.window = TRANSFER_CONFIG['window']
+        self.ack_every = TRANSFER_CONFIG['ack_every']
+        self.timeout_ms = TRANSFER_CONFIG['timeout_ms']
+        
+        self._poller = select.poll()
+        self._poller.register(reader, select.POLLIN)
+        
+        # Puffer einmalig anlegen
+        self._header = bytearray(HEADER_SIZE)
+        self._header_mv = memoryview(self._header)
+        self._payload = bytearray(max(self.block_size, 256))
+        self._payload_mv = memoryview(self._payload)
+        self._out = bytearray(HEADER_SIZE)
+        
+        # Aktuelle Datei
+        self._file = None
+        self._file_no = 0
+        self._path = None
+        self._size = 0
+        self._digest = None
+        self._hash = None
+        self._blocks = 0
+        self._expected = 0
+        self._since_ack = 0
+        self._nak_sent = False
+        
+        # Statistik
+        self.received = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_received = 0
+        self.bad_frames = 0
+        self.naks = 0
+        
+    # ===== Frames =====
+    
+    def _read_exact(self, mv):
+        """mv komplett füllen, OSError bei Zeitüberschreitung"""
+        pos = 0
+        n = len(mv)
+        while pos < n:
+            if not self._poller.poll(self.timeout_ms):
+                raise OSError('Zeitüberschreitung')
+            got = self.reader.readinto(mv[pos:])
+            if not got:
+                raise OSError('Verbindung getrennt')
+            pos += got
+            
+    def read_frame(self):
+        """Nächsten Frame lesen: (Typ, Seq, Länge) oder None bei CRC-Fehler"""
+        hdr = self._header
+        mv = self._header_mv
+        
+        # Auf SYNC synchronisieren
+        self._read_exact(mv[:2])
+        while hdr[0] != SYNC[0] or hdr[1] != SYNC[1]:
+            hdr[0] = hdr[1]
+            self._read_exact(mv[1:2])
+        self._read_exact(mv[2:])
+        
+        _, ftype, seq, length, crc = struct.unpack(HEADER_FMT, hdr)
+        if length > len(self._payload):
+            # Kaputter Header - ab hier neu synchronisieren
+            self.bad_frames += 1
+            return None
+        payload = self._payload_mv[:length]
+        self._read_exact(payload)
+        
+        if frame_crc(hdr, payload) != crc:
+            self.bad_frames += 1
+            return None
+        return ftype, seq, length
+        
+    def send_frame(self, ftype, seq, payload=b''):
+        """Frame an den Rechner senden"""
+        out = self._out
+        struct.pack_into(HEADER_FMT, out, 0, SYNC, ftype, seq & 0xFFFF, len(payload), 0)
+        struct.pack_into('<I', out, 7, frame_crc(out, payload))
+        self.writer.write(out)
+        if payload:
+            self.writer.write(payload)
+            
+    def send_hello(self):
+        self.send_frame(T_HELLO, 0, struct.pack(HELLO_FMT, VERSION, self.block_size,
+                                                self.window, self.ack_every))
+                                                
+    # ===== Dateien =====
+    
+    def _file_hash(self, path):
+        """SHA-256 einer vorhandenen Datei blockweise berechnen"""
+        h = hashlib.sha256()
+        buf = self._payload_mv
+        with open(path, 'rb') as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(buf[:n])
+        return h.digest()
+        
+    def _exists_identical(self, path, size, digest):
+        """Gleiche Größe und gleicher Hash = überspringen"""
+        try:
+            if os.stat(path)[6] != size:
+                return False
+        except OSError:
+            return False
+        return self._file_hash(path) == digest
+        
+    def _close_file(self, keep):
+        """Temporäre Datei schließen und übernehmen oder löschen"""
+        if self._file:
+            self._file.close()
+            self._file = None
+            tmp_path = self._path + '.part'
+            if keep:
+                try:
+                    os.remove(self._path)
+                except OSError:
+                    pass
+                os.rename(tmp_path, self._path)
+            else:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                    
+    def _on_file(self, seq, length):
+        """Neue Datei angekündigt"""
+        self._close_file(False)
+        size, digest = struct.unpack_from(FILE_FMT, self._payload, 0)
+        name = str(bytes(self._payload_mv[struct.calcsize(FILE_FMT):length]), 'utf-8')
+        
+        if (not name or '/' in name or name.startswith('.')
+                or len(name.encode()) > NAME_MAX):
+            self.failed += 1
+            self.send_frame(T_FILE_ACK, seq, bytes([ST_ERROR]))
+            return
+            
+        path = f"{self.directory}/{name}"
+        if self._exists_identical(path, size, digest):
+            self.skipped += 1
+            self.send_frame(T_FILE_ACK, seq, bytes([ST_SKIP]))
+            return
+            
+        self._file = open(path + '.part', 'wb')
+        self._file_no = seq
+        self._path = path
+        self._size = size
+        self._digest = digest
+        self._hash = hashlib.sha256()
+        self._blocks = (size + self.block_size - 1) // self.block_size
+        self._expected = 0
+        self._since_ack = 0
+        self._nak_sent = False
+        self.send_frame(T_FILE_ACK, seq, bytes([ST_SEND]))
+        
+    def _on_data(self, seq, length):
+        """Datenblock: nur der erwartete Block wird geschrieben (Go-Back-N)"""
+        if not self._file:
+            return
+        if seq != self._expected & 0xFFFF:
+            self._request_resend()
+            return
+            
+        block = self._payload_mv[:length]
+        self._file.write(block)
+        self._hash.update(block)
+        self.bytes_received += length
+        self._expected += 1
+        self._since_ack += 1
+        self._nak_sent = False
+        
+        if self._since_ack >= self.ack_every or self._expected >= self._blocks:
+            self._since_ack = 0
+            self.send_frame(T_ACK, self._expected)
+            
+    def _request_resend(self):
+        """Einmal NAK pro Lücke - der Rechner sendet ab dem erwarteten Block neu"""
+        if self._file and not self._nak_sent:
+            self._nak_sent = True
+            self.naks += 1
+            self.send_frame(T_NAK, self._expected)
+            
+    def _on_done(self, seq):
+        """Datei vollständig: Größe und Hash prüfen, dann übernehmen"""
+        if not self._file or seq != self._file_no:
+            self.send_frame(T_FILE_ACK, seq, bytes([ST_ERROR]))
+            return
+        ok = (self._expected >= self._blocks
+              and self._file.tell() == self._size
+              and self._hash.digest() == self._digest)
+        self._close_file(ok)
+        if ok:
+            self.received += 1
+        else:
+            self.failed += 1
+        self.send_frame(T_FILE_ACK, seq, bytes([ST_OK if ok else ST_ERROR]))
+        
+    # ===== Sitzung =====
+    
+    def serve(self):
+        """Sitzung bis END oder Zeitüberschreitung bedienen
+        
+        Auch bei Zeitüberschreitung oder getrennter Verbindung (OSError,
+        wird weitergereicht) kommen die bis dahin empfangenen Dateien in
+        den Sample-Index und das Ergebnis geht als END an den Rechner.
+        """
+        self.send_hello()
+        try:
+            while True:
+                frame = self.read_frame()
+                if frame is None:
+                    self._request_resend()
+                    continue
+                    
+                ftype, seq, length = frame
+                if ftype == T_DATA:
+                    self._on_data(seq, length)
+                elif ftype == T_FILE:
+                    self._on_file(seq, length)
+                elif ftype == T_DONE:
+                    self._on_done(seq)
+                elif ftype == T_HELLO:
+                    self.send_hello()
+                elif ftype == T_END:
+                    break
+        finally:
+            self._close_file(False)
+            
+            # Neue Dateien in den Sample-Index aufnehmen
+            if self.received:
+                from sampling.sample_index import SampleIndex
+                SampleIndex(self.directory).build()
+                
+            # Ergebnis melden, soweit die Verbindung noch steht
+            try:
+                self.send_frame(T_END, 0, struct.pack(END_FMT, self.received,
+                                                      self.skipped, self.failed))
+            except OSError:
+                pass
+        return self.stats()
+        
+    def stats(self):
+        """Ergebnis der Sitzung"""
+        return {
+            'received': self.received,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'bytes': self.bytes_received,
+            'bad_frames': self.bad_frames,
+            'naks': self.naks,
+        }
+
+
+def receive():
+    """Empfänger auf der USB-Seriell-Konsole starten (aus der REPL)
+    
+    Während der Übertragung ist Ctrl-C abgeschaltet, da 0x03 in den
+    Binärdaten vorkommt. Ausgaben erst nach dem Ende der Sitzung.
+    """
+    import sys
+    import micropython
+    from drivers.sdcard import SDCardManager
+    
+    sd_manager = SDCardManager()
+    try:
+        os.stat(PATHS['samples'])
+    except OSError:
+        if sd_manager.init_sdcard():
+            sd_manager.create_directories()
+            
+    receiver = TransferReceiver(sys.stdin.buffer, sys.stdout.buffer)
+    micropython.kbd_intr(-1)
+    try:
+        result = receiver.serve()
+    except OSError as e:
+        result = receiver.stats()
+        result['error'] = str(e)
+    finally:
+        micropython.kbd_intr(3)
+        
+    print(f"✓ Übertragung: {result}")
+    return result
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Cache für fertig kodierte Upload-Datenströme auf der SD-Karte
+Ein erneuter Upload desselben Samples liest die gespeicherten SysEx-Rahmen
+und kopiert sie direkt in die Sende-Queue - ohne Lesen des ganzen Samples,
+Formatwandlung und 7-Bit-Kodierung
+"""
+
+import struct
+import time
+from config import PATHS, SAMPLING_CONFIG
+from drivers.sdcard import sd_open, sd_stat, sd_remove, sd_rename, sd_ilistdir
+from utils.stats import Histogram
+
+class UploadCache:
+    """Upload-Cache mit Größenbegrenzung (älteste Einträge fliegen zuerst)
+    
+    Schlüssel: Pfad, Größe und Änderungszeit des Samples + Zielformat +
+    Protokollversion, als Dateiname <pfad>_<größe>_<zeit>_<format>_p<version>.syx
+    ('/' im Pfad wird zu '~'). Dafür genügt ein stat() - der Inhalt wird
+    nicht gelesen. Wird ein Sample neu geschrieben, ändern sich Größe
+    oder Zeit, sonst (z.B. gleich große Slices binnen der 2-s-Auflösung
+    von FAT) verwirft forget_path() die alten Einträge.
+    
+    Datei: Header (Magic, Version, Anzahl Rahmen), danach pro Rahmen
+    Länge und Position des Slot-Bytes + die Rahmen-Bytes (F0 ... F7).
+    Neue Einträge entstehen als .part und werden erst nach erfolgreichem
+    Upload umbenannt.
+    """
+    
+    MAGIC = b'CYUC'
+    VERSION = 1
+    
+    HEADER_FMT = '<4sHH'
+    HEADER_SIZE = struct.calcsize(HEADER_FMT)
+    FRAME_FMT = '<HH'
+    
+    # Klassengrenzen für die Dauer eines Uploads (us)
+    TIME_EDGES = (200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000, 500000)
+    
+    def __init__(self, upload_format, protocol, directory=None, max_bytes=None):
+        self.suffix = f"_{upload_format}_p{protocol}.syx"
+        self.directory = directory or PATHS['upload_cache']
+        self.max_bytes = max_bytes or SAMPLING_CONFIG['upload_cache_bytes']
+        
+        # Einträge in LRU-Reihenfolge (vorne = älteste) und Gesamtgröße
+        self._entries = []
+        self._sizes = {}
+        self.total_bytes = 0
+        
+        # Offener Eintrag beim Speichern
+        self._file = None
+        self._name = None
+        self._frames = 0
+        self._written = 0
+        
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+        self.hit_us = Histogram(self.TIME_EDGES)
+        self.miss_us = Histogram(self.TIME_EDGES)
+        
+        self.scan()
+        
+    def scan(self):
+        """Vorhandene Einträge erfassen (nach Änderungszeit), Reste löschen"""
+        found = []
+        try:
+            for entry in sd_ilistdir(self.directory):
+                name = entry[0]
+                path = f"{self.directory}/{name}"
+                if name.endswith('.part'):
+                    try:
+                        sd_remove(path)
+                    except OSError:
+                        pass
+                    continue
+                if not name.endswith('.syx'):
+                    continue
+                st = sd_stat(path)
+                found.append((st[8], name, st[6]))
+        except OSError:
+            pass
+            
+        found.sort()
+        self._entries = [name for _, name, _ in found]
+        self._sizes = {name: size for _, name, size in found}
+        self.total_bytes = sum(self._sizes.values())
+        
+    # ===== Schlüssel =====
+    
+    def key(self, path):
+        """Cache-Schlüssel (Dateiname) für ein Sample, None bei Lesefehler"""
+        try:
+            st = sd_stat(path)
+        except OSError:
+            return None
+        return f"{path.replace('/', '~')}_{st[6]:x}_{st[8]:x}{self.suffix}"
+        
+    def forget_path(self, path):
+        """Alle Einträge eines Samples löschen (Datei wurde neu geschrieben)"""
+        prefix = path.replace('/', '~') + '_'
+        for name in [n for n in self._entries if n.startswith(prefix)]:
+            self._remove(name)
+            
+    # ===== Lesen =====
+    
+    def open(self, key):
+        """Eintrag öffnen: (Datei hinter dem Header, Anzahl Rahmen) oder None"""
+        if key not in self._sizes:
+            return None
+        try:
+            f = sd_open(f"{self.directory}/{key}", 'rb')
+        except OSError:
+            self._forget(key)
+            return None
+        header = f.read(self.HEADER_SIZE)
+        if (len(header) != self.HEADER_SIZE or header[:4] != self.MAGIC
+                or struct.unpack(self.HEADER_FMT, header)[1] != self.VERSION):
+            f.close()
+            self._remove(key)
+            return None
+        frames = struct.unpack(self.HEADER_FMT, header)[2]
+        
+        # Zuletzt benutzt -> ans Ende
+        self._entries.remove(key)
+        self._entries.append(key)
+        return f, frames
+        
+    # ===== Schreiben =====
+    
+    def begin(self, key):
+        """Neuen Eintrag anlegen, Rahmen kommen per add_frame()"""
+        self.abort()
+        try:
+            self._file = sd_open(f"{self.directory}/{key}.part", 'wb')
+            self._file.write(struct.pack(self.HEADER_FMT, self.MAGIC, self.VERSION, 0))
+        except OSError:
+            self.errors += 1
+            self._file = None
+            return None
+        self._name = key
+        self._frames = 0
+        self._written = self.HEADER_SIZE
+        return self
+        
+    def add_frame(self, buf, length, slot_pos):
+        """Fertigen Rahmen buf[:length] anhängen (Aufruf aus dem Encoder)"""
+        if not self._file:
+            return
+        try:
+            self._file.write(struct.pack(self.FRAME_FMT, length, slot_pos))
+            self._file.write(memoryview(buf)[:length])
+        except OSError:
+            self.errors += 1
+            self.abort()
+            return
+        self._frames += 1
+        self._written += 4 + length
+        
+    def commit(self):
+        """Eintrag übernehmen und den Cache auf max_bytes begrenzen"""
+        if not self._file:
+            return False
+        name = self._name
+        path = f"{self.directory}/{name}"
+        try:
+            self._file.seek(0)
+            self._file.write(struct.pack(self.HEADER_FMT, self.MAGIC, self.VERSION, self._frames))
+            self._file.close()
+            self._file = None
+            self._forget(name)
+            try:
+                sd_remove(path)
+            except OSError:
+                pass
+            sd_rename(path + '.part', path)
+        except OSError:
+            self.errors += 1
+            self.abort()
+            return False
+            
+        self._entries.append(name)
+        self._sizes[name] = self._written
+        self.total_bytes += self._written
+        self.stores += 1
+        
+        # Älteste Einträge entfernen, der neue bleibt in jedem Fall
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(self._entries[0])
+            self.evictions += 1
+        return True
+        
+    def abort(self):
+        """Offenen Eintrag verwerfen"""
+        if self._file:
+            try:
+                self._file.close()
+                sd_remove(f"{self.directory}/{self._name}.part")
+            except OSError:
+                pass
+            self._file = None
+            
+    def _forget(self, name):
+        """Eintrag aus der Verwaltung nehmen (Datei bleibt)"""
+        if name in self._sizes:
+            self.total_bytes -= self._sizes.pop(name)
+            self._entries.remove(name)
+            
+    def _remove(self, name):
+        """Eintrag löschen"""
+        self._forget(name)
+        try:
+            sd_remove(f"{self.directory}/{name}")
+        except OSError:
+            pass
+            
+    # ===== Statistik =====
+    
+    def record(self, hit, start_us):
+        """Ausgang und Dauer eines Uploads eintragen"""
+        us = time.ticks_diff(time.ticks_us(), start_us)
+        if hit:
+            self.hits += 1
+            self.hit_us.add(us)
+        else:
+            self.misses += 1
+            self.miss_us.add(us)
+            
+    def stats(self):
+        """Trefferquote, Größe und Upload-Zeiten"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits * 100 // total if total else 0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'errors': self.errors,
+            'hit_us': self.hit_us.summary(),
+            'miss_us': self.miss_us.summary(),
+        }
\ No newline at end of file
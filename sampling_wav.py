@@ -0,0 +1,62 @@
+"""
+WAV-Header lesen und schreiben (RIFF/PCM)
+Nur der Header wird gelesen - die Sample-Daten bleiben auf der SD-Karte
+"""
+
+import struct
+from config import CIRCUIT_TRACKS_CONFIG
+
+HEADER_SIZE = 44
+
+def read_info(f):
+    """Format und Lage der PCM-Daten ermitteln
+    
+    Gibt {'rate', 'channels', 'bits', 'offset', 'size'} zurück. .raw-Dateien
+    (ohne RIFF-Header) gelten als 16 Bit mono mit der Geräte-Samplerate.
+    """
+    f.seek(0, 2)
+    file_size = f.tell()
+    f.seek(0)
+    header = f.read(12)
+    
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return {
+            'rate': CIRCUIT_TRACKS_CONFIG['sample_rate'],
+            'channels': 1,
+            'bits': 16,
+            'offset': 0,
+            'size': file_size,
+        }
+        
+    info = None
+    pos = 12
+    # Chunks durchlaufen (LIST, fact, ... überspringen)
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+        pos += 8
+        if chunk_id == b'fmt ':
+            audio_format, channels, rate, _, _, bits = struct.unpack('<HHIIHH', f.read(16))
+            # 0xFFFE = WAVE_FORMAT_EXTENSIBLE (meist ebenfalls PCM)
+            if audio_format not in (1, 0xFFFE) or bits not in (8, 16, 24):
+                raise ValueError(f"Nicht unterstütztes WAV-Format ({audio_format}, {bits} Bit)")
+            info = {'rate': rate, 'channels': channels, 'bits': bits}
+        elif chunk_id == b'data':
+            if info is None:
+                raise ValueError("WAV ohne fmt-Chunk")
+            info['offset'] = pos
+            # Manche Programme schreiben 0 oder zu große Längen
+            info['size'] = min(chunk_size, file_size - pos) if chunk_size else file_size - pos
+            return info
+        pos += chunk_size + (chunk_size & 1)
+        
+    raise ValueError("WAV ohne data-Chunk")
+
+def write_header(f, rate, channels, bits, data_size):
+    """44-Byte PCM-Header schreiben (bei Bedarf nachträglich per seek(0))"""
+    block_align = channels * bits // 8
+    f.write(struct.pack('<4sI4s4sIHHIIHH4sI',
+                        b'RIFF', 36 + data_size, b'WAVE',
+                        b'fmt ', 16, 1, channels, rate, rate * block_align,
+                        block_align, bits,
+                        b'data', data_size))
\ No newline at end of file
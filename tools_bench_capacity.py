@@ -0,0 +1,103 @@
+"""
+Benchmark Kapazitätsplanung: Dauer von plan/check und gelesene WAV-Header
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_capacity.py [durchläufe]
+
+Unter /tmp liegen 64 WAV-Dateien (22,05/44,1 kHz, mono/stereo, 40-160 KB
+PCM, ohne Audiodaten angelegt). Gemessen werden
+    Index          Aufbau, Neuaufbau ohne Änderung, Neuaufbau nach
+                   Änderung einer Datei - jeweils gelesene Header
+    Planung        alle 64 Slots aus Index-Einträgen belegt: Dauer von
+                   plan() (über dem Budget, mit Vorschlägen) und check()
+    Journal        Slots ohne Index-Angaben: erstes plan() liest jeden
+                   Header einmal, danach keinen mehr
+"""
+
+import bench_hw
+import sys
+import time
+from config import CIRCUIT_TRACKS_CONFIG
+from sampling import wav
+from sampling.capacity import CapacityPlanner
+from sampling.sample_index import SampleIndex
+from sampling.slot_model import SlotModel
+
+SLOTS = 64
+
+
+def make_sample(path, index, extra=0):
+    """WAV-Header plus Platz für die PCM-Daten (Datei nur angelegt)"""
+    rate = 44100 if index % 4 == 0 else 22050
+    channels = 2 if index % 8 == 0 else 1
+    data_size = (40000 + (index * 7919) % 120000 + extra) & ~3
+    with open(path, 'wb') as f:
+        wav.write_header(f, rate, channels, 16, data_size)
+        f.seek(wav.HEADER_SIZE + data_size - 1)
+        f.write(b'\x00')
+
+
+def timed(fn):
+    start = time.ticks_us()
+    result = fn()
+    return result, time.ticks_diff(time.ticks_us(), start)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = int(argv[0]) if argv else 1000
+    
+    directory = bench_hw.work_dir('capacity')
+    for i in range(SLOTS):
+        make_sample(f"{directory}/sample_{i:02d}.wav", i)
+        
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, {SLOTS} Samples, Budget {CIRCUIT_TRACKS_CONFIG['sample_memory'] // 1024} KB, "
+          f"{runs} Durchläufe")
+          
+    # Index: nur neue oder geänderte Dateien öffnen
+    index = SampleIndex(directory, directory + '/samples.idx')
+    reads = []
+    for change in (False, False, True):
+        if change:
+            make_sample(f"{directory}/sample_07.wav", 7, extra=4000)
+        _, elapsed = timed(index.build)
+        reads.append(index.headers_read)
+        print(f"Index:         {index.headers_read:2d} Header gelesen, {elapsed / 1000:.1f} ms")
+    entries = index.read_range(0, SLOTS)
+    index.close()
+    
+    # Belegung aus dem Browser: Angaben kommen aus dem Index
+    slots = SlotModel(SLOTS)
+    planner = CapacityPlanner(slots)
+    for slot, entry in enumerate(entries):
+        slots.assign(slot, entry['path'], entry['size'])
+        planner.set_info(slot, entry)
+    plan = planner.plan()
+    plan_us = bench_hw.time_per_call(planner.plan, runs)
+    check_us = bench_hw.time_per_call(lambda: planner.check(3, entries[10]), runs)
+    print(f"Planung:       {plan['used'] // 1024} KB belegt ({plan['percent']} %), "
+          f"{len(plan['truncate'])} Slots auf {plan.get('level', 0) // 1024} KB kürzen")
+    print(f"               plan() {plan_us:.0f} us, check() {check_us:.1f} us, "
+          f"{planner.headers_read} Header gelesen")
+    ok = reads == [SLOTS, 0, 1] and planner.headers_read == 0 and not plan['fits']
+    
+    # Belegung aus dem Journal: nur Pfad und Größe bekannt
+    restored = SlotModel(SLOTS)
+    planner = CapacityPlanner(restored)
+    for slot, entry in enumerate(entries):
+        restored.assign(slot, entry['path'], entry['size'])
+    again, elapsed = timed(planner.plan)
+    first = planner.headers_read
+    planner.plan()
+    print(f"Journal:       erstes plan() {first} Header in {elapsed / 1000:.1f} ms, "
+          f"danach {planner.headers_read - first}")
+    ok &= first == SLOTS and planner.headers_read == first and again['used'] == plan['used']
+    
+    print("✓ Planung ohne Sample-Daten, Header nur einmal gelesen" if ok
+          else "✗ Gelesene Header oder Belegung weichen ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Benchmark MIDI-Clock: Tempo, Jitter, Eingangslatenz und Redraws der Anzeige
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_clock.py [bpm]
+
+Eine externe Clock schickt F8 mit exaktem Tempo in den UART, der
+Hauptloop fragt ihn wie auf dem Gerät nur einmal pro Frame ab (20 ms
+Takt, 2-8 ms Arbeit). Drei Abschnitte:
+    ohne Clock   3 s, ClockPanel darf nicht neu zeichnen
+    Clock        6 s nach FA (Start)
+    gestoppt     3 s nach FC und ohne Clock
+Ausgegeben werden das geschätzte Tempo, Jitter und Latenz aus MIDIClock
+sowie die Redraws des ClockPanel pro Abschnitt.
+"""
+
+import bench_hw
+import sys
+import time
+from midi.circuit_tracks import CircuitTracksController
+from midi.clock import MIDIClock
+from drivers.display import ILI9341Display
+from ui.diagnostics import ClockPanel
+
+FRAME_MS = 20
+SECTIONS = (('ohne Clock', 3000, False), ('Clock', 6000, True), ('gestoppt', 3000, False))
+
+
+def work(frame):
+    """2-8 ms Rechenzeit, wechselnd wie beim Zeichnen"""
+    start = time.ticks_us()
+    budget = 2000 + (frame * 2713) % 6000
+    while time.ticks_diff(time.ticks_us(), start) < budget:
+        pass
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    bpm = float(argv[0]) if argv else 120.0
+    period_us = int(60_000_000 / bpm / MIDIClock.PPQN)
+    
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, Clock {bpm:.1f} BPM ({period_us} us/Tick), Frame {FRAME_MS} ms")
+    
+    controller = CircuitTracksController()
+    clock = MIDIClock()
+    clock.attach(controller)
+    display = ILI9341Display()
+    panel = ClockPanel(5, 2, 150, 44, clock)
+    panel.draw(display)
+    panel.dirty = False
+    
+    uart = controller.uart
+    frame = 0
+    redraws = []
+    ok = True
+    for name, duration_ms, clocked in SECTIONS:
+        if clocked:
+            uart.feed(bytes((MIDIClock.START,)))
+        elif clock.running:
+            uart.feed(bytes((MIDIClock.STOP,)))
+        count = 0
+        start = time.ticks_ms()
+        next_tick = time.ticks_us()
+        while time.ticks_diff(time.ticks_ms(), start) < duration_ms:
+            frame_start = time.ticks_ms()
+            # Fällige Ticks liegen im UART, bis der Loop abfragt
+            while clocked and time.ticks_diff(time.ticks_us(), next_tick) >= 0:
+                uart.feed(bytes((MIDIClock.CLOCK,)))
+                next_tick = time.ticks_add(next_tick, period_us)
+            controller.poll()
+            work(frame)
+            panel.update()
+            if panel.dirty:
+                panel.draw(display)
+                panel.dirty = False
+                count += 1
+            frame += 1
+            rest = FRAME_MS - time.ticks_diff(time.ticks_ms(), frame_start)
+            if rest > 0:
+                time.sleep_ms(rest)
+        redraws.append(count)
+        
+        if clocked:
+            stats = clock.stats()
+            jitter = stats['jitter_us']
+            latency = stats['latency_us']
+            print(f"Tempo:         {stats['bpm']:.1f} BPM (Abweichung {abs(stats['bpm'] - bpm):.1f})")
+            print(f"Jitter:        p50 {jitter['p50']} us  p99 {jitter['p99']} us  Max {jitter['max']} us")
+            print(f"Latenz:        p50 {latency['p50']} us  p99 {latency['p99']} us  Max {latency['max']} us")
+            ok &= abs(stats['bpm'] - bpm) <= 1.0 and stats['running']
+        print(f"{name:14s} {count} Redraws in {duration_ms // 1000} s")
+        
+    # Ohne Clock kein Redraw, gestoppt höchstens die Zustandswechsel
+    ok &= redraws[0] == 0 and redraws[1] > 0 and redraws[2] <= 2
+    print("✓ Tempo erkannt, Anzeige nur bei Änderung" if ok else "✗ Tempo oder Redraws weichen ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Benchmark Drag-Sprite: übertragene Pixel und Dauer pro Bewegung
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_drag.py [breite] [höhe]
+
+Der SPI-Bus des ILI9341 zählt geschriebene Pixeldaten (nach RAMWR) und
+gelesene Bytes (RAMRD, RGB666 + Dummy-Byte). Ein Sprite wird entlang
+einer Strecke über das Display gezogen - zwei Punkte liegen doppelt und
+dürfen nichts übertragen. Zum Vergleich: ein Neuzeichnen des ganzen
+Displays schreibt 320 x 240 = 76 800 Pixel.
+"""
+
+import bench_hw
+import sys
+import time
+from drivers.display import ILI9341Display
+from ui.drag import DragSprite
+
+
+class CountingSPI(bench_hw.SPI):
+    """SPI-Bus, der Pixeldaten und gelesene Bytes zählt"""
+    
+    def __init__(self, display):
+        self.display = display
+        self.written = 0
+        self.read = 0
+        self._command = None
+        
+    def write(self, data):
+        if not self.display.dc.value():
+            self._command = data[0]
+        elif self._command == self.display.CMD_RAMWR:
+            self.written += len(data)
+            
+    def readinto(self, buf, write=0):
+        self.read += len(buf)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    width = int(argv[0]) if argv else 40
+    height = int(argv[1]) if len(argv) > 1 else 10
+    
+    display = ILI9341Display()
+    spi = display.spi = CountingSPI(display)
+    sprite = DragSprite(width, height)
+    
+    # Strecke quer über das Display, zwei Punkte doppelt
+    points = [(20 + i * 7, 60 + i * 4) for i in range(39)]
+    points.insert(10, points[9])
+    points.insert(25, points[24])
+    
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, Sprite {width} x {height}, {len(points)} Touch-Positionen")
+    
+    sprite.show(display, *points[0])
+    spi.written = 0
+    spi.read = 0
+    start = time.ticks_us()
+    for x, y in points[1:]:
+        sprite.move(display, x, y)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    
+    moves = sprite.moves
+    written = spi.written // 2 // moves
+    read = (spi.read // moves - 1) // 3
+    sprite.hide(display)
+    print(f"Bewegungen:    {moves}")
+    print(f"Geschrieben:   {written} Pixel pro Bewegung")
+    print(f"Gelesen:       {read} Pixel pro Bewegung")
+    print(f"Dauer:         {elapsed / moves / 1000:.2f} ms pro Bewegung (ohne Leitungszeit)")
+    print(f"Neuzeichnen:   {display.width * display.height} Pixel")
+    
+    ok = (moves == len(points) - 3 and written == 2 * width * height
+          and read == width * height)
+    print("✓ Nur Sprite und Hintergrund übertragen" if ok else "✗ Übertragene Pixel weichen ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Benchmark 4-Bit-Framebuffer: SPI-Bytes und Transaktionen gegen direktes Zeichnen
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_framebuffer.py
+
+Die Oberfläche aus main.py (64 Sample-Slots und ein Button) wird einmal
+direkt auf das ILI9341 und einmal über IndexedFramebuffer gezeichnet.
+Der SPI-Bus zählt alle geschriebenen Bytes (Kommandos, Adressen und
+Pixel), das Display die Transaktionen (CS-Zyklen). Drei Fälle:
+    Neuzeichnen   clear + alle Widgets
+    Ein Slot      Status eines sichtbaren Slots ändert sich
+    Zwei Ecken    je 10 x 10 Pixel oben links und unten rechts
+Die Leitungszeit gilt für den SPI-Takt aus DISPLAY_CONFIG. Unter CPython
+ist framebuf ein Python-Ersatz, die Dauer von present() sagt dort nichts.
+"""
+
+import bench_hw
+import sys
+from config import DISPLAY_CONFIG, UI_CONFIG
+from drivers.display import ILI9341Display
+from drivers.framebuffer import IndexedFramebuffer
+from sampling.slot_model import SlotModel
+from ui.gui import GUIEngine
+from ui.widgets import Button, SampleSlot
+from utils.colors import Colors
+
+
+class CountingSPI(bench_hw.SPI):
+    """SPI-Bus, der geschriebene Bytes zählt"""
+    
+    def __init__(self):
+        self.written = 0
+        
+    def write(self, data):
+        self.written += len(data)
+
+
+def build_gui(display):
+    """Slot-Grid und Button wie in main.py"""
+    model = SlotModel(UI_CONFIG['grid_rows'] * UI_CONFIG['grid_cols'])
+    gui = GUIEngine(display, None)
+    for row in range(UI_CONFIG['grid_rows']):
+        for col in range(UI_CONFIG['grid_cols']):
+            x = 160 + col * (UI_CONFIG['slot_width'] + 4)
+            y = 50 + row * (UI_CONFIG['slot_height'] + 4)
+            gui.add_widget(SampleSlot(x, y, row * UI_CONFIG['grid_cols'] + col, model))
+    gui.add_widget(Button(10, 210, 80, 25, "Upload All"))
+    return gui, model
+
+
+def measure(panel, target, action):
+    """Bytes und Transaktionen für action()"""
+    panel.spi.written = 0
+    panel.transactions = 0
+    action()
+    target.present()
+    return panel.spi.written, panel.transactions
+
+
+def run(indexed):
+    """Alle Fälle für eine Zeichenart, gibt Liste (Bytes, Transaktionen) zurück"""
+    panel = ILI9341Display()
+    panel.spi = CountingSPI()
+    target = IndexedFramebuffer(panel) if indexed else panel
+    gui, model = build_gui(target)
+    
+    def corners():
+        target.fill_rect(0, 0, 10, 10, Colors.RED)
+        target.fill_rect(target.width - 10, target.height - 10, 10, 10, Colors.RED)
+        
+    results = [measure(panel, target, gui.draw)]
+    results.append(measure(panel, target, lambda: (model.set_status(1, SlotModel.LOADED), gui.draw())))
+    results.append(measure(panel, target, corners))
+    return results, target
+
+
+def main(argv=None):
+    panel_freq = DISPLAY_CONFIG['freq']
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, SPI {panel_freq // 1000000} MHz, Band {DISPLAY_CONFIG['fb_band_bytes']} B, "
+          f"{DISPLAY_CONFIG['fb_dirty_rects']} Dirty-Rechtecke")
+          
+    direct, _ = run(False)
+    indexed, fb = run(True)
+    for name, a, b in zip(("Neuzeichnen", "Ein Slot", "Zwei Ecken"), direct, indexed):
+        print(f"{name:12s} direkt {a[0]:7d} B in {a[1]:3d} Transaktionen ({a[0] * 8000 / panel_freq:5.2f} ms)   "
+              f"Framebuffer {b[0]:7d} B in {b[1]} ({b[0] * 8000 / panel_freq:5.2f} ms)")
+              
+    stats = fb.stats()
+    ram = bench_hw.alloc_per_call(lambda: IndexedFramebuffer(ILI9341Display()), 1)
+    print(f"Framebuffer {stats['fb_bytes']} B + Band {stats['band_bytes']} B, "
+          f"Heap pro Instanz {ram / 1024:.1f} KB")
+    if bench_hw.MICROPYTHON:
+        print(f"present():   Mittel {stats['avg_push_us']} us, zuletzt {stats['last_push_us']} us")
+        
+    # Ganzes Bild einmal, die Ecken als zwei 16 Pixel breite Stufen
+    full = fb.width * fb.height * 2
+    ok = (indexed[0][1] == 1 and full <= indexed[0][0] < direct[0][0]
+          and indexed[1][1] == 1 and indexed[2][0] < 2 * 16 * 10 * 2 + 64)
+    print("✓ Framebuffer sendet nur geänderte Bereiche in einer Transaktion" if ok
+          else "✗ Übertragene Bytes weichen ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
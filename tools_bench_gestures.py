@@ -0,0 +1,158 @@
+"""
+Benchmark Gestenerkennung: verarbeitete Touch-Events und Swipe im Datei-Browser
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_gestures.py [sekunden]
+
+Gehaltener Finger: Der Touchscreen wird wie im Hauptloop 50-mal pro
+Sekunde abgefragt und liefert bei liegendem Finger jedes Mal touch_down.
+Zwei Drittel der Zeit liegt der Finger still (±1 Pixel ADC-Zittern),
+danach zieht er 50 Pixel. Verglichen wird, wie oft ein Widget aufgerufen
+wird - über GUIEngine.update() mit GestureRecognizer und wie früher mit
+jeder Abfrage direkt an handle_touch_event().
+
+Swipe: 100 Pixel nach oben in 100 ms über einem FileBrowser mit 180
+Pixeln Höhe (9 Zeilen). Erwartet wird genau eine Seite (8 Zeilen) und
+kein Nachlaufen.
+"""
+
+import bench_hw
+import sys
+import time
+from drivers.display import ILI9341Display
+from ui.gui import GUIEngine
+from ui.widgets import FileBrowser, Widget
+
+FRAME_MS = 20
+
+
+class ScriptedTouchscreen:
+    """Touchscreen, der pro Abfrage das nächste Sample liefert"""
+    
+    def __init__(self, samples):
+        self.samples = samples
+        self.pos = 0
+        self.last_x = 0
+        self.last_y = 0
+        
+    def done(self):
+        return self.pos >= len(self.samples)
+        
+    def get_touch(self):
+        sample = self.samples[self.pos] if self.pos < len(self.samples) else None
+        self.pos += 1
+        if sample:
+            self.last_x = sample[1]
+            self.last_y = sample[2]
+        return sample
+
+
+class CountingWidget(Widget):
+    """Fläche über das ganze Display, zählt Aufrufe der Touch-Handler"""
+    
+    def __init__(self):
+        super().__init__(0, 0, 320, 240)
+        self.calls = 0
+        
+    def on_touch_down(self, x, y):
+        super().on_touch_down(x, y)
+        self.calls += 1
+        
+    def on_touch_move(self, x, y):
+        self.calls += 1
+        
+    def on_touch_up(self, x, y):
+        super().on_touch_up(x, y)
+        self.calls += 1
+
+
+def hold_samples(polls):
+    """Finger liegt still mit Zittern, zieht dann 50 Pixel nach unten"""
+    still = polls * 2 // 3
+    samples = []
+    for i in range(polls):
+        if i < still:
+            samples.append(('touch_down', 100 + i % 3 - 1, 120 + (i // 3) % 2))
+        else:
+            samples.append(('touch_down', 100, 120 + (i - still) * 50 // (polls - still)))
+    samples.append(('touch_up', 100, 170))
+    return samples
+
+
+def run_frames(gui, touchscreen, direct=False):
+    """Frames im 20-ms-Takt, bis alle Samples abgefragt und Animationen aus"""
+    frames = 0
+    while not touchscreen.done() or gui.busy():
+        frame_start = time.ticks_ms()
+        if direct:
+            # Früherer Weg: jede Abfrage ist ein Event
+            touch = touchscreen.get_touch()
+            if touch:
+                gui.handle_touch_event(*touch)
+        else:
+            gui.update()
+        frames += 1
+        rest = FRAME_MS - time.ticks_diff(time.ticks_ms(), frame_start)
+        if rest > 0:
+            time.sleep_ms(rest)
+    return frames
+
+
+def hold(display, polls, direct):
+    """Gehaltener Finger, gibt (Widget-Aufrufe/s, Statistik) zurück"""
+    touchscreen = ScriptedTouchscreen(hold_samples(polls))
+    gui = GUIEngine(display, touchscreen)
+    widget = CountingWidget()
+    gui.add_widget(widget)
+    gui.gestures.stats()
+    start = time.ticks_ms()
+    run_frames(gui, touchscreen, direct)
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+    stats = gui.gestures.stats()
+    return widget.calls * 1000 // elapsed, stats
+
+
+def swipe(display):
+    """Swipe nach oben im Browser, gibt (scroll_px vorher, nachher, Schwung) zurück"""
+    samples = [('touch_down', 60, 150 - i * 20) for i in range(6)]
+    samples.append(('touch_up', 60, 50))
+    touchscreen = ScriptedTouchscreen(samples)
+    gui = GUIEngine(display, touchscreen)
+    browser = FileBrowser(0, 0, 150, 180)
+    browser.set_files([{'name': f"sample_{i:02d}.wav", 'path': f"/sd/sample_{i:02d}.wav"}
+                       for i in range(40)])
+    gui.add_widget(browser)
+    before = browser.scroll_px
+    run_frames(gui, touchscreen)
+    return before, browser.scroll_px, browser.velocity, gui.gestures.stats()['gestures']
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    seconds = int(argv[0]) if argv else 3
+    polls = seconds * 1000 // FRAME_MS
+    
+    display = ILI9341Display()
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, Finger {seconds} s gehalten, {1000 // FRAME_MS} Abfragen/s")
+    
+    calls, stats = hold(display, polls, False)
+    old_calls, _ = hold(display, polls, True)
+    print(f"Gesten:        {stats['samples_per_s']} Abfragen/s, {stats['handled_per_s']} Events/s verarbeitet, "
+          f"Widget {calls} Aufrufe/s")
+    print(f"               {stats['coalesced']} zusammengefasst, {stats['dropped']} verworfen, "
+          f"Gesten {stats['gestures']}")
+    print(f"Direkt:        Widget {old_calls} Aufrufe/s")
+    
+    before, after, velocity, gestures = swipe(display)
+    print(f"Swipe:         scroll_px {before} -> {after}, Schwung {velocity}, Gesten {gestures}")
+    
+    page = (180 // 20 - 1) * 20
+    ok = calls * 4 < old_calls and stats['dropped'] == 0 and after - before == page and not velocity
+    print("✓ Stillstand gefiltert, Swipe blättert genau eine Seite" if ok
+          else "✗ Events oder Swipe weichen ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
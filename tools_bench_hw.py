@@ -0,0 +1,309 @@
+"""
+Ersatz-Hardware für die Benchmarks in tools/ (bench_*.py)
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port) - nicht auf
+das Gerät kopieren. Die Skripte werden aus dem Projektverzeichnis im
+Geräte-Layout (midi/, sampling/, ...) gestartet:
+
+    python tools/bench_midi_tx.py
+
+Beim Import wird das Projektverzeichnis in sys.path gelegt, unter CPython
+werden die ticks-Funktionen von MicroPythons time und os.ilistdir ergänzt
+und ein minimales machine-Modul eingesetzt (Pins, SPI und PWM tun nichts,
+UART siehe PacedUART), fehlt framebuf, kommt ein Python-Ersatz dazu.
+Der Anwendungscode selbst läuft unverändert.
+"""
+
+import gc
+import os
+import sys
+import time
+
+TOOLS_DIR = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+ROOT = TOOLS_DIR + '/..'
+sys.path.insert(0, ROOT)
+sys.path.insert(0, ROOT + '/midi')
+
+MICROPYTHON = sys.implementation.name == 'micropython'
+
+# ===== time / os wie unter MicroPython =====
+
+if not hasattr(time, 'ticks_ms'):
+    _TICKS_PERIOD = 1 << 30
+    
+    def _ticks_diff(a, b):
+        d = (a - b) & (_TICKS_PERIOD - 1)
+        return d - _TICKS_PERIOD if d >= _TICKS_PERIOD // 2 else d
+        
+    time.ticks_ms = lambda: int(time.monotonic() * 1000) & (_TICKS_PERIOD - 1)
+    time.ticks_us = lambda: int(time.monotonic() * 1000000) & (_TICKS_PERIOD - 1)
+    time.ticks_cpu = time.ticks_us
+    time.ticks_diff = _ticks_diff
+    time.ticks_add = lambda a, b: (a + b) & (_TICKS_PERIOD - 1)
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
+
+if not hasattr(os, 'ilistdir'):
+    def _ilistdir(path):
+        for entry in os.scandir(path):
+            kind = 0x4000 if entry.is_dir() else 0x8000
+            yield (entry.name, kind, 0, entry.stat().st_size)
+            
+    os.ilistdir = _ilistdir
+
+# ===== machine =====
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    IRQ_FALLING = 2
+    IRQ_RISING = 4
+    
+    def __init__(self, *args, **kwargs):
+        self._value = kwargs.get('value', 1)
+        
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+        
+    def __call__(self, value=None):
+        return self.value(value)
+        
+    def on(self):
+        self._value = 1
+        
+    def off(self):
+        self._value = 0
+        
+    def irq(self, *args, **kwargs):
+        pass
+
+
+class SPI:
+    MSB = 0
+    
+    def __init__(self, *args, **kwargs):
+        pass
+        
+    def init(self, **kwargs):
+        pass
+        
+    def write(self, data):
+        pass
+        
+    def read(self, n, write=0):
+        return bytes(n)
+        
+    def readinto(self, buf, write=0):
+        pass
+
+
+class PWM:
+    def __init__(self, *args, **kwargs):
+        self._duty = 0
+        
+    def freq(self, value=None):
+        pass
+        
+    def duty(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+
+
+class PacedUART:
+    """UART mit der Übertragungszeit einer echten Leitung
+    
+    write() kopiert wie der ESP32-Treiber nur in den Sendepuffer,
+    txdone() meldet erst nach len * us_per_byte wieder frei. Mit
+    blocking=True wartet write() stattdessen selbst (wie früher
+    uart.write ohne Sendepuffer). Empfangsbytes kommen über feed().
+    """
+    
+    def __init__(self, *args, baudrate=31250, blocking=False, **kwargs):
+        self.us_per_byte = 10000000 // baudrate
+        self.blocking = blocking
+        self.rx = bytearray()
+        self.tx_bytes = 0
+        self.writes = 0
+        self._busy_until = time.ticks_us()
+        
+    def feed(self, data):
+        self.rx += data
+        
+    def any(self):
+        return len(self.rx)
+        
+    def readinto(self, buf, nbytes=None):
+        n = min(len(buf) if nbytes is None else nbytes, len(self.rx))
+        if not n:
+            return None
+        buf[:n] = self.rx[:n]
+        self.rx = self.rx[n:]
+        return n
+        
+    def write(self, buf, off=0, n=None):
+        n = len(buf) - off if n is None else n
+        self.tx_bytes += n
+        self.writes += 1
+        if self.blocking:
+            time.sleep_us(n * self.us_per_byte)
+        else:
+            # Hinter den Bytes, die noch im Sendepuffer liegen
+            start = time.ticks_us()
+            if time.ticks_diff(self._busy_until, start) > 0:
+                start = self._busy_until
+            self._busy_until = time.ticks_add(start, n * self.us_per_byte)
+        return n
+        
+    def txdone(self):
+        return time.ticks_diff(time.ticks_us(), self._busy_until) >= 0
+        
+    def irq(self, *args, **kwargs):
+        pass
+
+
+class _Machine:
+    """Ersatz für das machine-Modul"""
+    Pin = Pin
+    SPI = SPI
+    PWM = PWM
+    UART = PacedUART
+    
+    @staticmethod
+    def freq(*args):
+        return 240000000
+
+# Auch unter dem Unix-Port: dessen machine hat weder Pin noch UART
+sys.modules['machine'] = _Machine
+
+# ===== framebuf =====
+
+class _FrameBuffer:
+    """framebuf.FrameBuffer in Python für GS4_HMSB und RGB565
+    
+    Pixel für Pixel und damit langsam, aber mit demselben Speicherlayout
+    wie das C-Modul (GS4: linkes Pixel im oberen Nibble, RGB565: Little
+    Endian). text() zeichnet keine Glyphen, für die Zahl der
+    übertragenen Bytes spielt das keine Rolle.
+    """
+    
+    def __init__(self, buf, width, height, format):
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.format = format
+        
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 0 if c is None else None
+        buf = self.buf
+        i = x + y * self.width
+        if self.format == _Framebuf.RGB565:
+            if c is None:
+                return buf[2 * i] | (buf[2 * i + 1] << 8)
+            buf[2 * i] = c & 0xFF
+            buf[2 * i + 1] = (c >> 8) & 0xFF
+        elif c is None:
+            return (buf[i >> 1] >> 4) if not i & 1 else buf[i >> 1] & 0x0F
+        elif i & 1:
+            buf[i >> 1] = (buf[i >> 1] & 0xF0) | (c & 0x0F)
+        else:
+            buf[i >> 1] = (buf[i >> 1] & 0x0F) | ((c & 0x0F) << 4)
+            
+    def fill_rect(self, x, y, width, height, c):
+        for row in range(max(0, y), min(self.height, y + height)):
+            for col in range(max(0, x), min(self.width, x + width)):
+                self.pixel(col, row, c)
+                
+    def fill(self, c):
+        if self.format == _Framebuf.GS4_HMSB:
+            self.buf[:] = bytes((((c & 0x0F) << 4) | (c & 0x0F),)) * len(self.buf)
+        else:
+            self.fill_rect(0, 0, self.width, self.height, c)
+            
+    def hline(self, x, y, width, c):
+        self.fill_rect(x, y, width, 1, c)
+        
+    def vline(self, x, y, height, c):
+        self.fill_rect(x, y, 1, height, c)
+        
+    def rect(self, x, y, width, height, c):
+        self.fill_rect(x, y, width, 1, c)
+        self.fill_rect(x, y + height - 1, width, 1, c)
+        self.fill_rect(x, y, 1, height, c)
+        self.fill_rect(x + width - 1, y, 1, height, c)
+        
+    def text(self, text, x, y, c=1):
+        pass
+        
+    def blit(self, source, x, y, key=-1, palette=None):
+        for row in range(max(0, y), min(self.height, y + source.height)):
+            for col in range(max(0, x), min(self.width, x + source.width)):
+                c = source.pixel(col - x, row - y)
+                if palette is not None:
+                    c = palette.pixel(c, 0)
+                if c != key:
+                    self.pixel(col, row, c)
+
+
+class _Framebuf:
+    """Ersatz für das framebuf-Modul (nur die genutzten Formate)"""
+    RGB565 = 1
+    GS4_HMSB = 2
+    FrameBuffer = _FrameBuffer
+
+# Der Unix-Port bringt framebuf mit
+try:
+    import framebuf
+except ImportError:
+    sys.modules['framebuf'] = _Framebuf
+
+# ===== Messhilfen =====
+
+def work_dir(name):
+    """Leeres Arbeitsverzeichnis unter /tmp für Dateien eines Benchmarks"""
+    path = f"/tmp/cyd_bench_{name}"
+    try:
+        os.mkdir(path)
+    except OSError:
+        pass
+    for entry in os.ilistdir(path):
+        if entry[1] == 0x8000:
+            os.remove(f"{path}/{entry[0]}")
+    return path
+
+def alloc_per_call(fn, count):
+    """Heap-Bytes pro Aufruf von fn()
+    
+    MicroPython: gc.mem_alloc() bei abgeschaltetem GC - zählt jede
+    Allokation. CPython: Spitze über tracemalloc. CPython legt Integer
+    über 256 als Objekte an, ein kleiner fester Rest ist dort normal.
+    """
+    fn()
+    gc.collect()
+    if MICROPYTHON:
+        gc.disable()
+        before = gc.mem_alloc()
+        for _ in range(count):
+            fn()
+        used = gc.mem_alloc() - before
+        gc.enable()
+        return used / count
+        
+    import tracemalloc
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+def time_per_call(fn, count):
+    """Mittlere Dauer eines Aufrufs in us"""
+    start = time.ticks_us()
+    for _ in range(count):
+        fn()
+    return time.ticks_diff(time.ticks_us(), start) / count
\ No newline at end of file
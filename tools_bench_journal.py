@@ -0,0 +1,101 @@
+"""
+Benchmark Session-Journal: Schreibzugriffe beim Belegen und Wiederherstellen
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_journal.py [durchläufe]
+
+Ein Kit mit 64 Slots wird über das SlotModel belegt (plus zwei
+Status-Änderungen = 66 Datensätze) und mit dem echten Dateicode
+(sd_open) ins Journal unter /tmp geschrieben. Gemessen werden
+    Aufzeichnen      Datensätze, Schreibzugriffe, Journalgröße
+    Wiederherstellen replay() in ein leeres Modell, Mittel über alle
+                     Durchläufe
+    Abgeschnitten    letzter Datensatz halb geschrieben: Rest wird
+                     eingespielt, attach() verdichtet sofort
+"""
+
+import bench_hw
+import os
+import sys
+import time
+from sampling.journal import SessionJournal
+from sampling.slot_model import SlotModel
+
+SLOTS = 64
+
+
+def paths(directory):
+    return (directory + '/session.jnl', directory + '/session.snap')
+
+
+def record_kit(directory):
+    """Kit belegen, gibt das Journal zurück"""
+    model = SlotModel(SLOTS)
+    journal = SessionJournal(*paths(directory))
+    journal.attach(model)
+    for slot in range(SLOTS):
+        model.assign(slot, f"/sd/samples/drums/kit_{slot:02d}_sample.wav", 40000 + slot * 512)
+    model.set_status(0, SlotModel.UPLOADED)
+    model.set_status(1, SlotModel.UPLOADED)
+    journal.flush()
+    return model, journal
+
+
+def exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+def same_state(a, b):
+    return all(a.path(slot) == b.path(slot) and a.status[slot] == b.status[slot]
+               and a.size[slot] == b.size[slot] for slot in range(SLOTS))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = int(argv[0]) if argv else 200
+    
+    directory = bench_hw.work_dir('journal')
+    journal_path, snapshot_path = paths(directory)
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, Kit mit {SLOTS} Slots, {runs} Wiederherstellungen")
+    
+    model, journal = record_kit(directory)
+    size = os.stat(journal_path)[6]
+    print(f"Aufzeichnen:      {journal.records_written} Datensätze, {journal.flushes} Schreibzugriffe, "
+          f"Journal {size} Bytes")
+          
+    # Wiederherstellen wie beim Start (nur Journal lesen, keine Sample-Datei)
+    total_us = 0
+    for _ in range(runs):
+        restored = SlotModel(SLOTS)
+        start = time.ticks_us()
+        records = SessionJournal(journal_path, snapshot_path).replay(restored)
+        total_us += time.ticks_diff(time.ticks_us(), start)
+    ok = records == journal.records_written and same_state(model, restored)
+    print(f"Wiederherstellen: {records} Datensätze in {total_us / runs / 1000:.2f} ms")
+    
+    # Stromausfall mitten im letzten Datensatz
+    with open(journal_path, 'rb') as f:
+        data = f.read()
+    with open(journal_path, 'wb') as f:
+        f.write(data[:-5])
+    restored = SlotModel(SLOTS)
+    torn = SessionJournal(journal_path, snapshot_path)
+    records = torn.replay(restored)
+    torn.attach(restored)
+    compacted = torn.compactions == 1 and not exists(journal_path)
+    again = SlotModel(SLOTS)
+    SessionJournal(journal_path, snapshot_path).replay(again)
+    print(f"Abgeschnitten:    {records} Datensätze eingespielt, verdichtet {compacted}")
+    ok &= records == journal.records_written - 1 and compacted and same_state(restored, again)
+    
+    print("✓ Session vollständig wiederhergestellt" if ok else "✗ Wiederhergestellter Stand weicht ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
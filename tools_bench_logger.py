@@ -0,0 +1,107 @@
+"""
+Benchmark des Loggers: Dauer eines Log-Aufrufs im Hauptloop
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_logger.py [zeilen]
+
+Die Konsole wird durch eine Ausgabe mit der Geschwindigkeit von
+USB-Seriell (115200 Baud) ersetzt. Gemessen wird logger.info()
+    direkt      ohne LogSink (print wartet auf die Konsole)
+    LogSink     mit Ausgabe-Thread, Konsole und rotierender Log-Datei
+Während des LogSink-Laufs schreibt der Hauptthread wie das Journal eine
+eigene Datei über sd_open - beide Threads teilen sich sd_lock. Zum
+Schluss wird geprüft, dass keine Zeile verloren ging, die nicht als
+verworfen gezählt wurde.
+"""
+
+import bench_hw
+import sys
+import time
+from drivers import sdcard
+from drivers.sdcard import sd_open, sd_stat, sd_lock
+from utils.logger import Logger, LogSink
+
+US_PER_BYTE = 87                # 115200 Baud
+MESSAGE = "Upload Slot 12: 4096 Bytes, 3 Retries"
+
+
+class SlowConsole:
+    """Konsole, die pro Byte so lange braucht wie USB-Seriell"""
+    
+    def __init__(self):
+        self.buffer = self
+        
+    def write(self, data):
+        time.sleep_us(len(data) * US_PER_BYTE)
+        return len(data)
+        
+    def flush(self):
+        pass
+
+
+def run(logger, count, journal=None):
+    """count Log-Aufrufe im Frame-Takt, gibt die Histogramm-Kennzahlen zurück"""
+    for i in range(count):
+        logger.info(MESSAGE)
+        if journal:
+            journal.write(b'slot 12 uploaded\n')
+        time.sleep_ms(2)
+    return logger.call_us.summary()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 300
+    
+    directory = bench_hw.work_dir('logger')
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, {count} Log-Aufrufe, Konsole {US_PER_BYTE} us/Byte")
+    
+    real = sys.stdout
+    console = SlowConsole()
+    try:
+        sys.stdout = console
+    except AttributeError:
+        # MicroPython: sys.stdout nicht ersetzbar, echte Konsole messen
+        console = None
+        
+    direct = run(Logger(True, 'INFO'), count)
+    
+    sink = LogSink()
+    sink.file_max = 4096
+    sink.set_file(directory + '/app.log', sdcard)
+    sink.start()
+    logger = Logger(True, 'INFO', sink)
+    with sd_open(directory + '/session.jnl', 'ab') as journal:
+        buffered = run(logger, count, journal)
+    sink.stop()
+    
+    if console:
+        sys.stdout = real
+    stats = sink.stats()
+    
+    print(f"direkt   Mittel {direct['mean']:6d} us  p99 {direct['p99']:6d} us  Max {direct['max']:6d} us")
+    print(f"LogSink  Mittel {buffered['mean']:6d} us  p99 {buffered['p99']:6d} us  Max {buffered['max']:6d} us")
+    print(f"LogSink  {stats['lines']} Zeilen, {stats['dropped']} verworfen, "
+          f"{stats['flushes']} Ausgaben, Fehler {stats['errors']}")
+          
+    # Log-Datei samt rotierten Teilen zählen
+    lines = 0
+    for suffix in ('', '.1', '.2'):
+        try:
+            sd_stat(directory + '/app.log' + suffix)
+        except OSError:
+            continue
+        with sd_open(directory + '/app.log' + suffix, 'rb') as f:
+            lines += f.read().count(b'\n')
+    journal_lines = sd_stat(directory + '/session.jnl')[6] // len(b'slot 12 uploaded\n')
+    print(f"Datei    {lines} Zeilen (inkl. rotierter), Journal {journal_lines}/{count}")
+    
+    ok = (not stats['errors'] and stats['lines'] + stats['dropped'] == count
+          and journal_lines == count and not sd_lock.locked())
+    print("✓ Keine Zeile ungezählt verloren" if ok else "✗ Zeilen oder SD-Zugriffe fehlen")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
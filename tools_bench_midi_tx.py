@@ -0,0 +1,75 @@
+"""
+Benchmark der MIDI-Sende-Queue: Dauer und Heap-Allokationen pro Paket
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_midi_tx.py [anzahl]
+
+Misst send_sysex, send_midi_message und upload_sample_to_slot jeweils
+inklusive flush_tx() an einen UART, der sofort fertig meldet. Unter
+MicroPython muss jede Zeile 0 B/Paket zeigen. Unter CPython bleibt ein
+fester Rest (Integer-Objekte), der nicht von der Paketgröße abhängen darf.
+"""
+
+import bench_hw
+import sys
+from midi.circuit_tracks import CircuitTracksController
+
+
+class InstantUART(bench_hw.PacedUART):
+    """Leitung ohne Übertragungszeit - gemessen wird nur die Software"""
+    
+    def txdone(self):
+        return True
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 500
+    
+    controller = CircuitTracksController()
+    controller.uart = InstantUART()
+    controller.device_connected = True
+    
+    manufacturer = (0x00, 0x20, 0x29)
+    payload = bytearray(range(120)) * 2
+    small = payload[:24]
+    sample = bytes(range(256)) * 4
+    
+    def sysex():
+        controller.send_sysex(manufacturer, payload)
+        controller.flush_tx()
+        
+    def sysex_small():
+        controller.send_sysex(manufacturer, small)
+        controller.flush_tx()
+        
+    def short():
+        controller.send_midi_message(0x90, 60, 100)
+        controller.flush_tx()
+        
+    def upload():
+        controller.upload_sample_to_slot(sample, 3)
+        controller.flush_tx()
+        
+    def empty():
+        pass
+        
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, {count} Pakete pro Messung")
+    base = bench_hw.alloc_per_call(empty, count)
+    for name, fn in (('send_sysex 24 B', sysex_small),
+                     ('send_sysex 240 B', sysex),
+                     ('send_midi_message', short),
+                     ('upload_sample_to_slot', upload)):
+        us = bench_hw.time_per_call(fn, count)
+        heap = bench_hw.alloc_per_call(fn, count) - base
+        print(f"{name:24s} {us:8.1f} us/Paket  {heap:6.0f} B/Paket")
+        
+    stats = controller.tx_stats()
+    print(f"Gesendet: {stats['packets']} Pakete, {stats['bytes']} Bytes, "
+          f"verworfen: {stats['dropped']}")
+    return 0 if not stats['dropped'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Benchmark Frame-Takt nach Aktivität: Wakeups pro Zustand und Touch-Reaktion
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_power.py [touches]
+
+Ein Loop wie in main.py (4 ms Arbeit pro Frame, dann PowerManager.wait)
+läuft nacheinander in den drei Zuständen, die Zeiten bis idle/sleep
+werden dafür in POWER_CONFIG verkürzt. Danach löst ein zweiter Thread
+zu zufälligen Zeitpunkten den Touch-IRQ aus, während der Loop schläft.
+Gemessen werden
+    Wakeups/s      je Zustand (active, idle, sleep)
+    Touch          IRQ bis Ende des ersten Frames, der ihn verarbeitet
+Unter CPython kann select.poll keine Python-Objekte abfragen, der
+PowerManager schläft dann in 10-ms-Scheiben.
+"""
+
+import bench_hw
+import _thread
+import sys
+import time
+from config import POWER_CONFIG
+from utils.power import PowerManager
+
+FRAME_WORK_US = 4000
+
+
+def work():
+    start = time.ticks_us()
+    while time.ticks_diff(time.ticks_us(), start) < FRAME_WORK_US:
+        pass
+
+
+def run_state(power, duration_ms, active):
+    """Loop für duration_ms, gibt Wakeups pro Sekunde zurück"""
+    start = time.ticks_ms()
+    wakeups = power.wakeups
+    while time.ticks_diff(time.ticks_ms(), start) < duration_ms:
+        frame_start = time.ticks_ms()
+        if active:
+            power.activity()
+        work()
+        power.frame_done()
+        power.wait(frame_start)
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+    return (power.wakeups - wakeups) * 1000 / elapsed
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    touches = int(argv[0]) if argv else 8
+    
+    power = PowerManager()
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    mode = 'select.poll' if power._poller else '10-ms-Scheiben'
+    print(f"{runtime}, Frame-Arbeit {FRAME_WORK_US // 1000} ms, Warten über {mode}")
+    
+    POWER_CONFIG['idle_after_ms'] = 200
+    POWER_CONFIG['sleep_after_ms'] = 1000000
+    rates = [run_state(power, 1000, True)]
+    run_state(power, 300, False)
+    rates.append(run_state(power, 2000, False))
+    POWER_CONFIG['idle_after_ms'] = 0
+    POWER_CONFIG['sleep_after_ms'] = 0
+    run_state(power, 1000, False)
+    rates.append(run_state(power, 3000, False))
+    for name, rate in zip(PowerManager.STATE_NAMES, rates):
+        print(f"{name:8s} {rate:5.1f} Wakeups/s")
+        
+    # Touch-IRQ aus einem anderen Thread, während der Loop schläft
+    touched = [0]
+    
+    def touch_thread():
+        seed = 4711
+        for _ in range(touches):
+            seed = (seed * 1103515245 + 12345) & 0x7FFFFFFF
+            time.sleep_ms(250 + seed % 700)
+            touched[0] += 1
+            power.on_touch_irq(None)
+        # Letzten Touch noch verarbeiten lassen
+        time.sleep_ms(500)
+        touched[0] = -1
+        
+    handled = 0
+    _thread.start_new_thread(touch_thread, ())
+    while touched[0] >= 0:
+        frame_start = time.ticks_ms()
+        if touched[0] > handled:
+            handled = touched[0]
+            power.activity()
+            work()
+        power.frame_done()
+        power.wait(frame_start)
+        
+    latency = power.touch_latency.summary()
+    print(f"Touch aus sleep: {latency['count']} IRQs, Mittel {latency['mean']} ms, "
+          f"p99 {latency['p99']} ms, Max {latency['max']} ms")
+          
+    ok = (45 <= rates[0] <= 51 and 9 <= rates[1] <= 11 and 0.5 <= rates[2] <= 1.5
+          and latency['count'] == touches)
+    print("✓ Takt folgt der Aktivität" if ok else "✗ Takt oder Touch-Reaktion weichen ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Benchmark MIDI-Parser, Routing und Thru
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_router.py [nachrichten]
+
+Der UART hat die Leitungszeit von MIDI (31250 Baud). Gemessen werden
+    Parser      Dauer pro 3-Byte-Note-On (geroutet / gefiltert)
+    Thru        Latenz vom Lesen des Eingangspuffers bis das letzte Byte
+                der weitergeleiteten Nachricht auf der Leitung ist -
+                bei freier Leitung und hinter einem Upload-Paket, das
+                gerade gesendet wird
+"""
+
+import bench_hw
+import sys
+import time
+from midi.circuit_tracks import CircuitTracksController
+from midi.router import MIDIRouter
+
+NOTE_ON = bytes((0x90, 60, 100))
+NOTE_ON_FILTERED = bytes((0x95, 60, 100))       # Kanal 6, keine Route
+
+
+def setup():
+    controller = CircuitTracksController()
+    controller.device_connected = True
+    router = MIDIRouter(controller)
+    notes = [0]
+    
+    def on_note(channel, note, velocity):
+        notes[0] += 1
+        
+    router.add_route(controller.NOTE_ON, 0, on_note)
+    return controller, router, notes
+
+
+def parse(router, controller, message, count):
+    """count Nachrichten auf einmal einspeisen, us pro Nachricht"""
+    batch = message * count
+    
+    def poll():
+        controller.uart.feed(batch)
+        router.poll()
+        
+    return bench_hw.time_per_call(poll, 10) / count
+
+
+def thru_latency(router, controller, count, busy):
+    """count einzelne Nachrichten weiterleiten, gibt (Mittel, Max) in us"""
+    router.thru_count = 0
+    router.thru_latency_sum_us = 0
+    router.thru_latency_max_us = 0
+    sample = bytes(range(256)) * 4
+    for _ in range(count):
+        # Leitung frei abwarten, bei busy vorher ein Upload-Paket senden
+        while not controller.uart.txdone():
+            time.sleep_ms(1)
+        if busy:
+            controller.upload_sample_to_slot(sample, 3)
+            controller.flush_tx()
+        controller.uart.feed(NOTE_ON)
+        router.poll()
+    stats = router.stats()
+    return stats['thru_latency_avg_us'], stats['thru_latency_max_us']
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 100
+    
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, {count} Nachrichten pro Messung, 31250 Baud")
+    
+    controller, router, notes = setup()
+    print(f"Parser geroutet      {parse(router, controller, NOTE_ON, count):6.1f} us/Nachricht")
+    print(f"Parser gefiltert     {parse(router, controller, NOTE_ON_FILTERED, count):6.1f} us/Nachricht")
+    
+    router.set_thru(True)
+    wire_us = len(NOTE_ON) * controller.tx_byte_us
+    idle = thru_latency(router, controller, min(count, 50), False)
+    print(f"Thru freie Leitung   Mittel {idle[0]:6d} us  Max {idle[1]:6d} us  "
+          f"(Leitungszeit {wire_us} us)")
+    busy = thru_latency(router, controller, 5, True)
+    print(f"Thru hinter Upload   Mittel {busy[0]:6d} us  Max {busy[1]:6d} us")
+    
+    # Die Latenz kann nie unter der Leitungszeit der Nachricht liegen
+    ok = idle[0] >= wire_us and busy[0] > idle[0] and notes[0] > 0
+    print("✓ Thru-Latenz enthält die Leitungszeit" if ok else "✗ Thru-Latenz unplausibel")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
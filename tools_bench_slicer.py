@@ -0,0 +1,116 @@
+"""
+Benchmark des Auto-Slicers: Dauer, Treffergenauigkeit und UI-Pausen
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_slicer.py [sekunden]
+
+Erzeugt unter /tmp einen Break (44,1 kHz, Stereo, 16 Bit, Schläge alle
+1,875 s mit leichtem Versatz und Rauschteppich) und zerlegt ihn mit dem
+echten SampleSlicer. Ausgegeben werden Analyse- und Schreibzeit, die
+größte Abweichung der Slice-Punkte von den Schlägen und die längste
+Pause zwischen zwei progress()-Aufrufen - so lange stünde die
+Oberfläche beim Slicen im Hauptloop höchstens still.
+"""
+
+import bench_hw
+import sys
+import time
+from array import array
+from sampling.slicer import SampleSlicer
+from sampling import wav
+
+RATE = 44100
+BEAT = RATE * 15 // 8           # 1,875 s (128 BPM, ein Takt)
+MAX_SLICES = 64
+
+
+def make_break(path, seconds):
+    """Test-WAV schreiben, gibt die Schlag-Positionen in Frames zurück"""
+    # Ein Schlag: abklingende Schwingung, vorab berechnet
+    hit = array('h', [0] * (RATE // 4))
+    level = 20000.0
+    for i in range(len(hit)):
+        hit[i] = int(level) if (i // 12) & 1 else -int(level)
+        level *= 0.9995
+        
+    # Rauschteppich aus einem kurzen Pseudo-Zufallsmuster
+    noise = array('h', [0] * 997)
+    seed = 12345
+    for i in range(len(noise)):
+        seed = (seed * 1103515245 + 12345) & 0x7FFFFFFF
+        noise[i] = (seed >> 16) % 81 - 40
+        
+    total = seconds * RATE
+    hits = []
+    pos = RATE * 3 // 10
+    n = 0
+    while pos < total:
+        hits.append(pos)
+        n += 1
+        pos = RATE * 3 // 10 + n * BEAT + (n * 7919 % 4411) - 2205
+        
+    block = array('h', [0] * (RATE * 2))
+    with open(path, 'wb') as f:
+        wav.write_header(f, RATE, 2, 16, total * 4)
+        h = 0
+        for start in range(0, total, RATE):
+            count = min(RATE, total - start)
+            for k in range(count):
+                frame = start + k
+                while h + 1 < len(hits) and frame >= hits[h + 1]:
+                    h += 1
+                v = noise[frame % 997]
+                t = frame - hits[h]
+                if 0 <= t < len(hit):
+                    v += hit[t]
+                block[2 * k] = v
+                block[2 * k + 1] = v
+            f.write(memoryview(block)[:count * 2])
+    return hits
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    seconds = int(argv[0]) if argv else 120
+    
+    directory = bench_hw.work_dir('slicer')
+    source = directory + '/break.wav'
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, Break {seconds} s, 44,1 kHz Stereo 16 Bit")
+    hits = make_break(source, seconds)
+    
+    gap = [0, time.ticks_ms(), 0]
+    
+    def progress(stage, done, total):
+        now = time.ticks_ms()
+        gap[0] = max(gap[0], time.ticks_diff(now, gap[1]))
+        gap[1] = now
+        gap[2] += 1
+        
+    slicer = SampleSlicer(bench_hw.work_dir('slicer_out'))
+    start = time.ticks_ms()
+    gap[1] = start
+    paths = slicer.slice(source, MAX_SLICES, progress)
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+    stats = slicer.stats()
+    
+    # Jeder Slice-Punkt muss auf einem Schlag liegen (bei mehr Schlägen
+    # als Slots fallen die schwächsten weg)
+    info, starts = slicer.analyse(source, MAX_SLICES)
+    error = 0
+    for begin in starts[1:]:
+        error = max(error, min(abs(begin - beat) for beat in hits))
+        
+    print(f"Slices:        {len(paths)} (Schläge {len(hits)}, gekürzt {stats['truncated']})")
+    print(f"Analyse:       {stats['analyse_ms']} ms")
+    print(f"Schreiben:     {stats['write_ms']} ms")
+    print(f"Gesamt:        {elapsed} ms")
+    print(f"Abweichung:    max {error * 1000 // RATE} ms")
+    print(f"UI-Pause:      max {gap[0]} ms ({gap[2]} progress-Aufrufe)")
+    ok = len(paths) == min(len(hits) + 1, MAX_SLICES) and error * 1000 // RATE <= 20
+    print("✓ Slice-Punkte stimmen" if ok else "✗ Slice-Punkte weichen ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Benchmark Eingabe-Trace: Aufzeichnen und Wiedergeben einer Bedienung
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_trace.py [sekunden]
+
+Aufnahme: Eine vorgegebene Bedienung (Button-Taps, eine Wischbewegung,
+Noten und Noten-Bursts auf MIDI) läuft im 20-ms-Frame-Takt durch echte
+GUIEngine und MIDIManager, beide zeichnen in einen TraceRecorder unter
+/tmp auf. Wiedergabe: TraceReplay spielt den Trace mit 1- und 4-facher
+Geschwindigkeit in frische Instanzen mit PowerManager ein - wie
+replay_trace() in main.py. Geprüft wird, dass jede Wiedergabe dieselben
+Button-Taps und Noten auslöst wie die Aufnahme.
+"""
+
+import bench_hw
+import sys
+import time
+from config import TRACE_CONFIG
+from drivers.display import ILI9341Display
+from midi.circuit_tracks import CircuitTracksController
+from midi.router import MIDIRouter
+from ui.gui import GUIEngine
+from ui.widgets import Button
+from utils.power import PowerManager
+from utils.trace import TraceRecorder, TraceReplay
+
+FRAME_MS = 20
+BUTTON = (10, 210, 80, 25)
+
+
+class ScriptedTouchscreen:
+    """Touchscreen, der pro Abfrage das nächste Sample der Bedienung liefert"""
+    
+    def __init__(self, frames):
+        self.samples = [None] * frames
+        self.pos = 0
+        self.pressed = False
+        # Button-Tap alle 300 ms: 3 Abfragen gedrückt, dann loslassen
+        for start in range(10, frames - 20, 15):
+            for i in range(3):
+                self.samples[start + i] = ('touch_down', 40 + i, 220)
+            self.samples[start + 3] = ('touch_up', 42, 220)
+        # Eine Wischbewegung über die freie Fläche
+        middle = frames // 2 + 5
+        for i in range(8):
+            self.samples[middle + i] = ('touch_down', 150 + i * 12, 100)
+        self.samples[middle + 8] = ('touch_up', 246, 100)
+        
+    def set_irq_handler(self, handler):
+        pass
+        
+    def is_pressed(self):
+        return self.pressed
+        
+    def get_touch(self):
+        sample = self.samples[self.pos] if self.pos < len(self.samples) else None
+        self.pos += 1
+        if sample:
+            self.pressed = sample[0] == 'touch_down'
+        return sample
+
+
+def setup(display, touchscreen):
+    """GUI mit einem Button und MIDI mit Noten-Zähler"""
+    gui = GUIEngine(display, touchscreen)
+    presses = [0, 0]
+    
+    def on_press():
+        presses[0] += 1
+        
+    def on_note(channel, note, velocity):
+        presses[1] += 1
+        
+    gui.add_widget(Button(*BUTTON, "Tap", on_press))
+    controller = CircuitTracksController()
+    router = MIDIRouter(controller)
+    router.add_route(controller.NOTE_ON, None, on_note)
+    return gui, controller, presses
+
+
+def record(path, display, frames):
+    """Bedienung in Echtzeit durchspielen und aufzeichnen"""
+    gui, controller, presses = setup(display, ScriptedTouchscreen(frames))
+    recorder = TraceRecorder(path)
+    gui.trace = recorder
+    controller.trace = recorder
+    for frame in range(frames):
+        frame_start = time.ticks_ms()
+        controller.uart.feed(bytes((0x90, frame & 0x7F, 100)))
+        if frame % 4 == 0:
+            controller.uart.feed(bytes((0x91, 36, 90)) * 8)
+        controller.poll()
+        gui.update()
+        gui.draw()
+        recorder.tick()
+        rest = FRAME_MS - time.ticks_diff(time.ticks_ms(), frame_start)
+        if rest > 0:
+            time.sleep_ms(rest)
+    recorder.close()
+    return presses, recorder.stats()
+
+
+def replay(path, display, speed):
+    """Trace wie replay_trace() in main.py abspielen"""
+    gui, controller, presses = setup(display, None)
+    power = PowerManager()
+    trace = TraceReplay(path, speed)
+    trace.touchscreen.set_irq_handler(power.on_touch_irq)
+    trace.on_midi = power.wake
+    trace.install(gui, controller)
+    trace.start()
+    while not trace.done():
+        frame_start = time.ticks_ms()
+        frame_start_us = time.ticks_us()
+        touched = gui.update()
+        events = controller.poll()
+        if touched or events or gui.busy():
+            power.activity()
+        gui.draw()
+        power.frame_done()
+        trace.frame_done(frame_start_us, power.frame_ms[power.state])
+        power.wait(frame_start)
+    trace.stop()
+    trace.restore()
+    return presses, trace.report()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    seconds = int(argv[0]) if argv else 3
+    frames = seconds * 1000 // FRAME_MS
+    
+    path = bench_hw.work_dir('trace') + '/input.trc'
+    display = ILI9341Display()
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, Bedienung {seconds} s, Frame {FRAME_MS} ms, "
+          f"Puffer {TRACE_CONFIG['buffer']} B")
+          
+    recorded, stats = record(path, display, frames)
+    print(f"Aufnahme:   {stats['records']} Datensätze, {stats['bytes']} Bytes, "
+          f"{stats['flushes']} Schreibzugriffe, {recorded[0]} Taps, {recorded[1]} Noten")
+          
+    ok = recorded[0] > 0
+    for speed in (1, 4):
+        presses, report = replay(path, display, speed)
+        touch = report['touch_latency_ms']
+        midi = report['midi_latency_ms']
+        frames_ms = report['frames']
+        print(f"x{speed}: {report['events']} Ereignisse in {report['duration_ms']} ms, "
+              f"{presses[0]} Taps, {presses[1]} Noten")
+        print(f"    Touch  Mittel {touch['mean']} ms  p99 {touch['p99']} ms   "
+              f"MIDI Mittel {midi['mean']} ms  p99 {midi['p99']} ms")
+        print(f"    Frame  Mittel {frames_ms['mean']} ms  Stdabw {frames_ms['stddev']}  "
+              f"p99 {report['frame_p99_ms']} ms  verpasst {report['missed_deadlines']}  "
+              f"verworfen {report['touch_dropped']}  Overruns {report['uart_overruns']}")
+        ok &= presses == recorded
+        
+    print("✓ Wiedergabe löst dieselben Taps und Noten aus" if ok
+          else "✗ Wiedergabe weicht von der Aufnahme ab")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
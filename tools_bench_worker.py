@@ -0,0 +1,136 @@
+"""
+Benchmark Frame-Zeiten mit und ohne MIDI-Worker-Thread
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/bench_worker.py [slots] [frames]
+
+Beide Durchläufe nutzen denselben Anwendungscode (SampleManager, Router,
+Worker) mit Sample-Dateien unter /tmp und einem UART mit MIDI-Leitungszeit
+(31250 Baud). Pro Frame kommen Noten herein und es wird ~4 ms "gezeichnet".
+Nach 10 Frames startet "Upload All":
+    ohne Worker  upload_all_pending() im Frame (wie im Hauptloop)
+    mit Worker   submit_upload() pro Slot (volle Auftrags-Queue wird in
+                 den folgenden Frames nachgefüllt), Status über
+                 process_events()
+Ausgegeben werden Mittelwert, Standardabweichung, Varianz und Maximum
+der Frame-Zeit (Arbeit ohne sleep).
+"""
+
+import bench_hw
+import sys
+import time
+import config
+from midi.circuit_tracks import CircuitTracksController
+from midi.router import MIDIRouter
+from midi.worker import MIDIWorker
+from drivers.sdcard import SDCardManager
+from sampling.sample_manager import SampleManager
+from utils.stats import RunningStats
+
+FRAME_WORK_US = 4000
+FRAME_MS = 20
+UPLOAD_FRAME = 10
+
+
+def draw():
+    """Zeichnen eines Frames nachbilden (reine Python-Arbeit)"""
+    start = time.ticks_us()
+    while time.ticks_diff(time.ticks_us(), start) < FRAME_WORK_US:
+        pass
+
+
+def setup(name, slots):
+    """Controller, Router und SampleManager mit slots belegten Slots"""
+    directory = bench_hw.work_dir(name)
+    config.PATHS['samples'] = directory
+    config.PATHS['journal'] = directory + '/session.jnl'
+    config.PATHS['snapshot'] = directory + '/session.snap'
+    config.PATHS['upload_cache'] = directory
+    
+    controller = CircuitTracksController()
+    controller.device_connected = True
+    router = MIDIRouter(controller)
+    sd_manager = SDCardManager()
+    sd_manager.mounted = True
+    manager = SampleManager(sd_manager, controller)
+    
+    for slot in range(slots):
+        path = f"{directory}/bench_{slot:02d}.raw"
+        with open(path, 'wb') as f:
+            f.write(bytes([slot]) * 16384)
+        manager.assign_sample_to_slot(slot, path)
+    return controller, router, manager
+
+
+def run(use_worker, slots, frames):
+    controller, router, manager = setup('worker' if use_worker else 'single', slots)
+    notes = [0]
+    
+    def on_note(channel, note, velocity):
+        notes[0] += 1
+        
+    router.add_route(controller.NOTE_ON, None, on_note)
+    
+    worker = None
+    if use_worker:
+        worker = MIDIWorker(controller, router, manager)
+        worker.start()
+        
+    stats = RunningStats()
+    for frame in range(frames):
+        start = time.ticks_us()
+        controller.uart.feed(bytes((0x90, frame & 0x7F, 100)))
+        
+        draw()
+        if worker and frame >= UPLOAD_FRAME:
+            # Auftrags-Queue nachfüllen, solange Slots ausstehen
+            pending = manager.pending_uploads
+            while pending and worker.submit_upload(pending[0]):
+                pending.pop(0)
+        elif frame == UPLOAD_FRAME:
+            manager.upload_all_pending()
+                
+        if worker:
+            worker.process_events()
+        else:
+            router.poll()
+        manager.tick()
+        
+        stats.add(time.ticks_diff(time.ticks_us(), start) / 1000)
+        time.sleep_ms(FRAME_MS)
+        
+    if worker:
+        # Restliche Uploads abwarten
+        deadline = time.ticks_add(time.ticks_ms(), 10000)
+        while (len(worker.jobs) or worker.uploads_done + worker.uploads_failed < slots) \
+                and time.ticks_diff(deadline, time.ticks_ms()) > 0:
+            time.sleep_ms(10)
+            worker.process_events()
+        # Letzte Note aus dem Worker abholen
+        time.sleep_ms(FRAME_MS)
+        worker.process_events()
+        worker.stop()
+        
+    uploaded = sum(1 for slot in range(slots) if manager.slots.status[slot] == manager.slots.UPLOADED)
+    summary = stats.summary()
+    print(f"{'mit Worker ' if use_worker else 'ohne Worker'}  Frame {summary['mean']:6.1f} ms  "
+          f"Stdabw {summary['stddev']:6.1f}  Varianz {stats.variance():9.1f}  "
+          f"Max {summary['max']:7.1f} ms  Noten {notes[0]}/{frames}  "
+          f"hochgeladen {uploaded}/{slots}")
+    return uploaded == slots
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    slots = int(argv[0]) if argv else 32
+    frames = int(argv[1]) if len(argv) > 1 else 120
+    
+    runtime = 'MicroPython' if bench_hw.MICROPYTHON else 'CPython'
+    print(f"{runtime}, {slots} Uploads in Frame {UPLOAD_FRAME}, {frames} Frames")
+    ok = run(False, slots, frames)
+    ok = run(True, slots, frames) and ok
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
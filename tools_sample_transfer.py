@@ -0,0 +1,306 @@
+"""
+Sample-Übertragung vom Rechner auf die SD-Karte des CYD (USB-Seriell)
+Läuft auf dem Rechner (CPython, POSIX) - nicht auf das Gerät kopieren
+
+    python tools/sample_transfer.py /dev/ttyUSB0 ~/Samples/Drums ~/Samples/Keys
+
+Startet den Empfänger über die REPL (sampling.transfer.receive), überträgt
+alle unterstützten Dateien der Ordner und setzt das Gerät danach zurück.
+Protokoll siehe sampling/transfer.py.
+"""
+
+import argparse
+import binascii
+import hashlib
+import os
+import select
+import struct
+import sys
+import termios
+import time
+import tty
+
+SYNC = b'\xA5\x5A'
+HEADER_FMT = '<2sBHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+
+T_HELLO = 1
+T_FILE = 2
+T_FILE_ACK = 3
+T_DATA = 4
+T_ACK = 5
+T_NAK = 6
+T_DONE = 7
+T_END = 8
+
+ST_SEND = 0
+ST_SKIP = 1
+ST_OK = 2
+ST_ERROR = 3
+
+HELLO_FMT = '<BHBB'
+FILE_FMT = '<I32s'
+END_FMT = '<HHH'
+
+SUPPORTED_FORMATS = ('.wav', '.raw')
+REPL_COMMAND = b'from sampling.transfer import receive; receive()\r'
+
+
+def frame_crc(header, payload):
+    return binascii.crc32(payload, binascii.crc32(header[2:7])) & 0xFFFFFFFF
+
+
+class SerialLink:
+    """Rohes serielles Gerät (oder PTY) mit Frame-Parser"""
+    
+    BAUD_RATES = {
+        9600: termios.B9600, 57600: termios.B57600, 115200: termios.B115200,
+        230400: getattr(termios, 'B230400', termios.B115200),
+        460800: getattr(termios, 'B460800', termios.B115200),
+        921600: getattr(termios, 'B921600', termios.B115200),
+    }
+    
+    def __init__(self, path, baud=None):
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        if os.isatty(self.fd):
+            tty.setraw(self.fd)
+            if baud:
+                attrs = termios.tcgetattr(self.fd)
+                attrs[4] = attrs[5] = self.BAUD_RATES[baud]
+                termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+        self._buf = bytearray()
+        self.bytes_sent = 0
+        
+    def close(self):
+        os.close(self.fd)
+        
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            n = os.write(self.fd, view)
+            view = view[n:]
+            self.bytes_sent += n
+            
+    def send_frame(self, ftype, seq, payload=b''):
+        header = bytearray(struct.pack(HEADER_FMT, SYNC, ftype, seq & 0xFFFF, len(payload), 0))
+        struct.pack_into('<I', header, 7, frame_crc(header, payload))
+        self.write(bytes(header) + bytes(payload))
+        
+    def has_input(self):
+        """Liegen ungelesene Daten vor (ohne zu blockieren)?"""
+        return bool(self._buf) or bool(select.select([self.fd], [], [], 0)[0])
+        
+    def _fill(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        data = os.read(self.fd, 65536)
+        if not data:
+            raise ConnectionError("Verbindung getrennt")
+        self._buf += data
+        return True
+        
+    def read_frame(self, timeout):
+        """Nächsten gültigen Frame (Typ, Seq, Nutzdaten) oder None"""
+        deadline = time.monotonic() + timeout
+        while True:
+            start = self._buf.find(SYNC)
+            if start < 0:
+                # REPL-Echo u.ä. verwerfen, letztes Byte könnte SYNC beginnen
+                del self._buf[:-1]
+            else:
+                del self._buf[:start]
+                if len(self._buf) >= HEADER_SIZE:
+                    _, ftype, seq, length, crc = struct.unpack_from(HEADER_FMT, self._buf)
+                    if len(self._buf) >= HEADER_SIZE + length:
+                        payload = bytes(self._buf[HEADER_SIZE:HEADER_SIZE + length])
+                        if frame_crc(self._buf[:HEADER_SIZE], payload) == crc:
+                            del self._buf[:HEADER_SIZE + length]
+                            return ftype, seq, payload
+                        # Kein gültiger Frame an dieser Stelle
+                        del self._buf[:1]
+                        continue
+            remaining = deadline - time.monotonic()
+            if remaining < 0 or not self._fill(remaining):
+                return None
+
+
+class TransferError(Exception):
+    pass
+
+
+class SampleSender:
+    """Überträgt Dateien mit Go-Back-N und Fenster-ACKs"""
+    
+    def __init__(self, link, timeout=2.0, retries=5, verbose=True):
+        self.link = link
+        self.timeout = timeout
+        self.retries = retries
+        self.verbose = verbose
+        self.block_size = 0
+        self.window = 0
+        self.resent_blocks = 0
+        self.payload_bytes = 0
+        
+    def log(self, message):
+        if self.verbose:
+            print(message)
+            
+    def handshake(self):
+        """HELLO austauschen, Blockgröße und Fenster vom Gerät übernehmen"""
+        for _ in range(self.retries):
+            self.link.send_frame(T_HELLO, 0)
+            frame = self.link.read_frame(self.timeout)
+            while frame and frame[0] != T_HELLO:
+                frame = self.link.read_frame(self.timeout)
+            if frame:
+                version, self.block_size, self.window, _ = struct.unpack(HELLO_FMT, frame[2])
+                self.log(f"✓ Empfänger v{version}: Block {self.block_size} B, Fenster {self.window}")
+                return
+        raise TransferError("Keine Antwort vom Empfänger")
+        
+    def _request(self, ftype, seq, payload, expect):
+        """Frame senden und auf die passende Antwort warten (mit Wiederholung)"""
+        for _ in range(self.retries):
+            self.link.send_frame(ftype, seq, payload)
+            deadline = time.monotonic() + self.timeout
+            while time.monotonic() < deadline:
+                frame = self.link.read_frame(deadline - time.monotonic())
+                if frame and frame[0] == expect and frame[1] == seq & 0xFFFF:
+                    return frame[2]
+        raise TransferError(f"Keine Antwort auf Frame-Typ {ftype}")
+        
+    def _send_blocks(self, f, size):
+        """Datenblöcke mit Fenster senden, bis alle bestätigt sind"""
+        block_size = self.block_size
+        total = (size + block_size - 1) // block_size
+        base = 0            # erster unbestätigter Block
+        next_block = 0      # nächster zu sendender Block
+        stalls = 0
+        
+        while base < total:
+            while next_block < total and next_block - base < self.window:
+                f.seek(next_block * block_size)
+                block = f.read(block_size)
+                self.link.send_frame(T_DATA, next_block, block)
+                self.payload_bytes += len(block)
+                next_block += 1
+                # Eingegangene ACKs sofort verarbeiten, Fenster bleibt voll
+                if self.link.has_input():
+                    break
+                    
+            frame = self.link.read_frame(self.timeout if next_block - base >= self.window
+                                         or next_block >= total else 0)
+            if frame is None:
+                if next_block - base >= self.window or next_block >= total:
+                    # Keine Bestätigung: ab base neu senden
+                    stalls += 1
+                    if stalls > self.retries:
+                        raise TransferError("Übertragung hängt")
+                    self.resent_blocks += next_block - base
+                    next_block = base
+                continue
+                
+            ftype, seq, _ = frame
+            if ftype in (T_ACK, T_NAK):
+                acked = base + ((seq - base) & 0xFFFF)
+                if base <= acked <= next_block:
+                    base = acked
+                    stalls = 0
+                if ftype == T_NAK:
+                    self.resent_blocks += next_block - base
+                    next_block = base
+                    
+    def send_file(self, file_no, path):
+        """Eine Datei übertragen - gibt ST_OK, ST_SKIP oder ST_ERROR zurück"""
+        name = os.path.basename(path)
+        size = os.path.getsize(path)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+                
+        payload = struct.pack(FILE_FMT, size, digest.digest()) + name.encode()
+        status = self._request(T_FILE, file_no, payload, T_FILE_ACK)[0]
+        if status != ST_SEND:
+            return status
+            
+        with open(path, 'rb') as f:
+            self._send_blocks(f, size)
+        return self._request(T_DONE, file_no, b'', T_FILE_ACK)[0]
+        
+    def finish(self):
+        """Sitzung beenden, Gerät baut den Sample-Index neu auf"""
+        return struct.unpack(END_FMT, self._request(T_END, 0, b'', T_END))
+
+
+def collect_files(folders):
+    """Unterstützte Dateien der Ordner (Namen müssen eindeutig sein)"""
+    files = {}
+    for folder in folders:
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if os.path.isfile(path) and name.lower().endswith(SUPPORTED_FORMATS):
+                if name in files:
+                    print(f"✗ Doppelter Name übersprungen: {path}")
+                    continue
+                files[name] = path
+    return list(files.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Samples per USB-Seriell auf die SD-Karte übertragen")
+    parser.add_argument('port', help="Serielles Gerät, z.B. /dev/ttyUSB0")
+    parser.add_argument('folders', nargs='+', help="Sample-Ordner")
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--no-repl', action='store_true',
+                        help="Empfänger läuft bereits (kein REPL-Start, kein Reset)")
+    parser.add_argument('--timeout', type=float, default=2.0)
+    args = parser.parse_args(argv)
+    
+    files = collect_files(args.folders)
+    if not files:
+        print("Keine Sample-Dateien gefunden")
+        return 1
+        
+    link = SerialLink(args.port, None if args.no_repl else args.baud)
+    sender = SampleSender(link, timeout=args.timeout)
+    results = {ST_OK: 0, ST_SKIP: 0, ST_ERROR: 0}
+    try:
+        if not args.no_repl:
+            # Laufende Anwendung unterbrechen und Empfänger starten
+            link.write(b'\r\x03\x03')
+            time.sleep(0.2)
+            link.write(REPL_COMMAND)
+            
+        sender.handshake()
+        start = time.monotonic()
+        for file_no, path in enumerate(files):
+            status = sender.send_file(file_no, path)
+            results[status] = results.get(status, 0) + 1
+            label = {ST_OK: '✓', ST_SKIP: '=', ST_ERROR: '✗'}.get(status, '?')
+            print(f"{label} {os.path.basename(path)}")
+        received, skipped, failed = sender.finish()
+        elapsed = time.monotonic() - start
+        
+        rate = sender.payload_bytes / elapsed if elapsed else 0
+        print(f"Übertragen: {received}, übersprungen: {skipped}, Fehler: {failed}")
+        print(f"{sender.payload_bytes} Bytes in {elapsed:.2f}s = {rate / 1024:.1f} KB/s, "
+              f"{sender.resent_blocks} Blöcke wiederholt, "
+              f"Nutzlast {100 * sender.payload_bytes / max(1, link.bytes_sent):.1f}%")
+        if not args.no_repl and args.baud:
+            print(f"Auslastung der Leitung: {100 * rate / (args.baud / 10):.0f}%")
+            
+        if not args.no_repl:
+            # Soft-Reset: main.py startet neu
+            link.write(b'\x04')
+        return 0 if not failed and not results[ST_ERROR] else 1
+    except TransferError as e:
+        print(f"✗ {e}")
+        return 2
+    finally:
+        link.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
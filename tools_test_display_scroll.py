@@ -0,0 +1,87 @@
+"""
+Test Hardware-Scrolling des Datei-Browsers mit der Standard-Konfiguration
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/test_display_scroll.py
+
+Das ILI9341 läuft mit DISPLAY_CONFIG und MADCTL wie auf dem Gerät, der
+SPI-Bus zeichnet Kommandos und Fenster auf. Geprüft wird, dass ein
+Browser über die volle Breite VSCRDEF/VSCRSADD nutzt und beim Scrollen
+nur die neu sichtbaren Zeilen schreibt.
+"""
+
+import bench_hw
+import sys
+from drivers.display import ILI9341Display
+from ui.widgets import FileBrowser
+
+
+class RecordingSPI(bench_hw.SPI):
+    """SPI-Bus, der Kommandos (DC low) und Zeilenbereiche mitschreibt"""
+    
+    def __init__(self, display):
+        self.display = display
+        self.commands = []
+        self.rows = 0
+        self._last_cmd = None
+        
+    def write(self, data):
+        display = self.display
+        if not display.dc.value():
+            self._last_cmd = data[0]
+            self.commands.append(data[0])
+        elif self._last_cmd == display.CMD_RASET and len(data) == 4:
+            # Zeilenbereich eines Fensters = geschriebene Zeilen
+            self.rows += ((data[2] << 8) | data[3]) - ((data[0] << 8) | data[1]) + 1
+            self._last_cmd = None
+            
+    def reset(self):
+        self.commands = []
+        self.rows = 0
+
+
+def check(name, ok):
+    print(f"{'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def main():
+    display = ILI9341Display()
+    spi = display.spi = RecordingSPI(display)
+    ok = True
+    
+    item_height = 20
+    browser = FileBrowser(0, 40, display.width, 160)
+    browser.set_files([{'name': f"sample_{i:04d}.wav", 'path': '', 'size': 0}
+                       for i in range(1000)])
+                       
+    ok &= check("can_hw_scroll mit DISPLAY_CONFIG (volle Breite)",
+                display.can_hw_scroll(0, 40, display.width, 160))
+    ok &= check("schmaler Bereich scrollt nicht per Hardware",
+                not display.can_hw_scroll(5, 40, 150, 160))
+    ok &= check("Bereich jenseits von scroll_lines scrollt nicht per Hardware",
+                not display.can_hw_scroll(0, 200, display.width, display.scroll_lines))
+                
+    # Erster Frame: Scrollbereich einrichten, alles zeichnen
+    browser.draw(display)
+    ok &= check("VSCRDEF beim ersten Zeichnen", display.CMD_VSCRDEF in spi.commands)
+    ok &= check("Browser nutzt Hardware-Scrolling", browser.hw_scroll)
+    
+    # Scroll-Frame: VSCRSADD, nur die 7 neuen Zeilen werden geschrieben
+    spi.reset()
+    browser.scroll_by(7)
+    browser.draw(display)
+    ok &= check("VSCRSADD beim Scrollen", display.CMD_VSCRSADD in spi.commands)
+    ok &= check(f"nur neu sichtbare Zeilen geschrieben ({spi.rows} von 160)", spi.rows == 7)
+    
+    # Über eine Zeilengrenze: weiterhin nur der freigelegte Streifen
+    spi.reset()
+    browser.scroll_by(item_height)
+    browser.draw(display)
+    ok &= check(f"Zeilenwechsel: {spi.rows} Zeilen geschrieben", spi.rows == item_height)
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Test der Histogramm-Kennzahlen (utils/stats.py)
+Läuft auf dem Rechner (CPython 3 oder MicroPython Unix-Port)
+
+    python tools/test_stats.py
+
+Geprüft wird, dass percentile() die obere Klassengrenze liefert, aber
+nie über dem größten eingetragenen Wert liegt - auch in der
+Überlaufklasse und bei einem einzigen Wert.
+"""
+
+import bench_hw
+import sys
+from utils.stats import Histogram
+
+EDGES = (100, 200, 500, 1000)
+
+
+def check(name, ok):
+    print(f"{'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def filled(values):
+    histogram = Histogram(EDGES)
+    for value in values:
+        histogram.add(value)
+    return histogram
+
+
+def main():
+    ok = True
+    
+    histogram = filled([40])
+    ok &= check(f"ein Wert 40: p50 {histogram.percentile(50)}, p99 {histogram.percentile(99)}",
+                histogram.percentile(50) == 40 and histogram.percentile(99) == 40)
+                
+    histogram = filled([150] * 99 + [180])
+    ok &= check(f"alle Werte in einer Klasse: p99 {histogram.percentile(99)} <= max 180",
+                histogram.percentile(99) == 180)
+                
+    histogram = filled([50] * 90 + [300] * 10)
+    ok &= check(f"Klassengrenze unter max: p50 {histogram.percentile(50)}, p99 {histogram.percentile(99)}",
+                histogram.percentile(50) == 100 and histogram.percentile(99) == 300)
+                
+    histogram = filled([50] * 98 + [2500, 4000])
+    ok &= check(f"Überlaufklasse: p99 {histogram.percentile(99)} = max",
+                histogram.percentile(99) == 4000)
+                
+    histogram = filled([120, 450, 450, 900])
+    summary = histogram.summary()
+    ok &= check(f"summary: p50 {summary['p50']} <= p99 {summary['p99']} <= max {summary['max']}",
+                summary['p50'] <= summary['p99'] <= summary['max'])
+                
+    ok &= check("leeres Histogramm: 0", Histogram(EDGES).percentile(99) == 0)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
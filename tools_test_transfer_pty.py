@@ -0,0 +1,149 @@
+"""
+Ende-zu-Ende-Test der Sample-Übertragung über ein Pseudo-Terminal
+Läuft auf dem Rechner (CPython, POSIX) - nicht auf das Gerät kopieren
+
+    python tools/test_transfer_pty.py
+
+Der Empfänger (sampling/transfer.py) läuft in einem Thread am Master
+eines PTY, der Sender (tools/sample_transfer.py) am Slave - wie über
+USB-Seriell. Geprüft werden
+    Übertragung     Dateien identisch, END-Zähler, Sample-Index
+    Wiederholung    gleiche Dateien werden übersprungen
+    Abbruch         Sender verstummt nach einer Datei: Empfänger läuft
+                    in die Zeitüberschreitung, nimmt die Datei trotzdem
+                    in den Index auf und meldet END
+"""
+
+import bench_hw
+import os
+import struct
+import sys
+import threading
+from array import array
+import config
+import sample_transfer
+from sampling import wav
+from sampling.sample_index import SampleIndex
+from sampling.transfer import TransferReceiver
+
+TIMEOUT_MS = 500                # Zeitüberschreitung des Empfängers im Test
+
+
+def check(name, ok):
+    print(f"{'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def make_samples(directory, count):
+    """count kurze WAVs unterschiedlicher Länge, gibt die Pfade zurück"""
+    paths = []
+    for n in range(count):
+        frames = 3000 + n * 2500
+        data = array('h', [((i * (n + 3)) % 2000) - 1000 for i in range(frames)])
+        path = f"{directory}/pty_{n}.wav"
+        with open(path, 'wb') as f:
+            wav.write_header(f, 44100, 1, 16, frames * 2)
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+class Device:
+    """Empfänger im Thread am PTY-Master"""
+    
+    def __init__(self, fd, directory):
+        self.reader = os.fdopen(fd, 'rb', buffering=0, closefd=False)
+        self.writer = os.fdopen(fd, 'wb', buffering=0, closefd=False)
+        self.receiver = TransferReceiver(self.reader, self.writer, directory)
+        self.receiver.timeout_ms = TIMEOUT_MS
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run)
+        self.thread.start()
+        
+    def _run(self):
+        try:
+            self.result = self.receiver.serve()
+        except OSError as e:
+            self.error = e
+            self.result = self.receiver.stats()
+            
+    def join(self):
+        self.thread.join(10)
+        return not self.thread.is_alive()
+
+
+def session(directory, files, finish=True):
+    """Eine Sitzung: Dateien senden, gibt (Status-Liste, END-Zähler, Device) zurück"""
+    master, slave = os.openpty()
+    device = Device(master, directory)
+    link = sample_transfer.SerialLink(os.ttyname(slave))
+    sender = sample_transfer.SampleSender(link, timeout=1.0, verbose=False)
+    try:
+        sender.handshake()
+        status = [sender.send_file(n, path) for n, path in enumerate(files)]
+        if finish:
+            counts = sender.finish()
+        else:
+            # Sender verstummt - END kommt nach der Zeitüberschreitung
+            frame = link.read_frame(TIMEOUT_MS / 1000 + 2)
+            while frame and frame[0] != sample_transfer.T_END:
+                frame = link.read_frame(TIMEOUT_MS / 1000 + 2)
+            counts = (struct.unpack(sample_transfer.END_FMT, frame[2])
+                      if frame else None)
+        device.join()
+    finally:
+        link.close()
+        os.close(slave)
+        os.close(master)
+    return status, counts, device
+
+
+def indexed(directory):
+    """Dateinamen im Sample-Index"""
+    index = SampleIndex(directory)
+    if not index.open():
+        return set()
+    names = {entry['name'] for entry in index.read_range(0, len(index))}
+    index.close()
+    return names
+
+
+def main():
+    source = bench_hw.work_dir('transfer_src')
+    target = bench_hw.work_dir('transfer_dst')
+    config.PATHS['sample_index'] = target + '/samples.idx'
+    files = make_samples(source, 3)
+    names = {os.path.basename(path) for path in files}
+    ok = True
+    
+    # Übertragung
+    status, counts, device = session(target, files)
+    ok &= check(f"Übertragung: Status {status}, END {counts}",
+                status == [sample_transfer.ST_OK] * 3 and counts == (3, 0, 0))
+    same = all(open(path, 'rb').read() == open(f"{target}/{os.path.basename(path)}", 'rb').read()
+               for path in files)
+    ok &= check("Dateien identisch", same)
+    ok &= check("Sample-Index enthält alle Dateien", indexed(target) >= names)
+    
+    # Wiederholung
+    status, counts, device = session(target, files)
+    ok &= check(f"Wiederholung: Status {status}, END {counts}",
+                status == [sample_transfer.ST_SKIP] * 3 and counts == (0, 3, 0))
+                
+    # Abbruch nach der ersten Datei
+    os.remove(config.PATHS['sample_index'])
+    extra = make_samples(bench_hw.work_dir('transfer_extra'), 1)[0]
+    renamed = source + '/pty_abort.wav'
+    os.replace(extra, renamed)
+    status, counts, device = session(target, [renamed], finish=False)
+    ok &= check(f"Abbruch: Empfänger meldet {device.error}", device.error is not None)
+    ok &= check(f"Abbruch: END nach Zeitüberschreitung {counts}", counts == (1, 0, 0))
+    ok &= check("Abbruch: Datei trotzdem im Sample-Index", 'pty_abort.wav' in indexed(target))
+    ok &= check("Keine .part-Dateien", not any(n.endswith('.part') for n in os.listdir(target)))
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
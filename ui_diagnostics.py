@@ -0,0 +1,70 @@
+"""
+Diagnose-Anzeige für MIDI-Timing (Tempo, Transport, Jitter, Latenz)
+"""
+
+from ui.widgets import Widget
+from utils.colors import Colors
+import time
+
+class ClockPanel(Widget):
+    """Zeigt BPM, Transport und Jitter-/Latenz-Histogramme der MIDI-Clock"""
+    
+    REFRESH_MS = 500
+    BAR_WIDTH = 6
+    
+    def __init__(self, x, y, width, height, midi_clock):
+        super().__init__(x, y, width, height)
+        self.clock = midi_clock
+        self._last_refresh = time.ticks_ms()
+        self._shown = None
+        
+    def _state(self):
+        """Alles, was die Anzeige bestimmt: Transport, BPM, Histogramme"""
+        clock = self.clock
+        return (clock.is_locked(), clock.running, int(clock.bpm() * 10),
+                clock.jitter.count, clock.latency.count)
+                
+    def update(self):
+        """Höchstens alle REFRESH_MS prüfen, neu zeichnen nur bei Änderung"""
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._last_refresh) >= self.REFRESH_MS:
+            self._last_refresh = now
+            if self._state() != self._shown:
+                self.dirty = True
+                
+    def _draw_histogram(self, display, x, y, height, histogram, color):
+        """Histogramm als Balken zeichnen (Höhe relativ zur größten Klasse)"""
+        counts = histogram.counts
+        peak = max(counts) or 1
+        for i, count in enumerate(counts):
+            bar = count * height // peak
+            bx = x + i * (self.BAR_WIDTH + 1)
+            if bar:
+                display.fill_rect(bx, y + height - bar, self.BAR_WIDTH, bar, color)
+        display.hline(x, y + height, len(counts) * (self.BAR_WIDTH + 1), Colors.GRAY)
+        
+    def draw(self, display):
+        self._shown = self._state()
+        display.fill_rect(self.x, self.y, self.width, self.height, Colors.BLACK)
+        
+        # Transport: grün = läuft, rot = gestoppt, grau = keine Clock
+        if not self.clock.is_locked():
+            state_color = Colors.GRAY
+        elif self.clock.running:
+            state_color = Colors.GREEN
+        else:
+            state_color = Colors.RED
+        display.fill_rect(self.x + 2, self.y + 2, 8, 8, state_color)
+        
+        bpm = self.clock.bpm()
+        label = f"{bpm:.1f} BPM" if bpm else "-- BPM"
+        display.draw_text(self.x + 14, self.y + 2, label, Colors.WHITE, Colors.BLACK)
+        
+        # Jitter (links) und Eingangslatenz (rechts)
+        chart_y = self.y + 14
+        chart_height = self.height - 16
+        self._draw_histogram(display, self.x + 2, chart_y, chart_height,
+                             self.clock.jitter, Colors.CYAN)
+        self._draw_histogram(display, self.x + self.width // 2 + 2, chart_y, chart_height,
+                             self.clock.latency, Colors.ORANGE)
+        display.rect(self.x, self.y, self.width, self.height, Colors.DARKGRAY)
@@ -0,0 +1,113 @@
+"""
+Drag & Drop Overlay: schwebendes Sprite über der UI
+Der Hintergrund unter dem Sprite wird aus dem Display-RAM gesichert und
+beim Verschieben zurückgeschrieben - kein Neuzeichnen der Widgets
+"""
+
+from utils.colors import Colors
+
+class DragSprite:
+    """Kleines Sprite mit Sicherung des Hintergrunds (Save-Under)
+    
+    Pro Bewegung werden nur 2 * width * height Pixel geschrieben
+    (alten Hintergrund zurück, Sprite an neuer Position) und
+    width * height Pixel gelesen.
+    """
+    
+    def __init__(self, width, height, color=Colors.CYAN, border=Colors.WHITE):
+        self.width = width
+        self.height = height
+        self.x = 0
+        self.y = 0
+        self.visible = False
+        self.label = None
+        
+        # Puffer einmalig anlegen (RGB565 bzw. RGB666 + Dummy-Byte)
+        pixels = width * height
+        self._image = bytearray(pixels * 2)
+        self._background = bytearray(pixels * 2)
+        self._raw = bytearray(pixels * 3 + 1)
+        self._render(color, border)
+        
+        # Statistik
+        self.moves = 0
+        self.pixels_pushed = 0
+        
+    def _render(self, color, border):
+        """Sprite-Bild einmalig in den Puffer zeichnen (Fläche + Rahmen)"""
+        w = self.width
+        h = self.height
+        img = self._image
+        for row in range(h):
+            for col in range(w):
+                edge = row == 0 or row == h - 1 or col == 0 or col == w - 1
+                c = border if edge else color
+                i = (row * w + col) * 2
+                img[i] = c >> 8
+                img[i + 1] = c & 0xFF
+                
+    def _clamp(self, display, x, y):
+        """Sprite über dem Finger zentrieren und im Display halten"""
+        x -= self.width // 2
+        y -= self.height + 4
+        x = max(0, min(display.width - self.width, x))
+        y = max(0, min(display.height - self.height, y))
+        return x, y
+        
+    def _draw(self, display):
+        """Hintergrund sichern, dann Sprite zeichnen"""
+        display.read_rect(self.x, self.y, self.width, self.height,
+                          self._background, self._raw)
+        display.blit(self._image, self.x, self.y, self.width, self.height)
+        if self.label:
+            display.draw_text(self.x + 2, self.y + 1, self.label, Colors.BLACK, Colors.CYAN)
+        self.pixels_pushed += self.width * self.height
+        
+    def show(self, display, x, y, label=None):
+        """Sprite an Touch-Position einblenden"""
+        if self.visible:
+            self.hide(display)
+        self.label = label
+        self.x, self.y = self._clamp(display, x, y)
+        self._draw(display)
+        self.visible = True
+        
+    def move(self, display, x, y):
+        """Sprite verschieben (Hintergrund zurück, neu sichern, zeichnen)"""
+        if not self.visible:
+            return
+        x, y = self._clamp(display, x, y)
+        if x == self.x and y == self.y:
+            return
+        self.hide(display)
+        self.x = x
+        self.y = y
+        self._draw(display)
+        self.visible = True
+        self.moves += 1
+        
+    def hide(self, display):
+        """Gesicherten Hintergrund zurückschreiben"""
+        if not self.visible:
+            return
+        display.blit(self._background, self.x, self.y, self.width, self.height)
+        self.pixels_pushed += self.width * self.height
+        self.visible = False
+        
+    def discard(self):
+        """Sicherung verwerfen (Display wurde komplett neu gezeichnet)"""
+        self.visible = False
+        
+    def overlaps(self, widget):
+        """Prüfe, ob das Sprite ein Widget überdeckt"""
+        return (self.visible and
+                widget.x < self.x + self.width and self.x < widget.x + widget.width and
+                widget.y < self.y + self.height and self.y < widget.y + widget.height)
+                
+    def stats(self):
+        """Bewegungen und übertragene Pixel"""
+        return {
+            'moves': self.moves,
+            'pixels_pushed': self.pixels_pushed,
+            'pixels_per_move': self.pixels_pushed // self.moves if self.moves else 0,
+        }
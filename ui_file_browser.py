@@ -4,6 +4,7 @@ Touch-optimierter Datei-Browser für Sample-Verwaltung
 
 from ui.widgets import FileBrowser, Widget
 from utils.colors import Colors
+from config import UI_CONFIG
 
 class SampleBrowser(FileBrowser):
     """Spezialisierter Browser für Sample-Dateien"""
@@ -17,9 +18,13 @@ class SampleBrowser(FileBrowser):
         self.drag_start_y = None
         
     def load_samples(self):
-        """Sample-Dateien laden"""
-        samples = self.sd_manager.list_samples()
-        self.set_files(samples)
+        """Sample-Index öffnen (nur das sichtbare Fenster liegt im RAM)"""
+        if isinstance(self.files, list):
+            index = self.sd_manager.open_sample_index()
+        else:
+            index = self.files
+            index.build()
+        self.set_files(index)
         
     def on_touch_down(self, x, y):
         """Touch-Down im Browser - Drag Start"""
@@ -30,26 +35,31 @@ class SampleBrowser(FileBrowser):
             self.drag_start_x = x
             self.drag_start_y = y
             
+    def on_touch_move(self, x, y):
+        """Vertikal ziehen scrollt, horizontal ziehen nimmt die Datei mit"""
+        if self.drag_payload is not None:
+            return
+            
+        if self.dragging_file and not self.scrolling:
+            dx = abs(x - self.drag_start_x)
+            if dx >= UI_CONFIG['scroll_threshold'] and dx > abs(y - self.drag_start_y):
+                self.drag_payload = self.dragging_file
+                return
+                
+        super().on_touch_move(x, y)
+        if self.scrolling:
+            self.dragging_file = None
+            
+    def drag_label(self):
+        return self.drag_payload['name'] if self.drag_payload else None
+        
     def on_touch_up(self, x, y):
         """Touch-Up im Browser - Drag End"""
         super().on_touch_up(x, y)
         self.dragging_file = None
+        self.drag_payload = None
         
-    def draw(self, display):
-        """Browser zeichnen"""
-        display.fill_rect(self.x, self.y, self.width, self.height, Colors. DARKGRAY)
-        
-        item_height = 20
-        for i in range(self.items_visible):
-            file_index = self.scroll_offset + i
-            if file_index >= len(self. files):
-                break
-                
-            file = self. files[file_index]
-            item_y = self.y + (i * item_height)
-            
-            # Highlight für selected
-            if i == (self.selected_index - self.scroll_offset):
-                display.fill_rect(self.x, item_y, self.width, item_height, Colors.BLUE)
-            
-            # TODO: Text-Rendering für Dateinamen
\ No newline at end of file
+    def on_touch_cancel(self):
+        super().on_touch_cancel()
+        self.dragging_file = None
+        self.drag_payload = None
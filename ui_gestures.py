@@ -0,0 +1,208 @@
+"""
+Gestenerkennung für den Touchscreen
+Macht aus den Abfragen von get_touch() (touch_down wiederholt sich bei
+gehaltenem Finger) getrennte Down/Move/Up-Events und erkennt Tap,
+Long-Press und Swipe
+"""
+
+from array import array
+from config import UI_CONFIG
+import time
+
+class GestureRecognizer:
+    """Touch-Events filtern, zusammenfassen und Gesten erkennen
+    
+    feed() nimmt jede Abfrage des Touchscreens entgegen:
+      - Finger liegt still (unter gesture_move_px): kein Event
+      - Bewegung: MOVE, folgt es auf ein noch nicht abgeholtes MOVE,
+        wird nur dessen Position ersetzt (pro Frame eine Position)
+    Gesten kommen nach dem auslösenden Event in dieselbe Queue:
+      TAP         kurz und ohne Bewegung losgelassen
+      LONG_PRESS  still gehalten (tick() prüft die Zeit), kein Tap danach
+      SWIPE_*     schnelle Bewegung über swipe_min_px, beim Loslassen
+      
+    Die Queue besteht aus vorallokierten Arrays, get() liefert nur die
+    Art und legt Position/Weg in event_x/_y/_dx/_dy ab - ohne Allokation.
+    """
+    
+    # Event-Arten
+    DOWN = 1
+    MOVE = 2
+    UP = 3
+    TAP = 4
+    LONG_PRESS = 5
+    SWIPE_LEFT = 6
+    SWIPE_RIGHT = 7
+    SWIPE_UP = 8
+    SWIPE_DOWN = 9
+    
+    NAMES = ('', 'down', 'move', 'up', 'tap', 'long_press',
+             'swipe_left', 'swipe_right', 'swipe_up', 'swipe_down')
+             
+    def __init__(self, capacity=None):
+        capacity = capacity or UI_CONFIG['gesture_queue']
+        self.move_px = UI_CONFIG['gesture_move_px']
+        self.tap_ms = UI_CONFIG['tap_ms']
+        self.tap_slop = UI_CONFIG['tap_slop_px']
+        self.long_press_ms = UI_CONFIG['long_press_ms']
+        self.swipe_px = UI_CONFIG['swipe_min_px']
+        self.swipe_ms = UI_CONFIG['swipe_max_ms']
+        
+        # Event-Queue (Ring)
+        self._kind = bytearray(capacity)
+        self._x = array('h', [0] * capacity)
+        self._y = array('h', [0] * capacity)
+        self._dx = array('h', [0] * capacity)
+        self._dy = array('h', [0] * capacity)
+        self._head = 0
+        self._count = 0
+        
+        # Zuletzt mit get() abgeholtes Event
+        self.event_x = 0
+        self.event_y = 0
+        self.event_dx = 0
+        self.event_dy = 0
+        
+        # Zustand der laufenden Berührung
+        self.pressed = False
+        self._down_ms = 0
+        self._start_x = 0
+        self._start_y = 0
+        self._last_x = 0
+        self._last_y = 0
+        self._travel = 0            # Größte Entfernung vom Startpunkt
+        self._long_fired = False
+        
+        # Statistik (Zähler seit Start, Raten seit letztem stats())
+        self.samples = 0
+        self.queued = 0
+        self.coalesced = 0
+        self.handled = 0
+        self.dropped = 0
+        self.gestures = array('I', [0] * len(self.NAMES))
+        self._window_ms = time.ticks_ms()
+        self._window_samples = 0
+        self._window_handled = 0
+        
+    # ===== Queue =====
+    
+    def _put(self, kind, x, y, dx=0, dy=0):
+        """Event anhängen, MOVE auf MOVE ersetzt nur die Position"""
+        size = len(self._kind)
+        if self._count and kind == self.MOVE:
+            tail = (self._head + self._count - 1) % size
+            if self._kind[tail] == self.MOVE:
+                self._x[tail] = x
+                self._y[tail] = y
+                self.coalesced += 1
+                return
+        if self._count >= size:
+            self.dropped += 1
+            return
+        tail = (self._head + self._count) % size
+        self._kind[tail] = kind
+        self._x[tail] = x
+        self._y[tail] = y
+        self._dx[tail] = dx
+        self._dy[tail] = dy
+        self._count += 1
+        self.queued += 1
+        if kind > self.UP:
+            self.gestures[kind] += 1
+            
+    def get(self):
+        """Nächstes Event abholen: Art (0 = keins), Daten in event_*"""
+        if not self._count:
+            return 0
+        head = self._head
+        self.event_x = self._x[head]
+        self.event_y = self._y[head]
+        self.event_dx = self._dx[head]
+        self.event_dy = self._dy[head]
+        self._head = (head + 1) % len(self._kind)
+        self._count -= 1
+        self.handled += 1
+        self._window_handled += 1
+        return self._kind[head]
+        
+    def __len__(self):
+        return self._count
+        
+    # ===== Erkennung =====
+    
+    def feed(self, event_type, x, y):
+        """Abfrage von get_touch() ('touch_down'/'touch_up', x, y) verarbeiten"""
+        self.samples += 1
+        self._window_samples += 1
+        
+        if event_type == 'touch_up':
+            if self.pressed:
+                self._release(x, y)
+            return
+            
+        if not self.pressed:
+            self.pressed = True
+            self._down_ms = time.ticks_ms()
+            self._start_x = self._last_x = x
+            self._start_y = self._last_y = y
+            self._travel = 0
+            self._long_fired = False
+            self._put(self.DOWN, x, y)
+            return
+            
+        # Zittern unter move_px ignorieren
+        if abs(x - self._last_x) < self.move_px and abs(y - self._last_y) < self.move_px:
+            return
+        self._last_x = x
+        self._last_y = y
+        travel = max(abs(x - self._start_x), abs(y - self._start_y))
+        if travel > self._travel:
+            self._travel = travel
+        self._put(self.MOVE, x, y)
+        
+    def tick(self):
+        """Pro Frame aufrufen: Long-Press auch ohne neue Abfrage erkennen"""
+        if (self.pressed and not self._long_fired and self._travel <= self.tap_slop
+                and time.ticks_diff(time.ticks_ms(), self._down_ms) >= self.long_press_ms):
+            self._long_fired = True
+            self._put(self.LONG_PRESS, self._start_x, self._start_y)
+            
+    def _release(self, x, y):
+        """Finger gehoben: UP und ggf. Tap/Swipe (Position = Startpunkt)"""
+        self.pressed = False
+        self._put(self.UP, x, y)
+        if self._long_fired:
+            return
+            
+        duration = time.ticks_diff(time.ticks_ms(), self._down_ms)
+        dx = x - self._start_x
+        dy = y - self._start_y
+        if duration <= self.tap_ms and self._travel <= self.tap_slop:
+            self._put(self.TAP, self._start_x, self._start_y)
+        elif duration <= self.swipe_ms and max(abs(dx), abs(dy)) >= self.swipe_px:
+            if abs(dx) >= abs(dy):
+                kind = self.SWIPE_RIGHT if dx > 0 else self.SWIPE_LEFT
+            else:
+                kind = self.SWIPE_DOWN if dy > 0 else self.SWIPE_UP
+            self._put(kind, self._start_x, self._start_y, dx, dy)
+            
+    # ===== Statistik =====
+    
+    def stats(self):
+        """Abfragen und verarbeitete Events pro Sekunde seit dem letzten Aufruf"""
+        now = time.ticks_ms()
+        elapsed = max(1, time.ticks_diff(now, self._window_ms))
+        result = {
+            'samples_per_s': self._window_samples * 1000 // elapsed,
+            'handled_per_s': self._window_handled * 1000 // elapsed,
+            'samples': self.samples,
+            'handled': self.handled,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'gestures': {self.NAMES[k]: self.gestures[k]
+                         for k in range(self.TAP, len(self.NAMES)) if self.gestures[k]},
+        }
+        self._window_ms = now
+        self._window_samples = 0
+        self._window_handled = 0
+        return result
\ No newline at end of file
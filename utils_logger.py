@@ -1,8 +1,238 @@
 """
 Einfaches Logging-System
+Mit LogSink landen Meldungen in einem Ringpuffer im RAM und werden im
+Hintergrund gesammelt auf Konsole und/oder SD geschrieben - ein Log-Aufruf
+wartet nie auf die USB-Seriell-Verbindung oder die SD-Karte
 """
 
-from config import LOG_LEVEL as CONFIG_LOG_LEVEL
+import _thread
+import sys
+import time
+from config import LOG_LEVEL as CONFIG_LOG_LEVEL, LOG_CONFIG
+from utils.stats import Histogram
+
+class LogSink:
+    """Ringpuffer für Log-Zeilen mit gesammelter Ausgabe
+    
+    write() kopiert die Zeile nur in den Puffer (unter Lock). Ist kein
+    Platz mehr, wird sie verworfen und gezählt. Ein eigener Thread leert
+    den Puffer alle flush_ms, bei halb vollem Puffer oder nach einem
+    Fehler sofort. Ohne Thread übernimmt tick() im Hauptloop.
+    
+    Die Log-Datei wird bei file_max Bytes rotiert:
+        app.log -> app.log.1 -> ... -> app.log.<file_count> (gelöscht)
+    Die Dateizugriffe laufen über das bei set_file() übergebene fs
+    (drivers.sdcard: sd_* einzeln unter sd_lock) - der Thread greift nie
+    gleichzeitig mit UI oder Worker auf die Karte zu.
+    """
+    
+    POLL_MS = 20
+    
+    def __init__(self, size=None):
+        size = size or LOG_CONFIG['buffer']
+        self._buf = bytearray(size)
+        self._out = bytearray(size)         # Batch, wird außerhalb des Locks ausgegeben
+        self._out_mv = memoryview(self._out)
+        self._head = 0
+        self._count = 0
+        self._lock = _thread.allocate_lock()
+        self._flush_lock = _thread.allocate_lock()
+        
+        self.console = LOG_CONFIG['console']
+        self.path = None
+        self.fs = None
+        self.file_size = 0
+        self.file_max = LOG_CONFIG['file_max']
+        self.file_count = LOG_CONFIG['file_count']
+        self.flush_ms = LOG_CONFIG['flush_ms']
+        
+        self.running = False
+        self._stopped = True
+        self._urgent = False
+        self._last_flush = time.ticks_ms()
+        
+        # Statistik
+        self.lines = 0
+        self.dropped = 0
+        self._dropped_reported = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.high_water = 0
+        self.errors = 0
+        
+    # ===== Hot Path =====
+    
+    def write(self, line, urgent=False):
+        """Zeile anhängen - blockiert nie, False wenn verworfen"""
+        data = line.encode()
+        n = len(data)
+        buf = self._buf
+        size = len(buf)
+        
+        self._lock.acquire()
+        try:
+            if self._count + n > size:
+                self.dropped += 1
+                return False
+            tail = (self._head + self._count) % size
+            first = min(n, size - tail)
+            buf[tail:tail + first] = data[:first] if first < n else data
+            if first < n:
+                buf[:n - first] = data[first:]
+            self._count += n
+            if self._count > self.high_water:
+                self.high_water = self._count
+            self.lines += 1
+        finally:
+            self._lock.release()
+            
+        if urgent:
+            self._urgent = True
+        return True
+        
+    # ===== Ausgabe =====
+    
+    def set_file(self, path, fs):
+        """Zusätzlich in eine (rotierende) Datei schreiben
+        
+        fs: Dateizugriff mit sd_open, sd_stat, sd_remove und sd_rename
+        (das Modul drivers.sdcard, von main.py übergeben).
+        """
+        try:
+            self.file_size = fs.sd_stat(path)[6]
+        except OSError:
+            self.file_size = 0
+        self.fs = fs
+        self.path = path
+        
+    def _rotate(self):
+        """app.log.<n> verschieben, app.log wird zu app.log.1"""
+        path = self.path
+        fs = self.fs
+        try:
+            fs.sd_remove(f"{path}.{self.file_count}")
+        except OSError:
+            pass
+        for i in range(self.file_count - 1, 0, -1):
+            try:
+                fs.sd_rename(f"{path}.{i}", f"{path}.{i + 1}")
+            except OSError:
+                pass
+        try:
+            fs.sd_rename(path, f"{path}.1")
+        except OSError:
+            pass
+        self.file_size = 0
+        
+    def _emit(self, data):
+        """Batch auf Konsole und in die Datei schreiben"""
+        if self.console:
+            try:
+                out = getattr(sys.stdout, 'buffer', sys.stdout)
+                out.write(data)
+            except Exception:
+                self.errors += 1
+                
+        if self.path:
+            try:
+                if self.file_size + len(data) > self.file_max:
+                    self._rotate()
+                with self.fs.sd_open(self.path, 'ab') as f:
+                    f.write(data)
+                self.file_size += len(data)
+            except OSError:
+                # SD entfernt o.ä.: nur noch Konsole
+                self.errors += 1
+                self.path = None
+                
+    def flush(self):
+        """Puffer leeren, gibt Anzahl ausgegebener Bytes zurück"""
+        self._flush_lock.acquire()
+        try:
+            # Nur das Umkopieren passiert unter dem Lock
+            self._lock.acquire()
+            n = self._count
+            if n:
+                size = len(self._buf)
+                head = self._head
+                first = min(n, size - head)
+                self._out[:first] = self._buf[head:head + first]
+                if first < n:
+                    self._out[first:n] = self._buf[:n - first]
+                self._head = (head + n) % size
+                self._count = 0
+            dropped = self.dropped
+            self._lock.release()
+            
+            self._urgent = False
+            self._last_flush = time.ticks_ms()
+            if n:
+                self._emit(self._out_mv[:n])
+            if dropped != self._dropped_reported:
+                self._emit(f"[LOG] {dropped - self._dropped_reported} Meldungen verworfen\n".encode())
+                self._dropped_reported = dropped
+                
+            self.bytes_written += n
+            if n:
+                self.flushes += 1
+            return n
+        finally:
+            self._flush_lock.release()
+            
+    def _due(self):
+        """Ausgabe fällig: Fehler, halb voller Puffer oder flush_ms vorbei"""
+        if not self._count:
+            return False
+        return (self._urgent or self._count * 2 >= len(self._buf)
+                or time.ticks_diff(time.ticks_ms(), self._last_flush) >= self.flush_ms)
+                
+    # ===== Hintergrund =====
+    
+    def _run(self):
+        while self.running:
+            time.sleep_ms(self.POLL_MS)
+            if self._due():
+                self.flush()
+        self._stopped = True
+        
+    def start(self):
+        """Ausgabe-Thread starten (sonst tick() im Hauptloop aufrufen)"""
+        if self.running or not LOG_CONFIG['background']:
+            return self.running
+        try:
+            self.running = True
+            self._stopped = False
+            _thread.start_new_thread(self._run, ())
+        except Exception:
+            self.running = False
+            self._stopped = True
+        return self.running
+        
+    def tick(self):
+        """Im Hauptloop aufrufen - nur aktiv, wenn kein Thread läuft"""
+        if not self.running and self._due():
+            self.flush()
+            
+    def stop(self, timeout_ms=500):
+        """Thread beenden und Rest synchron ausgeben"""
+        self.running = False
+        start = time.ticks_ms()
+        while not self._stopped and time.ticks_diff(time.ticks_ms(), start) < timeout_ms:
+            time.sleep_ms(10)
+        self.flush()
+        
+    def stats(self):
+        """Füllstand, Verluste und geschriebene Bytes"""
+        return {
+            'lines': self.lines,
+            'pending': self._count,
+            'high_water': self.high_water,
+            'dropped': self.dropped,
+            'bytes': self.bytes_written,
+            'flushes': self.flushes,
+            'errors': self.errors,
+        }
+
 
 class Logger:
     """Logging Utility"""
@@ -14,9 +244,14 @@ class Logger:
         'ERROR': 3,
     }
     
-    def __init__(self, enabled=True, level='INFO'):
+    # Klassengrenzen für die Dauer eines Log-Aufrufs (us)
+    CALL_EDGES = (10, 20, 50, 100, 200, 500, 1000, 5000)
+    
+    def __init__(self, enabled=True, level='INFO', sink=None):
         self.enabled = enabled
         self. level = self.LEVELS.get(level, 1)
+        self.sink = sink
+        self.call_us = Histogram(self.CALL_EDGES)
         
     def log(self, message, level='INFO'):
         """Nachricht loggen"""
@@ -25,7 +260,12 @@ class Logger:
             
         level_num = self.LEVELS. get(level, 1)
         if level_num >= self.level:
-            print(f"[{level}] {message}")
+            start = time.ticks_us()
+            if self.sink:
+                self.sink.write(f"{time.ticks_ms()} [{level}] {message}\n", level_num >= 3)
+            else:
+                print(f"[{level}] {message}")
+            self.call_us.add(time.ticks_diff(time.ticks_us(), start))
             
     def debug(self, msg):
         self.log(msg, 'DEBUG')
@@ -37,4 +277,11 @@ class Logger:
         self.log(msg, 'WARNING')
         
     def error(self, msg):
-        self.log(msg, 'ERROR')
\ No newline at end of file
+        self.log(msg, 'ERROR')
+        
+    def stats(self):
+        """Dauer der Log-Aufrufe und Zustand des Puffers"""
+        result = {'call_us': self.call_us.summary()}
+        if self.sink:
+            result['sink'] = self.sink.stats()
+        return result
\ No newline at end of file
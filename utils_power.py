@@ -0,0 +1,158 @@
+"""
+Aktivitätsgesteuerte Frame-Rate und Ruhezustand
+Der Hauptloop läuft bei Interaktion schnell, ohne Aktivität nur noch
+selten - Touch-IRQ und MIDI-Empfang wecken ihn sofort
+"""
+
+import io
+import select
+import time
+from config import POWER_CONFIG
+from utils.stats import Histogram
+
+class WakeEvent(io.IOBase):
+    """Per select.poll abwartbares Flag (aus IRQ oder anderem Thread setzen)"""
+    
+    _MP_STREAM_POLL = 3
+    
+    def __init__(self):
+        self.flag = False
+        
+    def set(self):
+        self.flag = True
+        
+    def clear(self):
+        self.flag = False
+        
+    def ioctl(self, req, arg):
+        # Stream-Protokoll von MicroPython: poll fragt den Zustand ab
+        if req == self._MP_STREAM_POLL and self.flag:
+            return arg & select.POLLIN
+        return 0
+
+
+class PowerManager:
+    """Frame-Takt nach Aktivität: active -> idle -> sleep
+    
+        active  active_frame_ms   Touch, Drag, Animation, MIDI-Eingang
+        idle    idle_frame_ms     nach idle_after_ms ohne Aktivität
+        sleep   sleep_frame_ms    nach sleep_after_ms, Backlight gedimmt
+        
+    wait() schläft bis zum nächsten Frame, kehrt aber sofort zurück,
+    sobald eine registrierte Quelle (UART, WakeEvent) lesbar wird.
+    """
+    
+    ACTIVE = 0
+    IDLE = 1
+    SLEEP = 2
+    
+    STATE_NAMES = ('active', 'idle', 'sleep')
+    
+    # Klassengrenzen in Millisekunden
+    LATENCY_EDGES = (5, 10, 20, 50, 100, 200, 500, 1000)
+    
+    def __init__(self, display=None):
+        self.display = display
+        self.frame_ms = (POWER_CONFIG['active_frame_ms'],
+                         POWER_CONFIG['idle_frame_ms'],
+                         POWER_CONFIG['sleep_frame_ms'])
+        self.state = self.ACTIVE
+        self.last_activity = time.ticks_ms()
+        
+        # Weckquellen
+        self.wake_event = WakeEvent()
+        self._poller = None
+        try:
+            poller = select.poll()
+            poller.register(self.wake_event, select.POLLIN)
+            self._poller = poller
+        except Exception:
+            # Port ohne Stream-Protokoll für Python-Klassen: kurze Schlafscheiben
+            pass
+            
+        # Messungen
+        self.wakeups = 0
+        self.wakeups_per_s = 0
+        self._window_start = time.ticks_ms()
+        self._window_wakeups = 0
+        self._touch_ms = None
+        self.touch_latency = Histogram(self.LATENCY_EDGES)
+        
+    def register(self, stream):
+        """Zusätzliche Weckquelle (z.B. MIDI-UART) anmelden"""
+        if self._poller:
+            try:
+                self._poller.register(stream, select.POLLIN)
+            except Exception:
+                pass
+                
+    def wake(self):
+        """Sofort wecken (z.B. aus dem MIDI-Worker)"""
+        self.wake_event.set()
+        
+    def on_touch_irq(self, pin):
+        """Touch-IRQ: wecken und Zeitpunkt für die Reaktionszeit merken"""
+        if self.state != self.ACTIVE and self._touch_ms is None:
+            self._touch_ms = time.ticks_ms()
+        self.wake_event.set()
+        
+    def activity(self):
+        """Interaktion erkannt: schnellen Takt und volle Helligkeit"""
+        self.last_activity = time.ticks_ms()
+        if self.state != self.ACTIVE:
+            if self.state == self.SLEEP and self.display and POWER_CONFIG['dim_enabled']:
+                self.display.set_brightness(POWER_CONFIG['brightness'])
+            self.state = self.ACTIVE
+            
+    def frame_done(self):
+        """Nach dem Zeichnen: Zeit vom Touch-IRQ bis zum ersten Frame erfassen"""
+        if self._touch_ms is not None and self.state == self.ACTIVE:
+            self.touch_latency.add(time.ticks_diff(time.ticks_ms(), self._touch_ms))
+            self._touch_ms = None
+            
+    def _update_state(self, now):
+        """Zustand nach Dauer ohne Aktivität weiterschalten"""
+        quiet = time.ticks_diff(now, self.last_activity)
+        if self.state == self.ACTIVE and quiet >= POWER_CONFIG['idle_after_ms']:
+            self.state = self.IDLE
+        if self.state == self.IDLE and quiet >= POWER_CONFIG['sleep_after_ms']:
+            self.state = self.SLEEP
+            if self.display and POWER_CONFIG['dim_enabled']:
+                self.display.set_brightness(POWER_CONFIG['dim_brightness'])
+                
+    def wait(self, frame_start):
+        """Bis zum nächsten Frame schlafen oder bis eine Weckquelle anschlägt"""
+        now = time.ticks_ms()
+        self._update_state(now)
+        
+        remaining = self.frame_ms[self.state] - time.ticks_diff(now, frame_start)
+        if remaining > 0 and not self.wake_event.flag:
+            if self._poller:
+                self._poller.poll(remaining)
+            else:
+                deadline = time.ticks_add(now, remaining)
+                while not self.wake_event.flag:
+                    left = time.ticks_diff(deadline, time.ticks_ms())
+                    if left <= 0:
+                        break
+                    time.sleep_ms(min(left, 10))
+        self.wake_event.clear()
+        
+        # Wakeups pro Sekunde
+        self.wakeups += 1
+        self._window_wakeups += 1
+        now = time.ticks_ms()
+        elapsed = time.ticks_diff(now, self._window_start)
+        if elapsed >= 1000:
+            self.wakeups_per_s = (self._window_wakeups * 1000 + elapsed // 2) // elapsed
+            self._window_wakeups = 0
+            self._window_start = now
+            
+    def stats(self):
+        """Zustand, Wakeups und erste Touch-Reaktion aus dem Ruhezustand"""
+        return {
+            'state': self.STATE_NAMES[self.state],
+            'wakeups': self.wakeups,
+            'wakeups_per_s': self.wakeups_per_s,
+            'touch_latency_ms': self.touch_latency.summary(),
+        }
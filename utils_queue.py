@@ -0,0 +1,92 @@
+"""
+Lock-geschützte, begrenzte Queue für den Austausch zwischen Threads
+Funktioniert mit MicroPython _thread und CPython _thread
+"""
+
+import _thread
+import time
+
+class BoundedQueue:
+    """Ringpuffer fester Kapazität - put() blockiert nie, sondern verwirft"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self._lock = _thread.allocate_lock()
+        
+        # Statistik
+        self.dropped = 0
+        self.high_water = 0
+        self.lock_attempts = 0
+        self.lock_contended = 0
+        self.lock_wait_us = 0
+        self.lock_wait_max_us = 0
+        
+    def _acquire(self):
+        """Lock holen und Konkurrenz messen (Zähler nur unter Lock ändern)"""
+        if self._lock.acquire(0):
+            self.lock_attempts += 1
+            return
+        # Lock hält gerade der andere Thread
+        start = time.ticks_us()
+        self._lock.acquire()
+        waited = time.ticks_diff(time.ticks_us(), start)
+        self.lock_attempts += 1
+        self.lock_contended += 1
+        self.lock_wait_us += waited
+        if waited > self.lock_wait_max_us:
+            self.lock_wait_max_us = waited
+            
+    def put(self, item):
+        """Element anhängen, False wenn die Queue voll ist"""
+        self._acquire()
+        try:
+            if self._count >= self.capacity:
+                self.dropped += 1
+                return False
+            self._items[(self._head + self._count) % self.capacity] = item
+            self._count += 1
+            if self._count > self.high_water:
+                self.high_water = self._count
+            return True
+        finally:
+            self._lock.release()
+            
+    def get(self):
+        """Ältestes Element entnehmen, None wenn leer"""
+        self._acquire()
+        try:
+            if not self._count:
+                return None
+            item = self._items[self._head]
+            self._items[self._head] = None
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            return item
+        finally:
+            self._lock.release()
+            
+    def peek(self):
+        """Ältestes Element ansehen, ohne es zu entnehmen (None wenn leer)"""
+        self._acquire()
+        try:
+            return self._items[self._head] if self._count else None
+        finally:
+            self._lock.release()
+            
+    def __len__(self):
+        return self._count
+        
+    def stats(self):
+        """Füllstand, Verluste und Lock-Konkurrenz"""
+        return {
+            'length': self._count,
+            'high_water': self.high_water,
+            'dropped': self.dropped,
+            'lock_attempts': self.lock_attempts,
+            'lock_contended': self.lock_contended,
+            'lock_wait_us': self.lock_wait_us,
+            'lock_wait_max_us': self.lock_wait_max_us,
+        }
@@ -0,0 +1,113 @@
+"""
+Einfache Messwerkzeuge für Laufzeit-Statistiken
+Histogramme mit festen Klassengrenzen - Eintragen allokiert nichts
+"""
+
+from array import array
+
+class Histogram:
+    """Histogramm mit festen oberen Klassengrenzen"""
+    
+    def __init__(self, edges):
+        # edges: aufsteigende obere Grenzen, letzte Klasse = Überlauf
+        self.edges = array('I', edges)
+        self.counts = array('I', [0] * (len(edges) + 1))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        
+    def add(self, value):
+        """Messwert eintragen"""
+        if value < 0:
+            value = 0
+        edges = self.edges
+        i = 0
+        n = len(edges)
+        while i < n and value > edges[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+            
+    def reset(self):
+        """Alle Zähler zurücksetzen"""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        
+    def mean(self):
+        """Mittelwert"""
+        return self.total // self.count if self.count else 0
+        
+    def percentile(self, percent):
+        """Obere Klassengrenze, unter der percent % der Werte liegen
+        
+        Nie größer als der größte eingetragene Wert.
+        """
+        if not self.count:
+            return 0
+        limit = (self.count * percent + 99) // 100
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= limit:
+                if i < len(self.edges) and self.edges[i] < self.max:
+                    return self.edges[i]
+                return self.max
+        return self.max
+        
+    def summary(self):
+        """Kennzahlen als Dict"""
+        return {
+            'count': self.count,
+            'mean': self.mean(),
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class RunningStats:
+    """Mittelwert und Varianz fortlaufend (Welford) - ohne Werteliste"""
+    
+    def __init__(self):
+        self.reset()
+        
+    def add(self, value):
+        """Messwert eintragen"""
+        self.count += 1
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if value > self.max:
+            self.max = value
+            
+    def reset(self):
+        """Alle Werte zurücksetzen"""
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.max = 0
+        
+    def mean(self):
+        return self._mean
+        
+    def variance(self):
+        """Stichprobenvarianz"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+        
+    def stddev(self):
+        return self.variance() ** 0.5
+        
+    def summary(self):
+        """Kennzahlen als Dict"""
+        return {
+            'count': self.count,
+            'mean': round(self._mean, 1),
+            'stddev': round(self.stddev(), 1),
+            'max': self.max,
+        }
\ No newline at end of file
@@ -0,0 +1,462 @@
+"""
+Aufzeichnung und Wiedergabe von Eingabe-Ereignissen (Touch + MIDI)
+Ein Trace hält Touch-Events und rohe MIDI-Bytes mit Zeitstempel fest.
+Die Wiedergabe speist ihn über Ersatz-Hardware in die echte Anwendung
+und misst Reaktionszeiten und Frame-Zeiten - so lassen sich zwei
+Firmware-Stände mit derselben Bedienung vergleichen
+"""
+
+import _thread
+import struct
+import time
+from config import TRACE_CONFIG
+from drivers.sdcard import sd_open, sd_lock
+from utils.queue import BoundedQueue
+from utils.stats import Histogram, RunningStats
+
+MAGIC = b'CYTR'
+VERSION = 1
+
+# Datensatz: Abstand zum vorherigen Ereignis (us), Art, Länge (+ Nutzdaten)
+RECORD_FMT = '<IBB'
+RECORD_SIZE = struct.calcsize(RECORD_FMT)
+
+TOUCH_DOWN = 1
+TOUCH_MOVE = 2
+TOUCH_UP = 3
+MIDI_IN = 4
+
+# Touch-Nutzdaten: x, y
+TOUCH_FMT = '<HH'
+
+
+class TraceRecorder:
+    """Schreibt Ereignisse gepuffert in eine Trace-Datei
+    
+    touch() läuft im UI-Thread, midi() im MIDI-Worker - der Puffer ist
+    daher per Lock geschützt. Geschrieben wird gesammelt über tick()
+    oder wenn der Puffer voll ist. Lange Pausen werden auf max_gap_ms
+    gekürzt, damit die Wiedergabe nicht im Leerlauf wartet.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.flush_ms = TRACE_CONFIG['flush_ms']
+        self.max_gap_us = TRACE_CONFIG['max_gap_ms'] * 1000
+        
+        self._buf = bytearray(TRACE_CONFIG['buffer'])
+        self._buf_len = 0
+        self._touch = bytearray(struct.calcsize(TOUCH_FMT))
+        self._lock = _thread.allocate_lock()
+        self._first_pending = 0
+        
+        self._file = sd_open(path, 'wb')
+        self._file.write(MAGIC)
+        self._file.write(bytes([VERSION]))
+        
+        self._last_us = time.ticks_us()
+        self._last_ms = time.ticks_ms()
+        
+        # Statistik
+        self.records = 0
+        self.bytes_written = 5
+        self.flushes = 0
+        
+    def _append(self, kind, data, n):
+        """Datensatz anhängen (byteweise kopieren, kein Slice)"""
+        self._lock.acquire()
+        try:
+            if self._file is None:
+                return
+            if self._buf_len + RECORD_SIZE + n > len(self._buf):
+                self._flush()
+            if not self._buf_len:
+                self._first_pending = time.ticks_ms()
+                
+            now_us = time.ticks_us()
+            now_ms = time.ticks_ms()
+            # ticks_us läuft nach ~9 Minuten über: lange Pausen über ticks_ms
+            if time.ticks_diff(now_ms, self._last_ms) * 1000 >= self.max_gap_us:
+                delta = self.max_gap_us
+            else:
+                delta = max(0, time.ticks_diff(now_us, self._last_us))
+            self._last_us = now_us
+            self._last_ms = now_ms
+            
+            buf = self._buf
+            pos = self._buf_len
+            struct.pack_into(RECORD_FMT, buf, pos, delta, kind, n)
+            pos += RECORD_SIZE
+            for i in range(n):
+                buf[pos + i] = data[i]
+            self._buf_len = pos + n
+            self.records += 1
+        finally:
+            self._lock.release()
+            
+    def touch(self, event_type, x, y, pressed):
+        """Touch-Event von get_touch() festhalten (pressed: Finger lag schon auf)"""
+        if event_type == 'touch_up':
+            kind = TOUCH_UP
+        else:
+            kind = TOUCH_MOVE if pressed else TOUCH_DOWN
+        struct.pack_into(TOUCH_FMT, self._touch, 0, x, y)
+        self._append(kind, self._touch, len(self._touch))
+        
+    def midi(self, buf, n):
+        """Rohe UART-Bytes buf[:n] festhalten"""
+        pos = 0
+        while pos < n:
+            count = min(n - pos, 255)
+            if pos:
+                # Selten (Lesepuffer > 255 Bytes): Rest über eine Kopie
+                self._append(MIDI_IN, buf[pos:pos + count], count)
+            else:
+                self._append(MIDI_IN, buf, count)
+            pos += count
+            
+    def _flush(self):
+        """Puffer schreiben (Lock wird gehalten)"""
+        if not self._buf_len or self._file is None:
+            return
+        self._file.write(memoryview(self._buf)[:self._buf_len])
+        self.bytes_written += self._buf_len
+        self._buf_len = 0
+        self.flushes += 1
+        
+    def tick(self):
+        """Im Hauptloop aufrufen: Puffer nach flush_ms schreiben (SD frei)"""
+        if (self._buf_len and not sd_lock.locked()
+                and time.ticks_diff(time.ticks_ms(), self._first_pending) >= self.flush_ms):
+            self.flush()
+            
+    def flush(self):
+        self._lock.acquire()
+        try:
+            self._flush()
+            if self._file:
+                self._file.flush()
+        finally:
+            self._lock.release()
+            
+    def close(self):
+        """Restlichen Puffer schreiben und Datei schließen"""
+        self._lock.acquire()
+        try:
+            self._flush()
+            if self._file:
+                self._file.close()
+                self._file = None
+        finally:
+            self._lock.release()
+            
+    def stats(self):
+        return {
+            'records': self.records,
+            'bytes': self.bytes_written + self._buf_len,
+            'flushes': self.flushes,
+        }
+
+
+class TraceReader:
+    """Liest die Datensätze einer Trace-Datei nacheinander"""
+    
+    def __init__(self, path):
+        self._file = sd_open(path, 'rb')
+        header = self._file.read(5)
+        if header[:4] != MAGIC or header[4] != VERSION:
+            self._file.close()
+            raise ValueError("Keine gültige Trace-Datei")
+        self._header = bytearray(RECORD_SIZE)
+        
+    def next(self):
+        """(Abstand us, Art, Nutzdaten) oder None am Ende"""
+        if self._file.readinto(self._header) != RECORD_SIZE:
+            return None
+        delta, kind, n = struct.unpack(RECORD_FMT, self._header)
+        data = self._file.read(n) if n else b''
+        if len(data) != n:
+            # Abgeschnittener letzter Datensatz
+            return None
+        return delta, kind, data
+        
+    def close(self):
+        self._file.close()
+
+
+class ReplayTouchscreen:
+    """Ersatz für XPT2046Touchscreen: liefert die Events aus dem Trace
+    
+    Wie der echte Controller meldet get_touch() pro Frame nur die
+    aktuelle Position - aufgelaufene Bewegungen werden zusammengefasst.
+    """
+    
+    def __init__(self, capacity=32):
+        self.events = BoundedQueue(capacity)
+        self.irq_handler = None
+        self.pressed = False
+        self.last_x = 0
+        self.last_y = 0
+        
+        # Fälligkeit (ticks_us) der im laufenden Frame abgeholten Events
+        self.handled = []
+        
+    def set_irq_handler(self, handler):
+        self.irq_handler = handler
+        
+    def feed(self, kind, x, y, due_us):
+        """Event aus dem Wiedergabe-Thread einspeisen"""
+        if not self.events.put((kind, x, y, due_us)):
+            return False
+        if kind == TOUCH_DOWN and self.irq_handler:
+            self.irq_handler(None)
+        return True
+        
+    def is_pressed(self):
+        return self.pressed
+        
+    def get_touch(self):
+        event = self.events.get()
+        if event is None:
+            return None
+        kind, x, y, due_us = event
+        self.handled.append(due_us)
+        
+        # Weitere Bewegungen bis zum nächsten Down/Up zusammenfassen
+        while kind == TOUCH_MOVE:
+            head = self.events.peek()
+            if head is None or head[0] != TOUCH_MOVE:
+                break
+            kind, x, y, due_us = self.events.get()
+            self.handled.append(due_us)
+            
+        self.last_x = x
+        self.last_y = y
+        self.pressed = kind != TOUCH_UP
+        return ('touch_up' if kind == TOUCH_UP else 'touch_down', x, y)
+
+
+class ReplayUART:
+    """Ersatz für den MIDI-UART: Empfangspuffer mit fester Größe
+    
+    Was nicht in den Puffer passt, geht wie beim echten UART verloren
+    (overruns). write() nimmt gesendete Bytes ohne Verzögerung an.
+    """
+    
+    def __init__(self, size=256):
+        self._buf = bytearray(size)
+        self._head = 0
+        self._count = 0
+        self._lock = _thread.allocate_lock()
+        
+        # (Byte-Position des Blockendes, Fälligkeit in ticks_us)
+        self._chunks = []
+        self._fed = 0
+        self._read = 0
+        
+        self.overruns = 0
+        self.bytes_written = 0
+        self.latency = None
+        
+    def feed(self, data, due_us):
+        """Bytes aus dem Wiedergabe-Thread einspeisen"""
+        self._lock.acquire()
+        try:
+            size = len(self._buf)
+            for byte in data:
+                if self._count >= size:
+                    self.overruns += 1
+                    continue
+                self._buf[(self._head + self._count) % size] = byte
+                self._count += 1
+                self._fed += 1
+            self._chunks.append((self._fed, due_us))
+        finally:
+            self._lock.release()
+            
+    def any(self):
+        return self._count
+        
+    def readinto(self, buf, nbytes=None):
+        """Wartende Bytes lesen, Reaktionszeit pro Block erfassen"""
+        self._lock.acquire()
+        try:
+            n = min(self._count, len(buf) if nbytes is None else nbytes)
+            size = len(self._buf)
+            for i in range(n):
+                buf[i] = self._buf[(self._head + i) % size]
+            self._head = (self._head + n) % size
+            self._count -= n
+            self._read += n
+            
+            # Vollständig gelesene Blöcke: Zeit ab Fälligkeit bis zum Parser
+            now = time.ticks_us()
+            chunks = self._chunks
+            while chunks and chunks[0][0] <= self._read:
+                if self.latency:
+                    self.latency.add(time.ticks_diff(now, chunks.pop(0)[1]) // 1000)
+                else:
+                    chunks.pop(0)
+            return n or None
+        finally:
+            self._lock.release()
+            
+    def write(self, buf, off=0, n=None):
+        if n is None:
+            n = len(buf) - off
+        self.bytes_written += n
+        return n
+        
+    def txdone(self):
+        return True
+        
+    def pending(self):
+        """Eingespeist, aber noch nicht gelesen"""
+        return self._count
+
+
+class TraceReplay:
+    """Spielt einen Trace über Ersatz-Hardware in die Anwendung ein
+    
+    Ein Thread liest den Trace und speist jedes Ereignis zu seinem
+    Zeitpunkt (geteilt durch speed) in ReplayTouchscreen bzw. ReplayUART
+    ein - asynchron zum Hauptloop wie die echte Hardware. Gemessen wird:
+    
+        touch_latency   Fälligkeit -> Ende des Frames, der es verarbeitet hat
+        midi_latency    Fälligkeit -> Übergabe an den MIDI-Parser
+        frames          Arbeitszeit pro Frame (ohne Warten)
+        missed          Frames über ihrem Budget (Frame-Takt des Zustands)
+    """
+    
+    # Klassengrenzen in Millisekunden
+    LATENCY_EDGES = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+    FRAME_EDGES = (5, 10, 20, 30, 50, 100, 200, 500)
+    
+    def __init__(self, path, speed=1):
+        self.reader = TraceReader(path)
+        self.speed = speed
+        self.touchscreen = ReplayTouchscreen()
+        self.uart = ReplayUART()
+        
+        # Weckt den Empfänger, sobald MIDI-Bytes anliegen
+        self.on_midi = None
+        
+        self.touch_latency = Histogram(self.LATENCY_EDGES)
+        self.midi_latency = Histogram(self.LATENCY_EDGES)
+        self.uart.latency = self.midi_latency
+        self.frame_stats = RunningStats()
+        self.frame_histogram = Histogram(self.FRAME_EDGES)
+        
+        self.events = 0
+        self.dropped = 0
+        self.missed = 0
+        self.running = False
+        self._finished = True
+        self._start_ms = 0
+        self._duration_ms = 0
+        
+        self._saved = None
+        
+    # ===== Ersatz-Hardware ein-/ausbauen =====
+    
+    def install(self, gui, midi):
+        """Touchscreen der GUI und UART des MIDIManager ersetzen"""
+        self._saved = (gui, gui.touchscreen, midi, midi.uart, gui.trace, midi.trace)
+        gui.touchscreen = self.touchscreen
+        midi.uart = self.uart
+        # Während der Wiedergabe nicht erneut aufzeichnen
+        gui.trace = None
+        midi.trace = None
+        
+    def restore(self):
+        """Echte Hardware wieder einsetzen"""
+        if self._saved:
+            gui, touchscreen, midi, uart, gui_trace, midi_trace = self._saved
+            gui.touchscreen = touchscreen
+            midi.uart = uart
+            gui.trace = gui_trace
+            midi.trace = midi_trace
+            self._saved = None
+            
+    # ===== Wiedergabe-Thread =====
+    
+    def _wait_until(self, due_us):
+        """Bis zum Zeitpunkt due_us schlafen (abbrechbar über stop())"""
+        while self.running:
+            left = time.ticks_diff(due_us, time.ticks_us())
+            if left <= 0:
+                return
+            if left > 2000:
+                time.sleep_ms(min(left // 1000 - 1, 10))
+            else:
+                time.sleep_us(left)
+                
+    def _run(self):
+        due = time.ticks_us()
+        try:
+            while self.running:
+                record = self.reader.next()
+                if record is None:
+                    break
+                delta, kind, data = record
+                due = time.ticks_add(due, int(delta / self.speed))
+                self._wait_until(due)
+                
+                if kind == MIDI_IN:
+                    self.uart.feed(data, due)
+                    if self.on_midi:
+                        self.on_midi()
+                else:
+                    x, y = struct.unpack(TOUCH_FMT, data)
+                    if not self.touchscreen.feed(kind, x, y, due):
+                        self.dropped += 1
+                self.events += 1
+        except Exception as e:
+            print(f"Trace Replay Error: {e}")
+        self.reader.close()
+        self._finished = True
+        
+    # ===== Hauptloop =====
+    
+    def start(self):
+        self.running = True
+        self._finished = False
+        self._start_ms = time.ticks_ms()
+        _thread.start_new_thread(self._run, ())
+        
+    def stop(self):
+        self.running = False
+        
+    def done(self):
+        """Trace vollständig eingespeist und alles abgeholt"""
+        return (self._finished and not self.uart.pending()
+                and not len(self.touchscreen.events))
+                
+    def frame_done(self, frame_start_us, budget_ms):
+        """Nach dem Zeichnen aufrufen: Reaktionszeiten und Frame-Zeit erfassen"""
+        now = time.ticks_us()
+        handled = self.touchscreen.handled
+        while handled:
+            self.touch_latency.add(time.ticks_diff(now, handled.pop()) // 1000)
+            
+        frame_ms = time.ticks_diff(now, frame_start_us) / 1000
+        self.frame_stats.add(frame_ms)
+        self.frame_histogram.add(int(frame_ms))
+        if frame_ms > budget_ms:
+            self.missed += 1
+        self._duration_ms = time.ticks_diff(time.ticks_ms(), self._start_ms)
+        
+    def report(self):
+        """Ergebnisse zum Vergleich zweier Firmware-Stände"""
+        return {
+            'events': self.events,
+            'speed': self.speed,
+            'duration_ms': self._duration_ms,
+            'touch_latency_ms': self.touch_latency.summary(),
+            'midi_latency_ms': self.midi_latency.summary(),
+            'frames': self.frame_stats.summary(),
+            'frame_p99_ms': self.frame_histogram.percentile(99),
+            'missed_deadlines': self.missed,
+            'touch_dropped': self.dropped,
+            'uart_overruns': self.uart.overruns,
+        }
\ No newline at end of file